@@ -1,23 +1,23 @@
 import sqlite3
+from database import DB_PATH
+from migrations import run_migrations, get_schema_version
 
-conn = sqlite3.connect('tickets.db')
-cursor = conn.cursor()
+# Aplica manualmente as migrações pendentes (o bot também faz isso ao iniciar)
+conn = sqlite3.connect(DB_PATH)
 
-# Verifica se a coluna já existe
-cursor.execute("PRAGMA table_info(bot_config)")
-columns = [col[1] for col in cursor.fetchall()]
-
-if 'fila_channel_id' not in columns:
-    try:
-        cursor.execute('ALTER TABLE bot_config ADD COLUMN fila_channel_id TEXT;')
-        print('Coluna fila_channel_id adicionada com sucesso!')
-    except Exception as e:
-        print(f'Erro ao adicionar coluna: {e}')
-else:
-    print('A coluna fila_channel_id já existe.')
+versao_anterior = get_schema_version(conn)
+try:
+    versao = run_migrations(conn)
+    if versao == versao_anterior:
+        print(f'O banco já está atualizado (versão {versao}).')
+    else:
+        print(f'Banco atualizado da versão {versao_anterior} para a {versao}.')
+except Exception as e:
+    print(f'Erro ao aplicar migrações: {e}')
 
 # Mostrar o valor atual salvo no banco
 try:
+    cursor = conn.cursor()
     cursor.execute('SELECT guild_id, fila_channel_id FROM bot_config')
     rows = cursor.fetchall()
     if rows:
@@ -28,5 +28,4 @@ try:
 except Exception as e:
     print(f'Erro ao consultar bot_config: {e}')
 
-conn.commit()
-conn.close() 
\ No newline at end of file
+conn.close()
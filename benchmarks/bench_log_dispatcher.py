@@ -0,0 +1,99 @@
+# Benchmark do envio de logs ao canal de logs em rajada (ex: muitos tickets fechados juntos).
+#
+# "antes" envia uma mensagem por evento e o handler espera cada envio;
+# "depois" usa o log_dispatcher: o handler só enfileira e os embeds saem agrupados.
+# O canal é simulado, com latência fixa e limite de 5 mensagens a cada 5 segundos
+# (escalado pelo fator de tempo para o benchmark não demorar).
+#
+# Uso: python benchmarks/bench_log_dispatcher.py [quantidade_de_eventos]
+import os
+import sys
+import time
+import asyncio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import discord  # noqa: E402
+from log_dispatcher import LogDispatcher  # noqa: E402
+
+# 1 segundo real do Discord = TIME_SCALE segundos no benchmark
+TIME_SCALE = 0.01
+SEND_LATENCY = 0.08 * TIME_SCALE
+
+class FakeChannel:
+    def __init__(self, limit=5, period=5 * TIME_SCALE):
+        self.id = 1
+        self.limit = limit
+        self.period = period
+        self.sent = []
+        self.messages = 0
+        self.embeds = 0
+        self.rate_limited = 0
+
+    async def send(self, embed=None, embeds=None):
+        await asyncio.sleep(SEND_LATENCY)
+        limited = False
+        while True:
+            now = time.monotonic()
+            self.sent = [t for t in self.sent if now - t < self.period]
+            if len(self.sent) < self.limit:
+                break
+            limited = True
+            # Como o discord.py, espera o fim da janela antes de tentar de novo
+            await asyncio.sleep(self.period - (now - self.sent[0]))
+        self.rate_limited += limited
+        self.sent.append(now)
+        self.messages += 1
+        self.embeds += len(embeds) if embeds else 1
+
+def make_embed(i):
+    embed = discord.Embed(title="🔒 Ticket Fechado", color=discord.Color.red())
+    embed.add_field(name="📋 ID", value=f"#{i}", inline=True)
+    embed.add_field(name="👤 Fechado por", value="staff (1)", inline=True)
+    return embed
+
+async def legacy_burst(total):
+    channel = FakeChannel()
+    waits = []
+    async def handler(i):
+        start = time.perf_counter()
+        await channel.send(embed=make_embed(i))
+        waits.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(total)))
+    return channel, waits, time.perf_counter() - start
+
+async def dispatcher_burst(total):
+    channel = FakeChannel()
+    dispatcher = LogDispatcher(rate=5, period=5 * TIME_SCALE, coalesce_delay=0.25 * TIME_SCALE, max_queue=total)
+    waits = []
+    async def handler(i):
+        start = time.perf_counter()
+        dispatcher.send(channel, make_embed(i))
+        waits.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(total)))
+    while dispatcher.pending_count:
+        await asyncio.sleep(SEND_LATENCY)
+    await dispatcher.stop()
+    assert channel.embeds == total
+    return channel, waits, time.perf_counter() - start
+
+def p99(values):
+    values = sorted(values)
+    return values[int(len(values) * 0.99) - 1]
+
+async def main(total):
+    for label, burst in (("antes", legacy_burst), ("depois", dispatcher_burst)):
+        channel, waits, elapsed = await burst(total)
+        print(
+            f"   {label + ':':8}{channel.messages} mensagens, "
+            f"{channel.rate_limited} limites atingidos, espera do handler p99 {p99(waits) * 1000:.2f} ms, "
+            f"entrega total {elapsed / TIME_SCALE:.0f} s (tempo Discord)"
+        )
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"📨 Logs de canal em rajada: {total}")
+    asyncio.run(main(total))
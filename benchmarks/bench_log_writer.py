@@ -0,0 +1,64 @@
+# Benchmark do create_log em rajada: commits e logs/segundo antes e depois do log_writer.
+#
+# "antes" grava um registro por transação (como o create_log antigo);
+# "depois" usa o log_writer com group commit.
+#
+# Uso: python benchmarks/bench_log_writer.py [quantidade_de_logs]
+import os
+import sys
+import time
+import shutil
+import asyncio
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP_DIR = tempfile.mkdtemp(prefix="bench-bot-")
+os.environ["DB_PATH"] = os.path.join(TMP_DIR, "tickets.db")
+os.environ.setdefault("DISCORD_BOT_TOKEN", "x" * 72)
+sys.path.insert(0, ROOT)
+
+import bot  # noqa: E402
+from database import db  # noqa: E402
+from log_writer import log_writer  # noqa: E402
+
+async def legacy_burst(total):
+    for i in range(total):
+        await db.execute('''
+            INSERT INTO ticket_logs (ticket_id, action, user_id, username, details)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (i % 100, "FECHADO", "1", "staff", None))
+    return total
+
+async def writer_burst(total):
+    commits_before = log_writer.commits
+    for i in range(total):
+        log_writer.add(i % 100, "FECHADO", "1", "staff")
+        # Cede o loop como os handlers reais fazem entre uma ação e outra
+        if i % 10 == 0:
+            await asyncio.sleep(0)
+    # Read-your-writes: os logs pendentes já aparecem na consulta
+    logs = await log_writer.fetch_logs(0)
+    assert len(logs) >= total // 100
+    await log_writer.stop()
+    return log_writer.commits - commits_before
+
+async def main(total):
+    start = time.perf_counter()
+    legacy_commits = await legacy_burst(total)
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    writer_commits = await writer_burst(total)
+    writer_elapsed = time.perf_counter() - start
+
+    print(f"📝 Logs em rajada: {total}")
+    print(f"   antes:  {legacy_commits} commits, {total / legacy_elapsed:,.0f} logs/s")
+    print(f"   depois: {writer_commits} commits, {total / writer_elapsed:,.0f} logs/s")
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    try:
+        asyncio.run(main(total))
+    finally:
+        db.close()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
@@ -0,0 +1,76 @@
+# Benchmark do on_message: mensagens/segundo antes e depois do caminho rápido.
+#
+# "antes" reproduz o handler antigo (uma consulta ao SQLite por mensagem);
+# "depois" chama o on_message atual do bot.py.
+#
+# Uso: python benchmarks/bench_on_message.py [quantidade_de_mensagens]
+import os
+import sys
+import time
+import asyncio
+import shutil
+import sqlite3
+import tempfile
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP_DIR = tempfile.mkdtemp(prefix="bench-bot-")
+os.environ["DB_PATH"] = os.path.join(TMP_DIR, "tickets.db")
+os.environ.setdefault("DISCORD_BOT_TOKEN", "x" * 72)
+sys.path.insert(0, ROOT)
+
+import bot  # noqa: E402
+from config_cache import config_cache  # noqa: E402
+from database import db  # noqa: E402
+
+GUILDS = 50
+SUGGESTION_CHANNEL_OFFSET = 1_000_000
+
+def fake_message(i):
+    guild_id = i % GUILDS
+    return SimpleNamespace(
+        author=SimpleNamespace(bot=False),
+        guild=SimpleNamespace(id=guild_id),
+        # Nunca cai no canal de sugestões: mede o caminho das mensagens comuns
+        channel=SimpleNamespace(id=guild_id + 10),
+        content="mensagem qualquer",
+    )
+
+# Handler antigo: abre o banco e consulta bot_config a cada mensagem
+async def legacy_on_message(message):
+    if message.author.bot:
+        return
+    conn = sqlite3.connect(os.environ["DB_PATH"])
+    cursor = conn.cursor()
+    cursor.execute("SELECT suggestion_channel_id FROM bot_config WHERE guild_id = ?", (str(message.guild.id),))
+    result = cursor.fetchone()
+    conn.close()
+    if result and result[0] and message.channel.id == int(result[0]):
+        pass
+
+async def measure(handler, messages):
+    start = time.perf_counter()
+    for message in messages:
+        await handler(message)
+    elapsed = time.perf_counter() - start
+    return len(messages) / elapsed
+
+async def main(total):
+    for guild_id in range(GUILDS):
+        await config_cache.update(guild_id, suggestion_channel_id=str(SUGGESTION_CHANNEL_OFFSET + guild_id))
+    messages = [fake_message(i) for i in range(total)]
+
+    before = await measure(legacy_on_message, messages)
+    after = await measure(bot.on_message, messages)
+
+    print(f"📨 Mensagens: {total} em {GUILDS} servidores")
+    print(f"   antes:  {before:,.0f} msg/s")
+    print(f"   depois: {after:,.0f} msg/s ({after / before:,.1f}x)")
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    try:
+        asyncio.run(main(total))
+    finally:
+        db.close()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
@@ -0,0 +1,91 @@
+# Teste de concorrência da fila: muitos atendentes pegando tickets ao mesmo tempo.
+#
+# Vários processos (cada um com sua própria conexão e sua cópia da fila em memória)
+# disparam pedidos simultâneos de queue_engine.claim em dois servidores. Ao final verifica que nenhuma entrada foi
+# entregue duas vezes e que nenhum servidor recebeu ticket de outro.
+#
+# Uso: python benchmarks/bench_queue_claim.py [tickets_por_servidor] [processos]
+import os
+import sys
+import time
+import shutil
+import asyncio
+import tempfile
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+GUILDS = ("111", "222")
+
+def worker(db_path, claims_per_guild, start_event, results):
+    os.environ["DB_PATH"] = db_path
+    from ticket_queue import queue_engine
+    from database import db
+
+    async def claim_all():
+        await queue_engine.load()
+        start_event.wait()
+        tasks = [queue_engine.claim(guild_id) for guild_id in GUILDS for _ in range(claims_per_guild)]
+        rows = await asyncio.gather(*tasks)
+        return [(row[0], row[1], row[5]) for row in rows if row]
+
+    try:
+        results.extend(asyncio.run(claim_all()))
+    finally:
+        db.close()
+
+def main(per_guild, processes):
+    tmp_dir = tempfile.mkdtemp(prefix="bench-bot-")
+    db_path = os.path.join(tmp_dir, "tickets.db")
+    os.environ["DB_PATH"] = db_path
+    try:
+        from ticket_queue import queue_engine
+        from database import db
+        from migrations import run_migrations
+        db.run_sync(run_migrations)
+
+        async def fill():
+            for guild_id in GUILDS:
+                for i in range(per_guild):
+                    await queue_engine.enqueue(guild_id, i, f"user{i}", "ticket_geral", f"{guild_id}:{i}", "")
+        asyncio.run(fill())
+        db.close()
+
+        # spawn: cada processo abre o banco do zero, como instâncias separadas do bot
+        ctx = multiprocessing.get_context("spawn")
+        manager = ctx.Manager()
+        results = manager.list()
+        start_event = manager.Event()
+        # Cada processo tenta pegar a fila inteira: a maioria dos pedidos precisa voltar vazia
+        procs = [
+            ctx.Process(target=worker, args=(db_path, per_guild, start_event, results))
+            for _ in range(processes)
+        ]
+        for proc in procs:
+            proc.start()
+        start = time.perf_counter()
+        start_event.set()
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - start
+
+        claimed = list(results)
+        ids = [queue_id for queue_id, _, _ in claimed]
+        duplicates = len(ids) - len(set(ids))
+        wrong_guild = [1 for _, guild_id, title in claimed if not title.startswith(f"{guild_id}:")]
+
+        print(f"🎫 {processes} processos x {per_guild * len(GUILDS)} pedidos, {per_guild * len(GUILDS)} tickets na fila")
+        print(f"   pegos: {len(claimed)} em {elapsed:.2f}s")
+        print(f"   duplicados: {duplicates} | de outro servidor: {len(wrong_guild)}")
+        assert len(claimed) == per_guild * len(GUILDS), "tickets sobrando na fila"
+        assert duplicates == 0, "ticket entregue para mais de um atendente"
+        assert not wrong_guild, "ticket entregue para o servidor errado"
+        print("✅ Nenhuma atribuição dupla")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    per_guild = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    main(per_guild, processes)
@@ -0,0 +1,249 @@
+# Benchmark do ciclo de vida do ticket e dos caminhos mais usados do bot, sem conexão ao Discord.
+#
+# Chama os handlers reais do bot.py com objetos falsos (benchmarks/fake_discord.py) sobre um
+# tickets.db temporário, já preenchido com --tickets tickets. Para cada handler mede a vazão
+# (operações/s) e a latência p50/p99, e grava tudo em JSON para comparar execuções.
+#
+# Uso: python benchmarks/bench_ticket_lifecycle.py [--tickets N] [--iteracoes N]
+#          [--concorrencia N] [--latencia-api MS] [--saida arquivo.json] [--comparar anterior.json]
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import asyncio
+import argparse
+import platform
+import tempfile
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP_DIR = tempfile.mkdtemp(prefix="bench-bot-")
+os.environ["DB_PATH"] = os.path.join(TMP_DIR, "tickets.db")
+os.environ.setdefault("DISCORD_BOT_TOKEN", "x" * 72)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bot  # noqa: E402
+from database import db  # noqa: E402
+from config_cache import config_cache  # noqa: E402
+from ticket_queue import queue_engine  # noqa: E402
+from ticket_stats import ticket_stats  # noqa: E402
+from log_writer import log_writer  # noqa: E402
+from suggestions import suggestion_store  # noqa: E402
+from fake_discord import FakeAPI, FakeGuild, FakeMember, FakeInteraction, FakeMessage, next_id  # noqa: E402
+
+CATEGORIES = ("ticket_geral", "denuncia", "recrutamento", "suporte_tecnico")
+
+# Preenche o banco com tickets antigos (1/3 abertos), como um servidor em uso há algum tempo
+async def populate(total: int, guild: FakeGuild):
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(total):
+        created = start + timedelta(minutes=7 * i)
+        status = "aberto" if i % 3 == 0 else "fechado"
+        rows.append((
+            str(10_000 + i % 5000), f"usuario{i % 5000}", CATEGORIES[i % len(CATEGORIES)],
+            f"Ticket antigo {i}", f"Descrição do ticket antigo {i}", status,
+            str(500_000 + i), created.strftime("%Y-%m-%d %H:%M:%S"),
+        ))
+
+    def _insert(conn):
+        with conn:
+            conn.executemany('''
+                INSERT INTO tickets (user_id, username, category, title, description, status, channel_id, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+    await db.run(_insert)
+    await ticket_stats.rebuild()
+    await ticket_stats.load()
+    await config_cache.load()
+    await queue_engine.load()
+    await suggestion_store.load()
+    guild.add_category(None)
+    await config_cache.update(guild.id, ticket_category_id=str(next(iter(guild.channels))))
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+# Executa make_op(i) para i em range(iterations), no máximo `concurrency` ao mesmo tempo.
+# make_op devolve (corrotina, verificação); verificação() retorna False se o handler não
+# seguiu o caminho esperado (contado como erro no resultado).
+async def measure(name: str, iterations: int, concurrency: int, make_op):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(i):
+        nonlocal errors
+        coro, check = make_op(i)
+        async with semaphore:
+            start = time.perf_counter()
+            await coro
+            latencies.append(time.perf_counter() - start)
+        if check is not None and not check():
+            errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(i) for i in range(iterations)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    result = {
+        "ops": iterations,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_per_s": round(iterations / elapsed, 1) if elapsed else None,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 4),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "max_ms": round(latencies[-1] * 1000, 4),
+    }
+    print(
+        f"   {name:<32} {result['throughput_per_s']:>10,.1f} op/s   p50 {result['p50_ms']:>9.4f} ms"
+        f"   p99 {result['p99_ms']:>9.4f} ms" + (f"   ⚠️ {errors} erro(s)" if errors else "")
+    )
+    return result
+
+async def run_benchmarks(args):
+    api = FakeAPI(args.latencia_api / 1000)
+    guild = FakeGuild(api)
+    admin = guild.add_member(FakeMember(next_id(), "admin", administrator=True))
+    suggestion_channel = guild.add_text_channel(name="sugestoes")
+    common_channel = guild.add_text_channel(name="geral")
+
+    await populate(args.tickets, guild)
+    await config_cache.update(guild.id, suggestion_channel_id=str(suggestion_channel.id))
+    log_writer.start()
+
+    iterations = args.iteracoes
+    concurrency = args.concorrencia
+    results = {}
+    print(f"🏁 {args.tickets} tickets no banco, {iterations} iterações, concorrência {concurrency}, latência da API {args.latencia_api} ms")
+
+    # on_message fora dos canais de sugestão (caminho rápido, sem I/O)
+    author = FakeMember(next_id(), "autor")
+
+    def on_message_common(i):
+        message = FakeMessage(api, common_channel, "mensagem qualquer", author=author)
+        return bot.on_message(message), None
+    results["on_message"] = await measure("on_message", iterations * 10, concurrency, on_message_common)
+
+    # on_message em canal de sugestões: apaga, reposta, registra e reage
+    def on_message_suggestion(i):
+        message = FakeMessage(api, suggestion_channel, f"Sugestão {i}", author=author)
+        return bot.on_message(message), None
+    before = suggestion_store.stats()["suggestions"]
+    results["on_message_sugestao"] = await measure("on_message (sugestão)", iterations, concurrency, on_message_suggestion)
+    # Toda sugestão precisa ter sido registrada
+    results["on_message_sugestao"]["errors"] = iterations - (suggestion_store.stats()["suggestions"] - before)
+
+    # TicketModal.on_submit: cada membro entra na fila uma vez
+    queued_users = [guild.add_member(FakeMember(next_id())) for _ in range(iterations)]
+
+    def modal_submit(i):
+        modal = bot.TicketModal("📋 Suporte Geral", "ticket_geral")
+        modal.title_field = SimpleNamespace(value=f"Problema {i}")
+        modal.description_field = SimpleNamespace(value=f"Descrição do problema {i}")
+        interaction = FakeInteraction(api, guild, queued_users[i])
+        return modal.on_submit(interaction), lambda: interaction.reply_text().startswith("🕒")
+    results["ticketmodal_on_submit"] = await measure("TicketModal.on_submit", iterations, concurrency, modal_submit)
+
+    # TicketQueueView.pegar_ticket: retira da fila, cria o canal e registra o ticket
+    queue_view = bot.TicketQueueView()
+
+    def claim(i):
+        interaction = FakeInteraction(api, guild, admin)
+        return queue_view.pegar_ticket.callback(interaction), lambda: interaction.reply_text().startswith("✅")
+    results["ticketqueueview_pegar_ticket"] = await measure("TicketQueueView.pegar_ticket", iterations, concurrency, claim)
+
+    # /fechar-ticket pelo dono: fecha, registra e agenda a exclusão do canal
+    open_tickets = await db.fetchall(
+        'SELECT user_id, channel_id FROM tickets WHERE status = "aberto" ORDER BY id DESC LIMIT ?', (iterations,)
+    )
+
+    def close(i):
+        user_id, channel_id = open_tickets[i % len(open_tickets)]
+        owner = guild.get_member(int(user_id)) or FakeMember(int(user_id))
+        channel = guild.get_channel(int(channel_id)) or guild.add_text_channel(int(channel_id), f"ticket-{channel_id}")
+        interaction = FakeInteraction(api, guild, owner, channel)
+        return bot.fechar_ticket.callback(interaction), lambda: interaction.response.sent is not None and interaction.response.sent[0] == "defer"
+    results["fechar_ticket"] = await measure("/fechar-ticket", min(iterations, len(open_tickets)), concurrency, close)
+
+    # /stats-tickets (contadores em memória)
+    def stats(i):
+        interaction = FakeInteraction(api, guild, admin)
+        return bot.stats_tickets.callback(interaction), lambda: interaction.reply_text().startswith("📊")
+    results["stats_tickets"] = await measure("/stats-tickets", iterations, concurrency, stats)
+
+    # /listar-tickets: primeira página, sem filtro e filtrada por status
+    def list_all(i):
+        interaction = FakeInteraction(api, guild, admin)
+        return bot.listar_tickets.callback(interaction), lambda: interaction.reply_text().startswith("📋 Lista")
+    results["listar_tickets"] = await measure("/listar-tickets", iterations, concurrency, list_all)
+
+    def list_closed(i):
+        interaction = FakeInteraction(api, guild, admin)
+        return bot.listar_tickets.callback(interaction, status="fechado"), lambda: interaction.reply_text().startswith("📋 Lista")
+    results["listar_tickets_fechados"] = await measure("/listar-tickets status:fechado", iterations, concurrency, list_closed)
+
+    await log_writer.stop()
+    return results
+
+def compare(results: dict, previous_path: str):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)["results"]
+    print(f"\n📊 Comparação com {previous_path} (p50 / p99; < 1.00x = mais rápido agora)")
+    for name, result in results.items():
+        old = previous.get(name)
+        if not old:
+            continue
+        p50 = result["p50_ms"] / old["p50_ms"] if old["p50_ms"] else float("nan")
+        p99 = result["p99_ms"] / old["p99_ms"] if old["p99_ms"] else float("nan")
+        print(f"   {name:<32} {p50:>6.2f}x / {p99:>6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline dos handlers do bot")
+    parser.add_argument("--tickets", type=int, default=10000, help="tickets já existentes no banco")
+    parser.add_argument("--iteracoes", type=int, default=500, help="execuções de cada handler")
+    parser.add_argument("--concorrencia", type=int, default=1, help="execuções simultâneas")
+    parser.add_argument("--latencia-api", type=float, default=0, help="latência simulada de cada chamada à API (ms)")
+    parser.add_argument("--saida", help="arquivo JSON de resultado (padrão: benchmarks/resultados/<data>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    try:
+        results = asyncio.run(run_benchmarks(args))
+    finally:
+        db.close()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "config": {
+            "tickets": args.tickets,
+            "iterations": args.iteracoes,
+            "concurrency": args.concorrencia,
+            "api_latency_ms": args.latencia_api,
+            "db_profile": db.profile["name"] if db.profile else None,
+        },
+        "results": results,
+    }
+    output = args.saida or os.path.join(ROOT, "benchmarks", "resultados", f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Resultado salvo em {output}")
+
+    if args.comparar:
+        compare(results, args.comparar)
+
+if __name__ == "__main__":
+    main()
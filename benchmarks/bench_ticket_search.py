@@ -0,0 +1,78 @@
+# Benchmark do /buscar-tickets: latência da busca FTS5 com muitos tickets e logs.
+#
+# Cria um banco temporário com N tickets (e 2 logs por ticket), aplica as migrações
+# (triggers mantêm os índices FTS5) e mede a primeira página de buscas comuns.
+#
+# Uso: python benchmarks/bench_ticket_search.py [quantidade_de_tickets]
+import os
+import sys
+import time
+import random
+import itertools
+import shutil
+import asyncio
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP_DIR = tempfile.mkdtemp(prefix="bench-bot-")
+os.environ["DB_PATH"] = os.path.join(TMP_DIR, "tickets.db")
+os.environ.setdefault("DISCORD_BOT_TOKEN", "x" * 72)
+sys.path.insert(0, ROOT)
+
+import bot  # noqa: E402
+from database import db  # noqa: E402
+from ticket_search import search_tickets  # noqa: E402
+
+# Vocabulário com distribuição de Zipf (poucas palavras muito comuns, muitas raras),
+# como em texto real; as palavras da busca são de frequência alta e média
+COMMON_WORDS = (
+    "conta banida pagamento pix erro servidor lag ping reembolso denúncia hacker "
+    "recrutamento guilda força economia ajuda bug travando login senha item sumiu"
+).split()
+WORDS = COMMON_WORDS + [f"palavra{i}" for i in range(20000)]
+WEIGHTS = [1 / (rank + 5) for rank in range(len(WORDS))]
+# Pesos acumulados calculados uma vez: com `weights`, cada random.choices os somaria de novo
+CUM_WEIGHTS = list(itertools.accumulate(WEIGHTS))
+CATEGORIES = ["ticket_geral", "denuncia", "recrutamento", "suporte_tecnico"]
+
+def populate(total):
+    random.seed(42)
+    def _populate(conn):
+        with conn:
+            conn.executemany('''
+                INSERT INTO tickets (user_id, username, category, title, description, status, channel_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                (str(i % 5000), f"user{i % 5000}", random.choice(CATEGORIES),
+                 " ".join(random.choices(WORDS, cum_weights=CUM_WEIGHTS, k=4)), " ".join(random.choices(WORDS, cum_weights=CUM_WEIGHTS, k=30)),
+                 random.choice(["aberto", "fechado"]), str(i))
+                for i in range(total)
+            ))
+            conn.executemany('''
+                INSERT INTO ticket_logs (ticket_id, action, user_id, username, details)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (
+                (1 + i // 2, "FECHADO", "1", "staff", "Motivo: " + " ".join(random.choices(WORDS, cum_weights=CUM_WEIGHTS, k=8)))
+                for i in range(total * 2)
+            ))
+    db.run_sync(_populate)
+
+async def main(total):
+    start = time.perf_counter()
+    populate(total)
+    print(f"🔎 {total} tickets e {total * 2} logs indexados em {time.perf_counter() - start:.1f}s")
+    for text in ("conta", "pix", "reembolso pagamento", "conta banida hacker", "palavra500", "palavra9000", "sem resultado xyz"):
+        timings = []
+        for page in range(3):
+            start = time.perf_counter()
+            rows, has_more = await search_tickets(text, 10, page * 10)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"   {text!r:24} página 1: {timings[0]:7.1f} ms  página 3: {timings[2]:7.1f} ms  ({len(rows)} linhas, mais: {has_more})")
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    try:
+        asyncio.run(main(total))
+    finally:
+        db.close()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
@@ -0,0 +1,215 @@
+# Objetos falsos do Discord para rodar os handlers do bot.py sem conexão.
+#
+# Imitam só o que os handlers usam (ids, menções, permissões, envio de mensagens e respostas
+# de interação). Cada chamada à API passa pelo FakeAPI, que espera `latency` segundos para
+# simular a rede e conta as chamadas em `calls`.
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import discord
+
+_ids = itertools.count(900_000_000_000_000_000)
+
+def next_id() -> int:
+    return next(_ids)
+
+class FakeAPI:
+    def __init__(self, latency: float = 0):
+        self.latency = latency
+        self.calls = 0
+
+    async def call(self):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+class FakeRole:
+    def __init__(self, role_id: int, name: str = "role"):
+        self.id = role_id
+        self.name = name
+        self.mention = f"<@&{role_id}>"
+
+class FakeMember:
+    def __init__(self, member_id: int, name: str = None, administrator: bool = False, roles=()):
+        self.id = member_id
+        self.name = name or f"membro{member_id}"
+        self.display_name = self.name
+        self.mention = f"<@{member_id}>"
+        self.bot = False
+        self.roles = list(roles)
+        self.guild_permissions = discord.Permissions(administrator=administrator, manage_guild=administrator)
+        self.display_avatar = SimpleNamespace(url=f"https://cdn.discordapp.com/embed/avatars/{member_id % 5}.png")
+
+    def __str__(self):
+        return self.name
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+class FakeMessage:
+    def __init__(self, api: FakeAPI, channel, content: str = "", author: FakeMember = None, embed=None, message_id: int = None):
+        self.api = api
+        self.id = message_id or next_id()
+        self.channel = channel
+        self.guild = getattr(channel, "guild", None)
+        self.content = content
+        self.author = author
+        self.embed = embed
+        self.reactions = []
+
+    async def delete(self):
+        await self.api.call()
+
+    async def add_reaction(self, emoji):
+        await self.api.call()
+        self.reactions.append(str(emoji))
+
+    async def edit(self, **kwargs):
+        await self.api.call()
+        return self
+
+# Subclasse de TextChannel para passar nos isinstance do bot (ex.: canal de logs)
+class FakeTextChannel(discord.TextChannel):
+    def __init__(self, api: FakeAPI, guild, channel_id: int = None, name: str = "canal"):
+        self.api = api
+        self.id = channel_id or next_id()
+        self.guild = guild
+        self.name = name
+        self.sent = 0
+
+    async def send(self, content=None, embed=None, embeds=None, view=None):
+        await self.api.call()
+        self.sent += 1
+        return FakeMessage(self.api, self, content or "", embed=embed)
+
+    def get_partial_message(self, message_id: int):
+        return FakeMessage(self.api, self, message_id=message_id)
+
+    async def delete(self, reason=None):
+        await self.api.call()
+
+# Subclasse de CategoryChannel para passar no isinstance de get_or_create_ticket_category
+class FakeCategory(discord.CategoryChannel):
+    def __init__(self, api: FakeAPI, guild, category_id: int = None):
+        self.id = category_id or next_id()
+        self.name = "🎫 TICKETS"
+        self._fake_api = api
+        self._fake_guild = guild
+
+    async def create_text_channel(self, name: str, overwrites=None, **kwargs):
+        await self._fake_api.call()
+        channel = FakeTextChannel(self._fake_api, self._fake_guild, name=name)
+        self._fake_guild.channels[channel.id] = channel
+        return channel
+
+class FakeGuild:
+    def __init__(self, api: FakeAPI, guild_id: int = None):
+        self.api = api
+        self.id = guild_id or next_id()
+        self.name = f"servidor{self.id}"
+        self.members = {}
+        self.roles = {}
+        self.channels = {}
+        self.default_role = FakeRole(self.id, "@everyone")
+        self.me = FakeMember(next_id(), "bot", administrator=True)
+
+    def add_member(self, member: FakeMember):
+        self.members[member.id] = member
+        return member
+
+    def get_member(self, member_id: int):
+        return self.members.get(member_id)
+
+    def get_role(self, role_id: int):
+        return self.roles.get(role_id)
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    def add_text_channel(self, channel_id: int = None, name: str = "canal"):
+        channel = FakeTextChannel(self.api, self, channel_id, name)
+        self.channels[channel.id] = channel
+        return channel
+
+    def add_category(self, category_id: int = None):
+        category = FakeCategory(self.api, self, category_id)
+        self.channels[category.id] = category
+        return category
+
+    async def create_category(self, name: str, overwrites=None, **kwargs):
+        await self.api.call()
+        return self.add_category()
+
+class FakeResponse:
+    def __init__(self, api: FakeAPI):
+        self.api = api
+        self._done = False
+        # (tipo, conteúdo, embed) da resposta enviada
+        self.sent = None
+        # View ou modal mostrado na resposta (para reproduzir os cliques seguintes)
+        self.view = None
+
+    def is_done(self) -> bool:
+        return self._done
+
+    def _finish(self, kind: str, content=None, embed=None):
+        if self._done:
+            raise discord.InteractionResponded(None)
+        self._done = True
+        self.sent = (kind, content, embed)
+
+    async def send_message(self, content=None, embed=None, view=None, ephemeral=False, **kwargs):
+        await self.api.call()
+        self._finish("mensagem", content, embed)
+        self.view = view
+
+    async def send_modal(self, modal):
+        await self.api.call()
+        self._finish("modal", modal)
+        self.view = modal
+
+    async def defer(self, ephemeral=False, **kwargs):
+        await self.api.call()
+        self._finish("defer")
+
+    async def edit_message(self, content=None, embed=None, view=None, **kwargs):
+        await self.api.call()
+        self._finish("edicao", content, embed)
+        self.view = view
+
+class FakeFollowup:
+    def __init__(self, api: FakeAPI):
+        self.api = api
+        self.sent = []
+
+    async def send(self, content=None, embed=None, ephemeral=False, **kwargs):
+        await self.api.call()
+        self.sent.append((content, embed))
+
+class FakeInteraction:
+    def __init__(self, api: FakeAPI, guild: FakeGuild, user: FakeMember, channel=None):
+        self.id = next_id()
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.channel = channel
+        self.channel_id = channel.id if channel else None
+        self.response = FakeResponse(api)
+        self.followup = FakeFollowup(api)
+        self.extras = {}
+        self.command = None
+
+    # Texto da resposta (ou título do embed), para conferir se o handler seguiu o caminho esperado
+    def reply_text(self) -> str:
+        if self.response.sent is None:
+            return ""
+        kind, content, embed = self.response.sent
+        if isinstance(content, str):
+            return content
+        if embed is not None:
+            return embed.title or ""
+        return kind
@@ -0,0 +1,407 @@
+# Reproduz uma gravação de tráfego (RECORD_TRAFFIC, ver traffic_recorder.py) nos handlers do bot.py.
+#
+# Os eventos são entregues no mesmo ritmo em que chegaram (--velocidade 1), mais rápido
+# (--velocidade 10 = 10x) ou sem espera (--velocidade 0), cada um em sua própria tarefa,
+# como o discord.py faz. Servidores, membros e canais são os objetos falsos de
+# benchmarks/fake_discord.py, com latência de API simulada; o banco é um tickets.db temporário.
+#
+# Mede a vazão, a latência por tipo de evento, o atraso de entrega (quanto o loop ficou para
+# trás do ritmo da gravação) e o acúmulo: handlers em andamento e filas internas do bot.
+#
+# Uso: python benchmarks/replay_traffic.py gravacao.jsonl [--velocidade N] [--latencia-api MS]
+#          [--limite N] [--saida arquivo.json]
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import asyncio
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP_DIR = tempfile.mkdtemp(prefix="replay-bot-")
+os.environ["DB_PATH"] = os.path.join(TMP_DIR, "tickets.db")
+os.environ.setdefault("DISCORD_BOT_TOKEN", "x" * 72)
+# O replay nunca grava tráfego de novo
+os.environ["RECORD_TRAFFIC"] = ""
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import discord  # noqa: E402
+import bot  # noqa: E402
+from database import db  # noqa: E402
+from config_cache import config_cache  # noqa: E402
+from ticket_queue import queue_engine  # noqa: E402
+from ticket_stats import ticket_stats  # noqa: E402
+from log_writer import log_writer  # noqa: E402
+from log_dispatcher import log_dispatcher  # noqa: E402
+from suggestions import suggestion_store  # noqa: E402
+from stream_monitor import stream_monitor  # noqa: E402
+from scheduler import scheduler  # noqa: E402
+from fake_discord import FakeAPI, FakeGuild, FakeMember, FakeRole, FakeInteraction, FakeMessage  # noqa: E402
+
+# Views persistentes (existem sem uma resposta anterior ao mesmo membro)
+PERSISTENT_VIEWS = (bot.SupportView, bot.TicketQueueView)
+# Quantas views/modais recentes de cada membro ficam disponíveis para os cliques seguintes
+RECENT_VIEWS = 5
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+# Servidores, membros e canais da gravação, criados na primeira vez que aparecem
+class ReplayWorld:
+    def __init__(self, api: FakeAPI):
+        self.api = api
+        self.guilds = {}
+        self.channels = {}
+        # (guild, user) -> views e modais mostrados recentemente ao membro
+        self.recent_views = {}
+        self.persistent_views = []
+
+    def guild(self, guild_id: int) -> FakeGuild:
+        guild = self.guilds.get(guild_id)
+        if guild is None:
+            guild = self.guilds[guild_id] = FakeGuild(self.api, guild_id)
+            # Canal de logs e de anúncios de live de cada servidor
+            guild.log_channel = self.channel(guild, None, "logs")
+            guild.live_channel = self.channel(guild, None, "lives")
+        return guild
+
+    def member(self, guild: FakeGuild, user_id: int, administrator: bool = False) -> FakeMember:
+        member = guild.get_member(user_id)
+        if member is None:
+            member = guild.add_member(FakeMember(user_id))
+        member.guild_permissions = discord.Permissions(administrator=administrator, manage_guild=administrator)
+        return member
+
+    def channel(self, guild: FakeGuild, channel_id: int, name: str = "canal"):
+        channel = guild.get_channel(channel_id) if channel_id else None
+        if channel is None:
+            channel = guild.add_text_channel(channel_id, name)
+            self.channels[channel.id] = channel
+        return channel
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    def remember_view(self, guild_id: int, user_id: int, view):
+        if view is None:
+            return
+        views = self.recent_views.setdefault((guild_id, user_id), [])
+        views.append(view)
+        del views[:-RECENT_VIEWS]
+
+    # Item (botão) de uma view recente do membro ou de uma view persistente
+    def find_item(self, guild_id: int, user_id: int, custom_id: str, label: str):
+        views = list(reversed(self.recent_views.get((guild_id, user_id), []))) + self.persistent_views
+        for view in views:
+            if not isinstance(view, discord.ui.View):
+                continue
+            for item in view.children:
+                if getattr(item, "custom_id", None) == custom_id or (label and getattr(item, "label", None) == label):
+                    return view, item
+        return None, None
+
+    def find_modal(self, guild_id: int, user_id: int):
+        for view in reversed(self.recent_views.get((guild_id, user_id), [])):
+            if isinstance(view, discord.ui.Modal):
+                return view
+        return None
+
+def load_recording(path: str, limit: int = None):
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            event = json.loads(line)
+            if event.get("type") == "header":
+                continue
+            events.append(event)
+            if limit and len(events) >= limit:
+                break
+    events.sort(key=lambda event: event["t"])
+    return events
+
+# Configura os servidores como estavam na gravação: canais de sugestão e streamers monitorados
+async def prepare(world: ReplayWorld, events):
+    suggestion_channels = {}
+    streamers = set()
+    for event in events:
+        if event["type"] == "message" and event.get("suggestion_channel") and event.get("guild"):
+            suggestion_channels[event["guild"]] = event["channel"]
+        elif event["type"] == "presence" and event.get("monitored"):
+            streamers.add((event["guild"], event["user"]))
+        if event.get("guild"):
+            world.guild(event["guild"])
+
+    await config_cache.load()
+    await queue_engine.load()
+    await ticket_stats.load()
+    await suggestion_store.load()
+    await stream_monitor.load()
+    for guild_id, guild in world.guilds.items():
+        fields = {"log_channel_id": str(guild.log_channel.id)}
+        if guild_id in suggestion_channels:
+            fields["suggestion_channel_id"] = str(world.channel(guild, suggestion_channels[guild_id], "sugestoes").id)
+        await config_cache.update(guild_id, **fields)
+    for guild_id, user_id in streamers:
+        stream_monitor.add(user_id, guild_id, world.guild(guild_id).live_channel.id)
+
+    world.persistent_views = [view() for view in PERSISTENT_VIEWS]
+    # Anúncios de live procuram o canal pelo cache do cliente
+    bot.bot.get_channel = world.get_channel
+
+def _presence_member(guild: FakeGuild, member: FakeMember, streaming: bool, activities: int, is_bot: bool):
+    presence = FakeMember(member.id, member.name)
+    presence.bot = is_bot
+    presence.guild = guild
+    presence.activities = [discord.Game(name="jogo")] * max(activities - streaming, 0)
+    if streaming:
+        presence.activities.append(discord.Streaming(name="Live", url=f"https://twitch.tv/anon{member.id % 1000}"))
+    return presence
+
+def _command_kwargs(world: ReplayWorld, guild: FakeGuild, command, options):
+    parameters = {parameter.display_name: parameter.name for parameter in command.parameters}
+    kwargs = {}
+    for option in options:
+        name = parameters.get(option["name"])
+        if name is None:
+            continue
+        option_type = option["type"]
+        if option_type == 3:
+            kwargs[name] = "x" * option.get("len", 1)
+        elif option_type in (6, 9):
+            kwargs[name] = world.member(guild, option["value"])
+        elif option_type == 7:
+            kwargs[name] = world.channel(guild, option["value"])
+        elif option_type == 8:
+            kwargs[name] = guild.roles.setdefault(option["value"], FakeRole(option["value"]))
+        elif option_type == 11:
+            continue
+        else:
+            kwargs[name] = option.get("value")
+    return kwargs
+
+# Entrega um evento ao handler correspondente; retorna o nome usado nas estatísticas (ou None se ignorado)
+async def dispatch(world: ReplayWorld, event: dict):
+    api = world.api
+    if event["type"] == "message":
+        guild = world.guild(event["guild"])
+        author = world.member(guild, event["author"])
+        author.bot = event.get("bot", False)
+        channel = world.channel(guild, event["channel"])
+        await bot.on_message(FakeMessage(api, channel, "x" * event.get("content_len", 0), author=author))
+        return "message"
+
+    if event["type"] == "presence":
+        guild = world.guild(event["guild"])
+        member = world.member(guild, event["user"])
+        before = _presence_member(guild, member, event.get("streaming_before", False), event.get("activities", 0), event.get("bot", False))
+        after = _presence_member(guild, member, event.get("streaming_after", False), event.get("activities", 0), event.get("bot", False))
+        await bot.on_presence_update(before, after)
+        return "presence"
+
+    if event["type"] != "interaction" or not event.get("guild"):
+        return None
+    guild = world.guild(event["guild"])
+    user = world.member(guild, event["user"], event.get("admin", False) or event.get("manage_guild", False))
+    channel = world.channel(guild, event["channel"])
+    interaction = FakeInteraction(api, guild, user, channel)
+    kind = event.get("kind")
+
+    if kind == 2:
+        command = bot.bot.tree.get_command(event["command"])
+        if command is None:
+            return None
+        options = event.get("options", [])
+        # Subcomando: a opção do tipo 1 carrega as opções de verdade
+        while options and options[0]["type"] in (1, 2) and isinstance(command, discord.app_commands.Group):
+            command = command.get_command(options[0]["name"])
+            options = options[0].get("options", [])
+        interaction.command = command
+        await command.callback(interaction, **_command_kwargs(world, guild, command, options))
+        name = f"/{command.qualified_name}"
+    elif kind == 3:
+        view, item = world.find_item(guild.id, user.id, event.get("custom_id"), event.get("label"))
+        if item is None:
+            return "botão (view não encontrada)"
+        if await view.interaction_check(interaction):
+            await item.callback(interaction)
+        name = f"{type(view).__name__}.{event.get('label') or event.get('custom_id')}"
+    elif kind == 5:
+        modal = world.find_modal(guild.id, user.id)
+        if modal is None:
+            return "formulário (modal não encontrado)"
+        inputs = [item for item in modal.children if isinstance(item, discord.ui.TextInput)]
+        for item, length in zip(inputs, event.get("fields", [])):
+            # Mesmo caminho que o discord.py usa para preencher o modal enviado
+            item._refresh_state(interaction, {"value": "x" * length})
+        await modal.on_submit(interaction)
+        name = f"{type(modal).__name__}.on_submit"
+    else:
+        return None
+    world.remember_view(guild.id, user.id, interaction.response.view)
+    return name
+
+async def replay(args):
+    events = load_recording(args.arquivo, args.limite)
+    if not events:
+        print("❌ Gravação vazia")
+        return None
+    api = FakeAPI(args.latencia_api / 1000)
+    world = ReplayWorld(api)
+    await prepare(world, events)
+    log_writer.start()
+
+    # tipo -> [latências], erros por tipo, atrasos de entrega
+    latencies = {}
+    errors = {}
+    lags = []
+    in_flight = 0
+    max_in_flight = 0
+    backlog = {"log_writer": 0, "log_dispatcher": 0, "fila_tickets": 0, "acoes_agendadas": 0}
+    tasks = set()
+
+    # Interações de um mesmo membro em ordem: um formulário só pode ser enviado depois que
+    # a resposta com o modal chegou (na gravação os dois eventos podem estar muito próximos)
+    last_interaction = {}
+
+    async def run(event, scheduled_at, previous):
+        nonlocal in_flight
+        if previous is not None:
+            await asyncio.wait([previous])
+        start = time.perf_counter()
+        lags.append(max(start - scheduled_at, 0))
+        name = event["type"]
+        try:
+            name = await dispatch(world, event) or "ignorado"
+        except Exception as e:
+            errors[name] = errors.get(name, 0) + 1
+            if sum(errors.values()) <= 5:
+                print(f"⚠️ Erro ao reproduzir {name}: {type(e).__name__}: {e}")
+        finally:
+            in_flight -= 1
+            latencies.setdefault(name, []).append(time.perf_counter() - start)
+
+    async def sample_backlog():
+        while True:
+            backlog["log_writer"] = max(backlog["log_writer"], log_writer.pending_count)
+            backlog["log_dispatcher"] = max(backlog["log_dispatcher"], log_dispatcher.stats()["pending"])
+            backlog["fila_tickets"] = max(backlog["fila_tickets"], queue_engine.total_size())
+            backlog["acoes_agendadas"] = max(backlog["acoes_agendadas"], scheduler.stats()["pending"])
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample_backlog())
+    first_t = events[0]["t"]
+    duration = events[-1]["t"] - first_t
+    print(f"▶️ Reproduzindo {len(events)} eventos ({duration:.1f}s gravados) {f'a {args.velocidade:g}x' if args.velocidade else 'sem espera'}, latência da API {args.latencia_api} ms")
+    start = time.perf_counter()
+    for event in events:
+        scheduled_at = start + (event["t"] - first_t) / args.velocidade if args.velocidade else time.perf_counter()
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(0)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        previous = None
+        if event["type"] == "interaction":
+            key = (event.get("guild"), event.get("user"))
+            previous = last_interaction.get(key)
+            if previous is not None and previous.done():
+                previous = None
+        task = asyncio.create_task(run(event, scheduled_at, previous))
+        if event["type"] == "interaction":
+            last_interaction[key] = task
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    # Esvazia as filas internas para medir o tempo até o bot "alcançar" a gravação
+    await log_dispatcher.stop()
+    await log_writer.stop()
+    drained = time.perf_counter() - start
+    sampler.cancel()
+
+    lags.sort()
+    result = {
+        "events": len(events),
+        "recorded_duration_s": round(duration, 3),
+        "elapsed_s": round(elapsed, 3),
+        "drained_s": round(drained, 3),
+        "throughput_per_s": round(len(events) / elapsed, 1) if elapsed else None,
+        "max_in_flight": max_in_flight,
+        "delivery_lag_ms": {
+            "p50": round(percentile(lags, 0.50) * 1000, 3),
+            "p99": round(percentile(lags, 0.99) * 1000, 3),
+            "max": round(lags[-1] * 1000, 3),
+        },
+        "max_backlog": backlog,
+        "api_calls": api.calls,
+        "handlers": {},
+    }
+    print(f"   {len(events) / elapsed:,.1f} eventos/s, atraso p99 {result['delivery_lag_ms']['p99']} ms, máximo em andamento {max_in_flight}")
+    for name, values in sorted(latencies.items(), key=lambda item: -len(item[1])):
+        values.sort()
+        result["handlers"][name] = {
+            "count": len(values),
+            "errors": errors.get(name, 0),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 4),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 4),
+            "max_ms": round(values[-1] * 1000, 4),
+        }
+        print(
+            f"   {name:<40} {len(values):>7}   p50 {result['handlers'][name]['p50_ms']:>9.4f} ms"
+            f"   p99 {result['handlers'][name]['p99_ms']:>9.4f} ms" + (f"   ⚠️ {errors[name]} erro(s)" if errors.get(name) else "")
+        )
+    print(f"   acúmulo máximo: {backlog}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduz uma gravação de tráfego nos handlers do bot")
+    parser.add_argument("arquivo", help="gravação JSONL (RECORD_TRAFFIC)")
+    parser.add_argument("--velocidade", type=float, default=1, help="1 = tempo real, 10 = 10x, 0 = sem espera")
+    parser.add_argument("--latencia-api", type=float, default=50, help="latência simulada de cada chamada à API (ms)")
+    parser.add_argument("--limite", type=int, help="reproduz só os primeiros N eventos")
+    parser.add_argument("--saida", help="arquivo JSON de resultado (padrão: benchmarks/resultados/replay-<data>.json)")
+    args = parser.parse_args()
+
+    try:
+        result = asyncio.run(replay(args))
+    finally:
+        db.close()
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+    if result is None:
+        return
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "config": {
+            "recording": os.path.abspath(args.arquivo),
+            "speed": args.velocidade,
+            "api_latency_ms": args.latencia_api,
+            "limit": args.limite,
+        },
+        "results": result,
+    }
+    output = args.saida or os.path.join(ROOT, "benchmarks", "resultados", f"replay-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Resultado salvo em {output}")
+
+if __name__ == "__main__":
+    main()
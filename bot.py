@@ -5,7 +5,25 @@ import sqlite3
 import os
 from datetime import datetime
 from dotenv import load_dotenv
-import asyncio
+import math
+from database import db
+from migrations import run_migrations
+from config_cache import config_cache
+from log_writer import log_writer
+from log_dispatcher import log_dispatcher
+from ticket_queue import queue_engine, created_timestamp
+from queue_dashboard import queue_dashboard
+from suggestions import suggestion_store
+from stream_monitor import stream_monitor
+from scheduler import scheduler
+from command_sync import command_sync
+from metrics import metrics, timed, record_command, InstrumentedCommandTree
+from tracing import http_trace_config
+from traffic_recorder import traffic_recorder
+from sharding import shard_config, shard_monitor
+from transcripts import export_transcript
+from ticket_search import search_tickets
+from ticket_stats import ticket_stats
 
 # Carregar variáveis do arquivo .env
 load_dotenv()
@@ -35,8 +53,15 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.presences = True
 
-# Criar bot com prefixo '!' e intents configuradas
-bot = commands.Bot(command_prefix='!', intents=intents)
+# Criar bot com prefixo '!' e intents configuradas (AutoShardedBot quando SHARD_COUNT está definido)
+bot_class = commands.AutoShardedBot if shard_config.enabled else commands.Bot
+bot = bot_class(
+    command_prefix='!',
+    intents=intents,
+    tree_cls=InstrumentedCommandTree,
+    http_trace=http_trace_config(),
+    **shard_config.bot_options()
+)
 
 # Configurações globais
 TICKET_CATEGORY_NAME = "🎫 TICKETS"
@@ -45,172 +70,87 @@ LOG_CHANNEL_NAME = "📋-logs-tickets"
 # Carregar variáveis de ambiente
 load_dotenv()
 
-# Inicializar banco de dados
+# Inicializar banco de dados (aplica as migrações pendentes)
 def init_database():
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    
-    # Criação das tabelas do banco
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tickets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            username TEXT NOT NULL,
-            category TEXT NOT NULL,
-            title TEXT NOT NULL,
-            description TEXT,
-            status TEXT DEFAULT 'aberto',
-            channel_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            closed_by TEXT,
-            closed_at TIMESTAMP,
-            assigned_to TEXT
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ticket_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ticket_id INTEGER,
-            action TEXT NOT NULL,
-            user_id TEXT NOT NULL,
-            username TEXT NOT NULL,
-            details TEXT,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (ticket_id) REFERENCES tickets (id)
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ticket_queue (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            username TEXT NOT NULL,
-            category TEXT NOT NULL,
-            title TEXT NOT NULL,
-            description TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS bot_config (
-            guild_id TEXT PRIMARY KEY,
-            ticket_category_id TEXT,
-            log_channel_id TEXT,
-            staff_role_id TEXT,
-            suggestion_channel_id TEXT,
-            approved_suggestion_channel_id TEXT,
-            fila_channel_id TEXT
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS shop_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            descricao TEXT,
-            preco INTEGER NOT NULL,
-            estoque INTEGER DEFAULT 0,
-            pix_code TEXT
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_inventory (
-            user_id TEXT NOT NULL,
-            item_id INTEGER NOT NULL,
-            quantidade INTEGER NOT NULL DEFAULT 0,
-            PRIMARY KEY (user_id, item_id),
-            FOREIGN KEY (item_id) REFERENCES shop_items(id)
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_balance (
-            user_id TEXT PRIMARY KEY,
-            saldo INTEGER NOT NULL DEFAULT 0
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS response_templates (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id TEXT NOT NULL,
-            name TEXT NOT NULL,
-            content TEXT NOT NULL,
-            UNIQUE(guild_id, name)
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS stream_notifications (
-            streamer_id TEXT PRIMARY KEY,
-            guild_id TEXT NOT NULL,
-            channel_id TEXT NOT NULL,
-            custom_message TEXT
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS info_panels (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id TEXT NOT NULL,
-            name TEXT NOT NULL,
-            title TEXT,
-            content TEXT,
-            UNIQUE(guild_id, name)
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
-    print("💾 Banco de dados inicializado!")
+    version = db.run_sync(run_migrations)
+    print(f"💾 Banco de dados inicializado! (versão do schema: {version})")
 
-# Criar log no banco de dados
+# Criar log no banco de dados (gravado em lote pelo log_writer)
 async def create_log(ticket_id: int, action: str, user: discord.User, details: str = None):
     try:
-        conn = sqlite3.connect('tickets.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO ticket_logs (ticket_id, action, user_id, username, details)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (ticket_id, action, str(user.id), user.display_name, details))
-        conn.commit()
+        log_writer.add(ticket_id, action, str(user.id), user.display_name, details)
     except Exception as e:
         print(f"❌ Erro ao criar log: {e}")
-    finally:
-        conn.close()
 
-# Enviar embed de log para o canal configurado
+# Enviar embed de log para o canal configurado (enfileirado; o log_dispatcher envia em segundo plano)
 async def send_log_to_channel(guild: discord.Guild, embed: discord.Embed):
     try:
-        conn = sqlite3.connect('tickets.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT log_channel_id FROM bot_config WHERE guild_id = ?', (str(guild.id),))
-        result = cursor.fetchone()
-        if result and result[0]:
-            log_channel = guild.get_channel(int(result[0]))
+        config = config_cache.get(guild.id)
+        if config.log_channel_id:
+            log_channel = guild.get_channel(int(config.log_channel_id))
             if log_channel and isinstance(log_channel, discord.TextChannel):
-                await log_channel.send(embed=embed)
+                log_dispatcher.send(log_channel, embed)
     except Exception as e:
         print(f"❌ Erro ao enviar log para canal: {e}")
-    finally:
-        conn.close()
+
+# Tempo entre o fechamento do ticket e a exclusão do canal (segundos)
+TICKET_DELETE_DELAY = 10
+
+# Ação agendada: salva a transcrição do canal do ticket e depois o apaga.
+# Roda pelo scheduler, então sobrevive a um reinício do bot no meio da espera.
+async def delete_ticket_channel_action(payload: dict):
+    await bot.wait_until_ready()
+    ticket_id = payload["ticket_id"]
+    channel = bot.get_channel(int(payload["channel_id"]))
+    if channel is None:
+        try:
+            channel = await bot.fetch_channel(int(payload["channel_id"]))
+        except discord.NotFound:
+            # Canal já apagado (manualmente ou por uma execução anterior)
+            return
+    # Uma falha na transcrição sobe como exceção: o scheduler tenta de novo e o canal fica até lá.
+    # A marca no payload (regravada pelo scheduler) faz uma nova tentativa só repetir a exclusão
+    if not payload.get("transcript_exported"):
+        jsonl_path, html_path, total = await export_transcript(channel, ticket_id, payload.get("title"))
+        await create_log(ticket_id, "TRANSCRICAO", bot.user, f"{total} mensagens • {jsonl_path} • {html_path}")
+        payload["transcript_exported"] = True
+    try:
+        await channel.delete(reason=f"Ticket #{ticket_id} fechado")
+    except discord.NotFound:
+        pass
+
+# Sem transcrição o canal fica, para a conversa não se perder
+async def delete_ticket_channel_give_up(payload: dict, error: Exception):
+    channel = bot.get_channel(int(payload["channel_id"]))
+    if channel is not None:
+        if payload.get("transcript_exported"):
+            message = "⚠️ A transcrição deste ticket foi salva, mas não foi possível apagar o canal."
+        else:
+            message = "⚠️ Não foi possível salvar a transcrição deste ticket, então o canal não foi apagado."
+        try:
+            await channel.send(message)
+        except discord.HTTPException:
+            pass
+
+scheduler.register("apagar_canal_ticket", delete_ticket_channel_action, delete_ticket_channel_give_up)
+
+# Agenda a transcrição e a exclusão do canal do ticket fechado
+async def schedule_ticket_channel_deletion(channel: discord.TextChannel, ticket_id: int, title: str):
+    await scheduler.schedule(
+        "apagar_canal_ticket",
+        {"channel_id": channel.id, "ticket_id": ticket_id, "title": title},
+        delay=TICKET_DELETE_DELAY,
+        key=f"apagar_canal_ticket:{channel.id}",
+        guild_id=channel.guild.id
+    )
 
 # Obter ou criar categoria de tickets
 async def get_or_create_ticket_category(guild: discord.Guild):
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
     try:
-        cursor.execute('SELECT ticket_category_id, log_channel_id, staff_role_id FROM bot_config WHERE guild_id = ?', (str(guild.id),))
-        result = cursor.fetchone()
-        log_channel_id = result[1] if result else None
-        staff_role_id = result[2] if result else None
+        config = config_cache.get(guild.id)
         # Se já existe, retorna a categoria
-        if result and result[0]:
-            category = guild.get_channel(int(result[0]))
+        if config.ticket_category_id:
+            category = guild.get_channel(int(config.ticket_category_id))
             if category and isinstance(category, discord.CategoryChannel):
                 return category
         
@@ -227,16 +167,10 @@ async def get_or_create_ticket_category(guild: discord.Guild):
                 )
             }
         )
-        cursor.execute('''
-            INSERT OR REPLACE INTO bot_config (guild_id, ticket_category_id, log_channel_id, staff_role_id)
-            VALUES (?, ?, ?, ?)
-        ''', (str(guild.id), str(category.id), log_channel_id, staff_role_id))
-        conn.commit()
+        await config_cache.update(guild.id, ticket_category_id=str(category.id))
         return category
     except Exception as e:
         print(f"❌ Erro ao obter/criar categoria: {e}")
-    finally:
-        conn.close()
 
 # View com botões para tipos de suporte
 class SupportView(discord.ui.View):
@@ -244,11 +178,7 @@ class SupportView(discord.ui.View):
         super().__init__(timeout=None)
 
     async def _create_ticket_modal(self, interaction: discord.Interaction, category_name: str, category_value: str):
-        conn = sqlite3.connect('tickets.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM tickets WHERE user_id = ? AND status = "aberto"', (str(interaction.user.id),))
-        existing_ticket = cursor.fetchone()
-        conn.close()
+        existing_ticket = await db.fetchone('SELECT id FROM tickets WHERE user_id = ? AND status = "aberto"', (str(interaction.user.id),))
         
         if existing_ticket:
             await interaction.response.send_message(
@@ -261,18 +191,22 @@ class SupportView(discord.ui.View):
         await interaction.response.send_modal(modal)
 
     @discord.ui.button(label="Abrir ticket", style=discord.ButtonStyle.secondary, emoji="📋")
+    @timed("view")
     async def ticket_geral(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self._create_ticket_modal(interaction, "📋 Suporte Geral", "ticket_geral")
 
     @discord.ui.button(label="Denunciar", style=discord.ButtonStyle.danger, emoji="⭕")
+    @timed("view")
     async def denuncia(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self._create_ticket_modal(interaction, "⭕ Denúncia", "denuncia")
 
     @discord.ui.button(label="Recrutamento", style=discord.ButtonStyle.primary, emoji="💬")
+    @timed("view")
     async def recrutamento(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self._create_ticket_modal(interaction, "💬 Recrutamento", "recrutamento")
         
     @discord.ui.button(label="Suporte Técnico", style=discord.ButtonStyle.secondary, emoji="🔧")
+    @timed("view")
     async def suporte_tecnico(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self._create_ticket_modal(interaction, "🔧 Suporte Técnico", "suporte_tecnico")
 
@@ -340,28 +274,23 @@ class TicketModal(discord.ui.Modal):
             self.add_item(self.title_field)
             self.add_item(self.description_field)
     
+    @timed("modal")
     async def on_submit(self, interaction: discord.Interaction):
         try:
             # Adicionar à fila de espera em vez de criar o canal
-            conn = sqlite3.connect('tickets.db')
-            cursor = conn.cursor()
-            cursor.execute('SELECT id FROM ticket_queue WHERE user_id = ? AND category = ?', (str(interaction.user.id), self.category_value))
-            existing_in_queue = cursor.fetchone()
-            cursor.execute('SELECT id FROM tickets WHERE user_id = ? AND status = "aberto"', (str(interaction.user.id),))
-            existing_ticket = cursor.fetchone()
+            existing_in_queue = queue_engine.is_queued(interaction.guild.id, interaction.user.id, self.category_value)
+            existing_ticket = await db.fetchone('SELECT id FROM tickets WHERE user_id = ? AND status = "aberto"', (str(interaction.user.id),))
             if existing_in_queue:
                 await interaction.response.send_message(
                     f"❌ Você já está na fila de espera para um ticket desta categoria.",
                     ephemeral=True
                 )
-                conn.close()
                 return
             if existing_ticket:
                 await interaction.response.send_message(
                     f"❌ Você já possui um ticket aberto (#{existing_ticket[0]}). Feche-o antes de criar um novo.",
                     ephemeral=True
                 )
-                conn.close()
                 return
             if self.category_value == "recrutamento":
                 title_value = f"Recrutamento: {self.nick_field.value}"
@@ -369,18 +298,20 @@ class TicketModal(discord.ui.Modal):
             else:
                 title_value = self.title_field.value
                 description_value = self.description_field.value
-            cursor.execute('''
-                INSERT INTO ticket_queue (user_id, username, category, title, description)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                str(interaction.user.id),
+            entry = await queue_engine.enqueue(
+                interaction.guild.id,
+                interaction.user.id,
                 interaction.user.display_name,
                 self.category_value,
                 title_value,
                 description_value
-            ))
-            conn.commit()
-            conn.close()
+            )
+            if entry is None:
+                await interaction.response.send_message(
+                    f"❌ Você já está na fila de espera para um ticket desta categoria.",
+                    ephemeral=True
+                )
+                return
             response_embed = discord.Embed(
                 title="🕒 Ticket adicionado à fila de espera!",
                 description=f"Seu ticket foi adicionado à fila. Aguarde um atendente.",
@@ -388,24 +319,8 @@ class TicketModal(discord.ui.Modal):
             )
             await interaction.response.send_message(embed=response_embed, ephemeral=True)
 
-            # Notificar canal de fila configurado em bot_config, se existir
-            conn = sqlite3.connect('tickets.db')
-            cursor = conn.cursor()
-            cursor.execute('SELECT staff_role_id, fila_channel_id FROM bot_config WHERE guild_id = ?', (str(interaction.guild.id),))
-            config_result = cursor.fetchone()
-            staff_mention = f"<@&{config_result[0]}>" if config_result and config_result[0] else "@everyone"
-            fila_channel = interaction.guild.get_channel(int(config_result[1])) if config_result and config_result[1] else None
-            conn.close()
-            if fila_channel:
-                # Enviar painel com botão para pegar o ticket, sem mensagem de texto
-                embed = discord.Embed(
-                    title="🕒 Novo ticket na fila de espera!",
-                    description=f"Categoria: {self.category_name}\nTítulo: {title_value}",
-                    color=discord.Color.orange(),
-                    timestamp=datetime.now()
-                )
-                embed.add_field(name="Atendente", value=f"Aguardando {staff_mention}", inline=False)
-                await fila_channel.send(embed=embed, view=TicketQueueView())
+            # Atualizar o painel da fila no canal configurado (edição agrupada em segundo plano)
+            queue_dashboard.mark_dirty(interaction.guild.id)
         except Exception as e:
             await interaction.response.send_message(f"❌ Erro ao adicionar à fila: {e}", ephemeral=True)
 
@@ -430,6 +345,7 @@ class AddUserModal(discord.ui.Modal):
         )
         self.add_item(self.user_input)
     
+    @timed("modal")
     async def on_submit(self, interaction: discord.Interaction):
         try:
             user_input = self.user_input.value.strip()
@@ -461,6 +377,131 @@ class AddUserModal(discord.ui.Modal):
         except Exception as e:
             await interaction.response.send_message(f"❌ Erro ao adicionar usuário: {e}", ephemeral=True)
 
+# Busca uma página de tickets com paginação por chave (created_at, id).
+# Cada página lê só as linhas que mostra (+1 para saber se existe outra), usando os índices
+# de migrations.py, então o custo não cresce com o histórico.
+TICKET_PAGE_COLUMNS = 'id, username, category, title, status, created_at'
+
+async def fetch_ticket_page(filters: dict, page_size: int, older_than=None, newer_than=None):
+    conditions = [f"{column} = ?" for column in filters]
+    params = list(filters.values())
+    order = "DESC"
+    if older_than:
+        conditions.append("(created_at, id) < (?, ?)")
+        params.extend(older_than)
+    elif newer_than:
+        conditions.append("(created_at, id) > (?, ?)")
+        params.extend(newer_than)
+        order = "ASC"
+    where = " AND ".join(conditions) or "1=1"
+    rows = await db.fetchall(
+        f'SELECT {TICKET_PAGE_COLUMNS} FROM tickets WHERE {where} ORDER BY created_at {order}, id {order} LIMIT ?',
+        (*params, page_size + 1)
+    )
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if newer_than:
+        rows.reverse()
+    return rows, has_more
+
+# View com botões de página anterior/próxima para listas de tickets
+class TicketPageView(discord.ui.View):
+    def __init__(self, owner_id: int, filters: dict, page_size: int, render):
+        super().__init__(timeout=300)
+        self.owner_id = owner_id
+        self.filters = filters
+        self.page_size = page_size
+        # render(rows, page) -> discord.Embed
+        self.render = render
+        self.page = 1
+        self.first_key = None
+        self.last_key = None
+
+    def _show(self, rows, has_prev: bool, has_next: bool):
+        self.first_key = (rows[0][5], rows[0][0])
+        self.last_key = (rows[-1][5], rows[-1][0])
+        self.anterior.disabled = not has_prev
+        self.proxima.disabled = not has_next
+
+    # Carrega a primeira página; retorna as linhas (vazio se não houver tickets)
+    async def start(self):
+        rows, has_more = await fetch_ticket_page(self.filters, self.page_size)
+        if rows:
+            self._show(rows, has_prev=False, has_next=has_more)
+        return rows
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("❌ Esta lista pertence a outro usuário.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Anterior", style=discord.ButtonStyle.secondary, emoji="⬅️")
+    @timed("view")
+    async def anterior(self, interaction: discord.Interaction, button: discord.ui.Button):
+        rows, has_more = await fetch_ticket_page(self.filters, self.page_size, newer_than=self.first_key)
+        if not rows:
+            await interaction.response.defer()
+            return
+        self.page -= 1
+        self._show(rows, has_prev=has_more, has_next=True)
+        await interaction.response.edit_message(embed=self.render(rows, self.page), view=self)
+
+    @discord.ui.button(label="Próxima", style=discord.ButtonStyle.secondary, emoji="➡️")
+    @timed("view")
+    async def proxima(self, interaction: discord.Interaction, button: discord.ui.Button):
+        rows, has_more = await fetch_ticket_page(self.filters, self.page_size, older_than=self.last_key)
+        if not rows:
+            await interaction.response.defer()
+            return
+        self.page += 1
+        self._show(rows, has_prev=True, has_next=has_more)
+        await interaction.response.edit_message(embed=self.render(rows, self.page), view=self)
+
+# View com botões de página para os resultados do /buscar-tickets (ordenados por relevância)
+class SearchResultsView(discord.ui.View):
+    def __init__(self, owner_id: int, text: str, status: str, page_size: int, render):
+        super().__init__(timeout=300)
+        self.owner_id = owner_id
+        self.text = text
+        self.status = status
+        self.page_size = page_size
+        # render(rows, page) -> discord.Embed
+        self.render = render
+        self.page = 1
+
+    # Carrega a página atual; retorna as linhas
+    async def load(self):
+        rows, has_more = await search_tickets(self.text, self.page_size, (self.page - 1) * self.page_size, self.status)
+        self.anterior.disabled = self.page == 1
+        self.proxima.disabled = not has_more
+        return rows
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("❌ Esta lista pertence a outro usuário.", ephemeral=True)
+            return False
+        return True
+
+    async def _go(self, interaction: discord.Interaction, step: int):
+        self.page += step
+        rows = await self.load()
+        if not rows:
+            self.page -= step
+            await interaction.response.defer()
+            return
+        await interaction.response.edit_message(embed=self.render(rows, self.page), view=self)
+
+    @discord.ui.button(label="Anterior", style=discord.ButtonStyle.secondary, emoji="⬅️")
+    @timed("view")
+    async def anterior(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._go(interaction, -1)
+
+    @discord.ui.button(label="Próxima", style=discord.ButtonStyle.secondary, emoji="➡️")
+    @timed("view")
+    async def proxima(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._go(interaction, 1)
+
 # Comandos de prefixo
 @bot.command(name='test')
 async def test_command(ctx):
@@ -500,24 +541,12 @@ async def config_command(ctx, log_channel: discord.TextChannel = None, staff_rol
     if not ctx.author.guild_permissions.administrator:
         await ctx.send("❌ Você precisa ser administrador!")
         return
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT ticket_category_id, log_channel_id, staff_role_id FROM bot_config WHERE guild_id = ?', (str(ctx.guild.id),))
-    row = cursor.fetchone()
-    ticket_category_id = row[0] if row else None
-    log_channel_id = str(log_channel.id) if log_channel else (row[1] if row else None)
-    staff_role_id = str(staff_role.id) if staff_role else (row[2] if row else None)
-    cursor.execute('''
-        INSERT OR REPLACE INTO bot_config (guild_id, ticket_category_id, log_channel_id, staff_role_id)
-        VALUES (?, ?, ?, ?)
-    ''', (
-        str(ctx.guild.id),
-        ticket_category_id,
-        log_channel_id,
-        staff_role_id
-    ))
-    conn.commit()
-    conn.close()
+    fields = {}
+    if log_channel:
+        fields['log_channel_id'] = str(log_channel.id)
+    if staff_role:
+        fields['staff_role_id'] = str(staff_role.id)
+    await config_cache.update(ctx.guild.id, **fields)
     
     embed = discord.Embed(title="⚙️ Configuração Atualizada", color=discord.Color.green())
     if log_channel:
@@ -527,46 +556,175 @@ async def config_command(ctx, log_channel: discord.TextChannel = None, staff_rol
     
     await ctx.send(embed=embed)
 
+# Valores lidos na hora da coleta das métricas (estado atual de cada serviço)
+def register_metric_gauges():
+    metrics.gauge(
+        "bot_queue_length", "Tickets na fila de espera, por servidor",
+        lambda: {(("guild", guild_id),): size for guild_id, size in queue_engine.sizes().items()}
+    )
+    metrics.gauge("bot_log_dispatch_pending", "Embeds de log aguardando envio ao canal de logs", lambda: log_dispatcher.stats()["pending"])
+    metrics.gauge("bot_log_writer_pending", "Registros de log aguardando gravação no banco", lambda: log_writer.pending_count)
+    metrics.gauge("bot_scheduled_actions_pending", "Ações agendadas pendentes", lambda: scheduler.stats()["pending"])
+    metrics.gauge("bot_gateway_latency_seconds", "Latência do heartbeat do gateway", lambda: bot.latency if math.isfinite(bot.latency) else None)
+    metrics.gauge("bot_guilds", "Servidores conectados", lambda: len(bot.guilds))
+    metrics.gauge(
+        "bot_shard_up", "Shard conectado ao gateway (1) ou não (0), por shard deste processo",
+        lambda: {(("shard", item["shard"]),): int(item["online"]) for item in shard_monitor.stats(bot)}
+    )
+    metrics.gauge(
+        "bot_shard_latency_seconds", "Latência do heartbeat de cada shard",
+        lambda: {(("shard", item["shard"]),): item["latency"] for item in shard_monitor.stats(bot) if item["latency"] is not None}
+    )
+    metrics.gauge(
+        "bot_shard_event_rate", "Eventos tratados por segundo no último minuto, por shard",
+        lambda: {(("shard", item["shard"]),): item["rate"] for item in shard_monitor.stats(bot)}
+    )
+
+# Executado uma única vez antes de conectar ao gateway
+async def setup_hook():
+    await config_cache.load()
+    await queue_engine.load()
+    await ticket_stats.load()
+    await suggestion_store.load()
+    await stream_monitor.load(shard_config.owns_guild)
+    await scheduler.load(shard_config.owns_guild)
+    shard_monitor.attach(bot)
+    register_metric_gauges()
+    await metrics.start_server()
+    traffic_recorder.start()
+    log_writer.start()
+    suggestion_store.start()
+    db.start_checkpoints()
+    scheduler.start()
+    # Botão do painel da fila continua funcionando após reiniciar
+    queue_view = TicketQueueView()
+    bot.add_view(queue_view)
+    queue_dashboard.attach(bot, render_queue_dashboard, queue_view)
+
+bot.setup_hook = setup_hook
+
+# Finaliza os serviços em segundo plano antes de desconectar
+_discord_close = bot.close
+
+async def close():
+    await scheduler.stop()
+    await queue_dashboard.stop()
+    await suggestion_store.stop()
+    await log_dispatcher.stop()
+    await log_writer.stop()
+    await traffic_recorder.stop()
+    await db.stop_checkpoints()
+    await metrics.stop_server()
+    await _discord_close()
+
+bot.close = close
+
+# Toda interação recebida (comandos, botões, formulários); só usada pela gravação de tráfego
+@bot.event
+async def on_interaction(interaction: discord.Interaction):
+    shard_monitor.event(interaction.guild_id, "interaction")
+    if traffic_recorder.enabled:
+        traffic_recorder.interaction(interaction)
+
+# Fim de um comando de barra bem-sucedido (o início é marcado pela árvore de comandos)
+@bot.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    record_command(interaction, command)
+
+# Conexão de cada shard ao gateway (só disparados pelo AutoShardedBot)
+@bot.event
+async def on_shard_connect(shard_id: int):
+    shard_monitor.attach(bot)
+    shard_monitor.change(shard_id, "connect")
+
+@bot.event
+async def on_shard_disconnect(shard_id: int):
+    shard_monitor.change(shard_id, "disconnect")
+    print(f"⚠️ Shard {shard_id} desconectado do gateway")
+
+@bot.event
+async def on_shard_ready(shard_id: int):
+    shard_monitor.change(shard_id, "ready")
+    print(f"🧩 Shard {shard_id} pronto")
+
+@bot.event
+async def on_shard_resumed(shard_id: int):
+    shard_monitor.change(shard_id, "resumed")
+    print(f"🔁 Shard {shard_id} retomou a sessão")
+
 @bot.event
 async def on_ready():
-    print(f'🤖 {bot.user} está online!')
+    print(f'🤖 {bot.user} está online! ({shard_config.describe()})')
+    # Painéis da fila refletem a fila carregada do banco
+    for guild in bot.guilds:
+        if config_cache.get(guild.id).fila_channel_id:
+            queue_dashboard.mark_dirty(guild.id)
     
+    # Com vários processos, só o principal sincroniza (a árvore de comandos é a mesma em todos)
+    if not shard_config.primary:
+        return
+    # Só sincroniza se a árvore de comandos mudou (on_ready também roda a cada reconexão)
     try:
-        synced = await bot.tree.sync()
-        print(f'📋 Comandos sincronizados: {len(synced)} comandos')
-        for cmd in synced:
-            print(f"   • /{cmd.name}")
+        synced = await command_sync.sync(bot)
+        if synced is None:
+            print(f'📋 Comandos sem alterações ({command_sync.scope}); sincronização ignorada')
+        else:
+            print(f'📋 Comandos sincronizados ({command_sync.scope}): {len(synced)} comandos')
+            for cmd in synced:
+                print(f"   • /{cmd.name}")
     except Exception as e:
         print(f'❌ Erro ao sincronizar comandos: {e}')
 
 @bot.event
 async def on_message(message):
-    if message.author.bot:
+    shard_monitor.event(message.guild.id if message.guild else None, "message")
+    if traffic_recorder.enabled:
+        traffic_recorder.message(message, message.channel.id in config_cache.suggestion_channels)
+    # Caminho rápido: sem I/O para mensagens fora dos canais de sugestão
+    if message.author.bot or message.channel.id not in config_cache.suggestion_channels:
         return
 
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT suggestion_channel_id FROM bot_config WHERE guild_id = ?", (str(message.guild.id),))
-    result = cursor.fetchone()
-    conn.close()
+    try:
+        await message.delete()
+        
+        embed = discord.Embed(
+            description=message.content,
+            color=discord.Color.yellow(),
+            timestamp=datetime.now()
+        )
+        embed.set_author(name=f"Sugestão de {message.author.display_name}", icon_url=message.author.display_avatar.url)
+        embed.set_footer(text=f"ID da Sugestão: {message.id}")
+
+        sent_message = await message.channel.send(embed=embed)
+        await suggestion_store.create(
+            message.id,
+            message.guild.id,
+            message.channel.id,
+            sent_message.id,
+            message.author.id,
+            message.author.display_name,
+            message.content
+        )
+        await sent_message.add_reaction("👍")
+        await sent_message.add_reaction("👎")
+    except Exception as e:
+        print(f"Erro no sistema de sugestões: {e}")
 
-    if result and result[0] and message.channel.id == int(result[0]):
-        try:
-            await message.delete()
-            
-            embed = discord.Embed(
-                description=message.content,
-                color=discord.Color.yellow(),
-                timestamp=datetime.now()
-            )
-            embed.set_author(name=f"Sugestão de {message.author.display_name}", icon_url=message.author.display_avatar.url)
-            embed.set_footer(text=f"ID da Sugestão: {message.id}")
+# Votos nas sugestões: contados em memória pelo suggestion_store (sem I/O por reação)
+@bot.event
+async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+    shard_monitor.event(payload.guild_id, "reaction")
+    # Caminho rápido: ignora reações fora das sugestões e as reações iniciais do próprio bot
+    if not suggestion_store.is_suggestion_message(payload.message_id) or payload.user_id == bot.user.id:
+        return
+    suggestion_store.vote(payload.message_id, str(payload.emoji), 1)
 
-            sent_message = await message.channel.send(embed=embed)
-            await sent_message.add_reaction("👍")
-            await sent_message.add_reaction("👎")
-        except Exception as e:
-            print(f"Erro no sistema de sugestões: {e}")
+@bot.event
+async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
+    shard_monitor.event(payload.guild_id, "reaction")
+    if not suggestion_store.is_suggestion_message(payload.message_id) or payload.user_id == bot.user.id:
+        return
+    suggestion_store.vote(payload.message_id, str(payload.emoji), -1)
 
 # Comandos Slash
 @bot.tree.command(name="config-bot", description="Configurar canais e roles do bot (apenas administradores)")
@@ -584,24 +742,12 @@ async def config_bot(
         await interaction.response.send_message("❌ Você precisa ser administrador para usar este comando.", ephemeral=True)
         return
     
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT ticket_category_id, log_channel_id, staff_role_id FROM bot_config WHERE guild_id = ?', (str(interaction.guild.id),))
-    row = cursor.fetchone()
-    ticket_category_id = row[0] if row else None
-    log_channel_id = str(log_channel.id) if log_channel else (row[1] if row else None)
-    staff_role_id = str(staff_role.id) if staff_role else (row[2] if row else None)
-    cursor.execute('''
-        INSERT OR REPLACE INTO bot_config (guild_id, ticket_category_id, log_channel_id, staff_role_id)
-        VALUES (?, ?, ?, ?)
-    ''', (
-        str(interaction.guild.id),
-        ticket_category_id,
-        log_channel_id,
-        staff_role_id
-    ))
-    conn.commit()
-    conn.close()
+    fields = {}
+    if log_channel:
+        fields['log_channel_id'] = str(log_channel.id)
+    if staff_role:
+        fields['staff_role_id'] = str(staff_role.id)
+    await config_cache.update(interaction.guild.id, **fields)
     
     embed = discord.Embed(
         title="⚙️ Configuração Atualizada",
@@ -645,37 +791,24 @@ async def setup_suporte(interaction: discord.Interaction):
 async def logs_ticket(interaction: discord.Interaction, ticket_id: int):
     is_admin = interaction.user.guild_permissions.administrator
     
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT user_id FROM tickets WHERE id = ?', (ticket_id,))
-    ticket_result = cursor.fetchone()
+    ticket_result = await db.fetchone('SELECT user_id FROM tickets WHERE id = ?', (ticket_id,))
     if not ticket_result:
         await interaction.response.send_message(f"❌ Ticket #{ticket_id} não encontrado.", ephemeral=True)
-        conn.close()
         return
     is_owner = str(interaction.user.id) == ticket_result[0]
     
-    cursor.execute('SELECT staff_role_id FROM bot_config WHERE guild_id = ?', (str(interaction.guild.id),))
-    staff_result = cursor.fetchone()
+    staff_role_id = config_cache.get(interaction.guild.id).staff_role_id
     is_staff = False
-    if staff_result and staff_result[0]:
-        staff_role = interaction.guild.get_role(int(staff_result[0]))
+    if staff_role_id:
+        staff_role = interaction.guild.get_role(int(staff_role_id))
         if staff_role and staff_role in interaction.user.roles:
             is_staff = True
     
     if not (is_owner or is_admin or is_staff):
         await interaction.response.send_message("❌ Você não tem permissão para ver os logs deste ticket.", ephemeral=True)
-        conn.close()
         return
     
-    cursor.execute('''
-        SELECT action, username, details, timestamp 
-        FROM ticket_logs 
-        WHERE ticket_id = ? 
-        ORDER BY timestamp ASC
-    ''', (ticket_id,))
-    logs = cursor.fetchall()
-    conn.close()
+    logs = await log_writer.fetch_logs(ticket_id)
     
     if not logs:
         await interaction.response.send_message(f"📋 Nenhum log encontrado para o ticket #{ticket_id}.", ephemeral=True)
@@ -688,7 +821,7 @@ async def logs_ticket(interaction: discord.Interaction, ticket_id: int):
     )
     
     log_text = ""
-    emoji_map = {"CRIADO": "🎫", "FECHADO": "🔒", "USUARIO_ADICIONADO": "➕", "MENSAGEM": "💬"}
+    emoji_map = {"CRIADO": "🎫", "FECHADO": "🔒", "USUARIO_ADICIONADO": "➕", "MENSAGEM": "💬", "TRANSCRICAO": "🗂️"}
     for action, username, details, timestamp in logs:
         emoji = emoji_map.get(action, "📝")
         details_text = f" - {details}" if details else ""
@@ -701,67 +834,92 @@ async def logs_ticket(interaction: discord.Interaction, ticket_id: int):
     
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
+CATEGORY_EMOJIS = {
+    "ticket_geral": "📋",
+    "denuncia": "⭕",
+    "recrutamento": "💬",
+    "suporte_tecnico": "🔧"
+}
+
+# Embed de uma página do /listar-tickets
+def render_ticket_list(tickets, page: int):
+    embed = discord.Embed(
+        title="📋 Lista de Tickets",
+        color=discord.Color.blue(),
+        timestamp=datetime.now()
+    )
+    for ticket in tickets:
+        ticket_id, username, category, title, ticket_status, created_at = ticket
+        status_emoji = "🟢" if ticket_status == "aberto" else "🔴"
+        category_emoji = CATEGORY_EMOJIS.get(category, "📋")
+        embed.add_field(
+            name=f"{status_emoji} Ticket #{ticket_id}",
+            value=f"{category_emoji} **{title}**\nPor: {username}\nCriado: {created_at[:10]}",
+            inline=True
+        )
+    embed.set_footer(text=f"Página {page} • Tickets mais recentes primeiro")
+    return embed
+
 @bot.tree.command(name="listar-tickets", description="Listar todos os tickets (apenas staff)")
 @app_commands.describe(status="Filtrar por status", categoria="Filtrar por categoria")
 @app_commands.checks.has_permissions(administrator=True)
 async def listar_tickets(interaction: discord.Interaction, status: str = None, categoria: str = None):
     is_admin = interaction.user.guild_permissions.administrator
     
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT staff_role_id FROM bot_config WHERE guild_id = ?', (str(interaction.guild.id),))
-    staff_result = cursor.fetchone()
+    staff_role_id = config_cache.get(interaction.guild.id).staff_role_id
     is_staff = False
-    if staff_result and staff_result[0]:
-        staff_role = interaction.guild.get_role(int(staff_result[0]))
+    if staff_role_id:
+        staff_role = interaction.guild.get_role(int(staff_role_id))
         if staff_role and staff_role in interaction.user.roles:
             is_staff = True
     if not (is_admin or is_staff):
         await interaction.response.send_message("❌ Você precisa ser staff para usar este comando.", ephemeral=True)
-        conn.close()
         return
     
-    query = "SELECT id, username, category, title, status, created_at FROM tickets WHERE 1=1"
-    params = []
+    filters = {}
     if status:
-        query += " AND status = ?"
-        params.append(status)
+        filters["status"] = status
     if categoria:
-        query += " AND category = ?"
-        params.append(categoria)
-    query += " ORDER BY created_at DESC LIMIT 20"
-    
-    cursor.execute(query, params)
-    tickets = cursor.fetchall()
-    conn.close()
+        filters["category"] = categoria
+    view = TicketPageView(interaction.user.id, filters, page_size=20, render=render_ticket_list)
+    tickets = await view.start()
     
     if not tickets:
         await interaction.response.send_message("📋 Nenhum ticket encontrado com os filtros especificados.", ephemeral=True)
         return
     
-    embed = discord.Embed(
-        title="📋 Lista de Tickets",
-        color=discord.Color.blue(),
-        timestamp=datetime.now()
-    )
-    category_emojis = {
-        "ticket_geral": "📋",
-        "denuncia": "⭕",
-        "recrutamento": "💬",
-        "suporte_tecnico": "🔧"
-    }
-    for ticket in tickets:
-        ticket_id, username, category, title, ticket_status, created_at = ticket
-        status_emoji = "🟢" if ticket_status == "aberto" else "🔴"
-        category_emoji = category_emojis.get(category, "📋")
-        embed.add_field(
-            name=f"{status_emoji} Ticket #{ticket_id}",
-            value=f"{category_emoji} **{title}**\nPor: {username}\nCriado: {created_at[:10]}",
-            inline=True
-        )
-    embed.set_footer(text="Mostrando até 20 tickets mais recentes")
+    await interaction.response.send_message(embed=render_ticket_list(tickets, view.page), view=view, ephemeral=True)
+
+@bot.tree.command(name="buscar-tickets", description="Buscar tickets por texto no título, descrição ou logs (apenas staff)")
+@app_commands.describe(termo="Palavras a buscar", status="Filtrar por status")
+@app_commands.checks.has_permissions(administrator=True)
+async def buscar_tickets(interaction: discord.Interaction, termo: str, status: str = None):
+    is_admin = interaction.user.guild_permissions.administrator
     
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    staff_role_id = config_cache.get(interaction.guild.id).staff_role_id
+    is_staff = False
+    if staff_role_id:
+        staff_role = interaction.guild.get_role(int(staff_role_id))
+        if staff_role and staff_role in interaction.user.roles:
+            is_staff = True
+    if not (is_admin or is_staff):
+        await interaction.response.send_message("❌ Você precisa ser staff para usar este comando.", ephemeral=True)
+        return
+    
+    def render(tickets, page: int):
+        embed = render_ticket_list(tickets, page)
+        embed.title = f"🔎 Busca: {termo[:200]}"
+        embed.set_footer(text=f"Página {page} • Mais relevantes primeiro")
+        return embed
+    
+    view = SearchResultsView(interaction.user.id, termo, status, page_size=10, render=render)
+    tickets = await view.load()
+    
+    if not tickets:
+        await interaction.response.send_message(f"🔎 Nenhum ticket encontrado para `{termo[:200]}`.", ephemeral=True)
+        return
+    
+    await interaction.response.send_message(embed=render(tickets, view.page), view=view, ephemeral=True)
 
 @bot.tree.command(name="stats-tickets", description="Ver estatísticas dos tickets (apenas administradores)")
 @app_commands.checks.has_permissions(administrator=True)
@@ -770,21 +928,16 @@ async def stats_tickets(interaction: discord.Interaction):
         await interaction.response.send_message("❌ Você precisa ser administrador para usar este comando.", ephemeral=True)
         return
     try:
-        conn = sqlite3.connect('tickets.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM tickets')
-        total_tickets = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM tickets WHERE status = "aberto"')
-        tickets_abertos = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM tickets WHERE status = "fechado"')
-        tickets_fechados = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(DISTINCT user_id) FROM tickets')
-        usuarios_unicos = cursor.fetchone()[0]
-        cursor.execute('SELECT category, COUNT(*) FROM tickets GROUP BY category ORDER BY COUNT(*) DESC')
-        stats_categoria = cursor.fetchall()
-        cursor.execute('SELECT COUNT(*) FROM tickets WHERE DATE(created_at) = DATE("now")')
-        tickets_hoje = cursor.fetchone()[0]
-        conn.close()
+        # Com vários processos, os contadores em memória não incluem os tickets dos outros
+        if shard_config.clustered:
+            await ticket_stats.refresh()
+        stats = ticket_stats.snapshot()
+        total_tickets = stats["total"]
+        tickets_abertos = stats["abertos"]
+        tickets_fechados = stats["fechados"]
+        usuarios_unicos = stats["usuarios"]
+        stats_categoria = stats["categorias"]
+        tickets_hoje = stats["hoje"]
         
         embed = discord.Embed(
             title="📊 Estatísticas dos Tickets",
@@ -816,14 +969,51 @@ async def stats_tickets(interaction: discord.Interaction):
     except Exception as e:
         await interaction.response.send_message(f"❌ Erro ao buscar estatísticas: {e}", ephemeral=True)
 
+@bot.tree.command(name="recalcular-stats", description="Recalcula as estatísticas dos tickets do zero (apenas administradores)")
+@app_commands.checks.has_permissions(administrator=True)
+async def recalcular_stats(interaction: discord.Interaction):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("❌ Você precisa ser administrador para usar este comando.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+    try:
+        if shard_config.clustered:
+            await ticket_stats.refresh()
+        drift = await ticket_stats.rebuild()
+        if not drift:
+            await interaction.followup.send("✅ Estatísticas recalculadas: nenhuma diferença encontrada.", ephemeral=True)
+            return
+        drift_text = "\n".join(f"`{key}`: {before} → {after}" for key, (before, after) in sorted(drift.items()))
+        if len(drift_text) > 1900:
+            drift_text = drift_text[:1900] + "..."
+        await interaction.followup.send(f"⚠️ Estatísticas recalculadas. Diferenças corrigidas:\n{drift_text}", ephemeral=True)
+    except Exception as e:
+        await interaction.followup.send(f"❌ Erro ao recalcular estatísticas: {e}", ephemeral=True)
+
+# Embed de uma página do /meus-tickets
+def render_my_tickets(tickets, page: int):
+    embed = discord.Embed(
+        title="📋 Seus Tickets",
+        color=discord.Color.blue(),
+        timestamp=datetime.now()
+    )
+    for ticket in tickets:
+        ticket_id, _, category, title, status, created_at = ticket
+        status_emoji = "🟢" if status == "aberto" else "🔴"
+        category_emoji = CATEGORY_EMOJIS.get(category, "📋")
+        embed.add_field(
+            name=f"{status_emoji} Ticket #{ticket_id}",
+            value=f"{category_emoji} **{title}**\nStatus: {status}\nCriado: {created_at[:10]}",
+            inline=True
+        )
+    embed.set_footer(text=f"Página {page} • Use /logs-ticket <id> para ver logs detalhados")
+    return embed
+
 @bot.tree.command(name="meus-tickets", description="Ver todos os seus tickets")
 async def meus_tickets(interaction: discord.Interaction):
     try:
-        conn = sqlite3.connect('tickets.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, category, title, status, created_at FROM tickets WHERE user_id = ? ORDER BY created_at DESC', (str(interaction.user.id),))
-        tickets = cursor.fetchall()
-        conn.close()
+        view = TicketPageView(interaction.user.id, {"user_id": str(interaction.user.id)}, page_size=10, render=render_my_tickets)
+        tickets = await view.start()
         
         if not tickets:
             embed = discord.Embed(
@@ -832,31 +1022,10 @@ async def meus_tickets(interaction: discord.Interaction):
                 color=discord.Color.blue()
             )
             embed.set_footer(text="Use o painel de suporte para criar seu primeiro ticket!")
-        else:
-            embed = discord.Embed(
-                title="📋 Seus Tickets",
-                color=discord.Color.blue(),
-                timestamp=datetime.now()
-            )
-            category_emojis = {
-                "ticket_geral": "📋",
-                "denuncia": "⭕",
-                "recrutamento": "💬",
-                "suporte_tecnico": "🔧"
-            }
-            for ticket in tickets[:10]:
-                ticket_id, category, title, status, created_at = ticket
-                status_emoji = "🟢" if status == "aberto" else "🔴"
-                category_emoji = category_emojis.get(category, "📋")
-                embed.add_field(
-                    name=f"{status_emoji} Ticket #{ticket_id}",
-                    value=f"{category_emoji} **{title}**\nStatus: {status}\nCriado: {created_at[:10]}",
-                    inline=True
-                )
-            footer_text = f"Mostrando 10 de {len(tickets)} tickets" if len(tickets) > 10 else "Use /logs-ticket <id> para ver logs detalhados"
-            embed.set_footer(text=footer_text)
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
         
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.response.send_message(embed=render_my_tickets(tickets, view.page), view=view, ephemeral=True)
     except Exception as e:
         await interaction.response.send_message(f"❌ Erro ao buscar tickets: {e}", ephemeral=True)
 
@@ -865,37 +1034,26 @@ async def meus_tickets(interaction: discord.Interaction):
 async def ver_ticket(interaction: discord.Interaction, ticket_id: int):
     try:
         is_admin = interaction.user.guild_permissions.administrator
-        conn = sqlite3.connect('tickets.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT user_id FROM tickets WHERE id = ?', (ticket_id,))
-        ticket_owner_result = cursor.fetchone()
+        ticket_data = await db.fetchone('SELECT user_id, username, category, title, description, status, channel_id, created_at, assigned_to FROM tickets WHERE id = ?', (ticket_id,))
 
-        if not ticket_owner_result:
+        if not ticket_data:
             await interaction.response.send_message(f"❌ Ticket #{ticket_id} não foi encontrado.", ephemeral=True)
-            conn.close()
             return
 
-        is_owner = str(interaction.user.id) == ticket_owner_result[0]
+        is_owner = str(interaction.user.id) == ticket_data[0]
 
-        cursor.execute('SELECT staff_role_id FROM bot_config WHERE guild_id = ?', (str(interaction.guild.id),))
-        staff_result = cursor.fetchone()
+        staff_role_id = config_cache.get(interaction.guild.id).staff_role_id
         is_staff = False
-        if staff_result and staff_result[0]:
-            staff_role = interaction.guild.get_role(int(staff_result[0]))
+        if staff_role_id:
+            staff_role = interaction.guild.get_role(int(staff_role_id))
             if staff_role and staff_role in interaction.user.roles:
                 is_staff = True
 
         if not (is_owner or is_admin or is_staff):
             await interaction.response.send_message("❌ Você não tem permissão para visualizar este ticket.", ephemeral=True)
-            conn.close()
             return
 
-        cursor.execute('SELECT user_id, username, category, title, description, status, channel_id, created_at FROM tickets WHERE id = ?', (ticket_id,))
-        ticket_data = cursor.fetchone()
-        conn.close()
-
-        user_id, username, category, title, description, status, channel_id, created_at = ticket_data
+        user_id, username, category, title, description, status, channel_id, created_at, assigned_to_id = ticket_data
         
         category_map = {
             "ticket_geral": "📋 Suporte Geral",
@@ -921,10 +1079,7 @@ async def ver_ticket(interaction: discord.Interaction, ticket_id: int):
         embed.add_field(name="📂 Categoria", value=category_name, inline=True)
         embed.add_field(name="🔄 Status", value=status_text, inline=True)
         
-        cursor.execute('SELECT assigned_to FROM tickets WHERE id = ?', (ticket_id,))
-        assigned_result = cursor.fetchone()
-        if assigned_result and assigned_result[0]:
-            assigned_to_id = assigned_result[0]
+        if assigned_to_id:
             assignee = interaction.guild.get_member(int(assigned_to_id))
             embed.add_field(name="👨‍💻 Atribuído a", value=assignee.mention if assignee else "ID: " + assigned_to_id, inline=True)
 
@@ -943,55 +1098,45 @@ async def ver_ticket(interaction: discord.Interaction, ticket_id: int):
 @bot.tree.command(name="fechar-ticket", description="Fechar o ticket deste canal (apenas staff, admin ou dono)")
 async def fechar_ticket(interaction: discord.Interaction):
     try:
-        conn = sqlite3.connect('tickets.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, user_id, title, status FROM tickets WHERE channel_id = ?', (str(interaction.channel.id),))
-        ticket = cursor.fetchone()
+        ticket = await db.fetchone('SELECT id, user_id, title, status FROM tickets WHERE channel_id = ?', (str(interaction.channel.id),))
         if not ticket:
             await interaction.response.send_message("❌ Este canal não é um ticket válido.", ephemeral=True)
-            conn.close()
             return
         ticket_id, user_id, title, status = ticket
         
         if status == "fechado":
             await interaction.response.send_message("⚠️ Este ticket já está fechado.", ephemeral=True)
-            conn.close()
             return
             
         is_owner = str(interaction.user.id) == user_id
         is_admin = interaction.user.guild_permissions.administrator
         
-        cursor.execute('SELECT staff_role_id FROM bot_config WHERE guild_id = ?', (str(interaction.guild.id),))
-        staff_result = cursor.fetchone()
+        staff_role_id = config_cache.get(interaction.guild.id).staff_role_id
         
         is_staff = False
-        if staff_result and staff_result[0]:
-            staff_role = interaction.guild.get_role(int(staff_result[0]))
+        if staff_role_id:
+            staff_role = interaction.guild.get_role(int(staff_role_id))
             if staff_role and staff_role in interaction.user.roles:
                 is_staff = True
         
         if not (is_owner or is_admin or is_staff):
             await interaction.response.send_message("❌ Você não tem permissão para fechar este ticket.", ephemeral=True)
-            conn.close()
             return
 
         # Se admin ou staff fecha, mostra o modal
         if is_admin or is_staff:
             modal = CloseTicketModal(ticket_id=ticket_id, ticket_owner_id=int(user_id), ticket_title=title)
             await interaction.response.send_modal(modal)
-            conn.close()
             return
 
         # Se o dono fecha, o ticket fecha diretamente
         if is_owner:
-            await interaction.response.defer() 
-
-            cursor.execute('''
-                UPDATE tickets 
-                SET status = "fechado", updated_at = CURRENT_TIMESTAMP, closed_by = ?, closed_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (str(interaction.user.id), ticket_id))
-            conn.commit()
+            # Fecha antes de responder: se outra pessoa fechou ao mesmo tempo, o aviso sai só para quem clicou
+            if not await ticket_stats.close_ticket(ticket_id, interaction.user.id):
+                await interaction.response.send_message("⚠️ Este ticket já foi fechado.", ephemeral=True)
+                return
+
+            await interaction.response.defer()
             
             await create_log(ticket_id, "FECHADO", interaction.user)
             
@@ -1013,9 +1158,8 @@ async def fechar_ticket(interaction: discord.Interaction):
             log_embed.add_field(name="📝 Título", value=title, inline=False)
             await send_log_to_channel(interaction.guild, log_embed)
             
-            await asyncio.sleep(10)
-            await interaction.channel.delete(reason=f"Ticket #{ticket_id} fechado")
-            conn.close()
+            # Transcrição e exclusão do canal agendadas (executadas em segundo plano)
+            await schedule_ticket_channel_deletion(interaction.channel, ticket_id, title)
 
     except Exception as e:
         if not interaction.response.is_done():
@@ -1039,9 +1183,15 @@ class CloseTicketModal(discord.ui.Modal, title="Fechar Ticket com Motivo"):
         )
         self.add_item(self.reason)
 
+    @timed("modal")
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
 
+        # Fechar o ticket (antes da DM: num fechamento simultâneo, só um dos dois segue daqui)
+        if not await ticket_stats.close_ticket(self.ticket_id, interaction.user.id):
+            await interaction.followup.send("⚠️ Este ticket já foi fechado.", ephemeral=True)
+            return
+
         # Enviar DM para o usuário
         ticket_owner = interaction.guild.get_member(self.ticket_owner_id)
         if ticket_owner:
@@ -1063,17 +1213,6 @@ class CloseTicketModal(discord.ui.Modal, title="Fechar Ticket com Motivo"):
             await interaction.channel.send(f"⚠️ Não foi possível notificar o usuário por DM, pois ele não está mais no servidor.")
             print(f"[ERRO DM] Usuário {self.ticket_owner_id} não encontrado no servidor ao fechar ticket.")
         
-        # Fechar o ticket
-        conn = sqlite3.connect('tickets.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE tickets 
-            SET status = "fechado", updated_at = CURRENT_TIMESTAMP, closed_by = ?, closed_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (str(interaction.user.id), self.ticket_id))
-        conn.commit()
-        
         await create_log(self.ticket_id, "FECHADO", interaction.user, f"Motivo: {self.reason.value}")
         
         close_embed = discord.Embed(
@@ -1095,11 +1234,10 @@ class CloseTicketModal(discord.ui.Modal, title="Fechar Ticket com Motivo"):
         log_embed.add_field(name="📄 Motivo", value=self.reason.value, inline=False)
         await send_log_to_channel(interaction.guild, log_embed)
         
-        await asyncio.sleep(10)
-        await interaction.channel.delete(reason=f"Ticket #{self.ticket_id} fechado")
+        # Transcrição e exclusão do canal agendadas (executadas em segundo plano)
+        await schedule_ticket_channel_deletion(interaction.channel, self.ticket_id, self.ticket_title)
         
-        conn.close()
-        await interaction.followup.send("Ticket fechado com sucesso!", ephemeral=True)
+        await interaction.followup.send("Ticket fechado com sucesso! A transcrição será salva antes de o canal ser apagado.", ephemeral=True)
 
 @bot.tree.command(name="atribuir", description="Atribui um ticket a um membro da equipe.")
 @app_commands.describe(ticket_id="O ID do ticket a ser atribuído.", membro="O membro da equipe para atribuir o ticket.")
@@ -1108,19 +1246,14 @@ async def atribuir_ticket(interaction: discord.Interaction, ticket_id: int, memb
         await interaction.response.send_message("❌ Apenas administradores podem usar este comando.", ephemeral=True)
         return
 
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute("UPDATE tickets SET assigned_to = ? WHERE id = ?", (str(membro.id), ticket_id))
-    conn.commit()
+    await db.execute("UPDATE tickets SET assigned_to = ? WHERE id = ?", (str(membro.id), ticket_id))
     
-    cursor.execute("SELECT channel_id FROM tickets WHERE id = ?", (ticket_id,))
-    result = cursor.fetchone()
+    result = await db.fetchone("SELECT channel_id FROM tickets WHERE id = ?", (ticket_id,))
     if result and result[0]:
         channel = interaction.guild.get_channel(int(result[0]))
         if channel:
             await channel.send(f"✅ Este ticket foi atribuído a {membro.mention} por {interaction.user.mention}.")
 
-    conn.close()
     await interaction.response.send_message(f"✅ Ticket #{ticket_id} atribuído a {membro.mention}.", ephemeral=True)
 
 # --- Comandos de Template ---
@@ -1128,33 +1261,23 @@ async def atribuir_ticket(interaction: discord.Interaction, ticket_id: int, memb
 @app_commands.describe(nome="Nome curto para o template (sem espaços).", conteudo="O texto completo da resposta.")
 @app_commands.checks.has_permissions(administrator=True)
 async def criar_template(interaction: discord.Interaction, nome: str, conteudo: str):
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
     try:
-        cursor.execute("INSERT INTO response_templates (guild_id, name, content) VALUES (?, ?, ?)", (str(interaction.guild.id), nome.lower(), conteudo))
-        conn.commit()
+        await db.execute("INSERT INTO response_templates (guild_id, name, content) VALUES (?, ?, ?)", (str(interaction.guild.id), nome.lower(), conteudo))
         await interaction.response.send_message(f"✅ Template `{nome.lower()}` criado com sucesso!", ephemeral=True)
     except sqlite3.IntegrityError:
         await interaction.response.send_message(f"❌ Um template com o nome `{nome.lower()}` já existe.", ephemeral=True)
-    finally:
-        conn.close()
 
 @bot.tree.command(name="usar-template", description="Usa um template de resposta em um canal de ticket.")
 @app_commands.describe(nome="O nome do template a ser usado.")
 async def usar_template(interaction: discord.Interaction, nome: str):
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT content FROM response_templates WHERE guild_id = ? AND name = ?", (str(interaction.guild.id), nome.lower()))
-    template = cursor.fetchone()
-    conn.close()
+    template = await db.fetchone("SELECT content FROM response_templates WHERE guild_id = ? AND name = ?", (str(interaction.guild.id), nome.lower()))
 
     if not template:
         await interaction.response.send_message(f"❌ Template `{nome.lower()}` não encontrado.", ephemeral=True)
         return
     
     # Verifica se é um canal de ticket
-    cursor.execute("SELECT id FROM tickets WHERE channel_id = ?", (str(interaction.channel.id),))
-    is_ticket_channel = cursor.fetchone()
+    is_ticket_channel = await db.fetchone("SELECT id FROM tickets WHERE channel_id = ?", (str(interaction.channel.id),))
     if not is_ticket_channel:
         await interaction.response.send_message("❌ Este comando só pode ser usado em um canal de ticket.", ephemeral=True)
         return
@@ -1163,11 +1286,7 @@ async def usar_template(interaction: discord.Interaction, nome: str):
 
 @bot.tree.command(name="listar-templates", description="Lista todos os templates de resposta disponíveis.")
 async def listar_templates(interaction: discord.Interaction):
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM response_templates WHERE guild_id = ?", (str(interaction.guild.id),))
-    templates = cursor.fetchall()
-    conn.close()
+    templates = await db.fetchall("SELECT name FROM response_templates WHERE guild_id = ?", (str(interaction.guild.id),))
 
     if not templates:
         await interaction.response.send_message("📋 Nenhum template encontrado.", ephemeral=True)
@@ -1181,12 +1300,8 @@ async def listar_templates(interaction: discord.Interaction):
 @app_commands.describe(nome="O nome do template a ser deletado.")
 @app_commands.checks.has_permissions(administrator=True)
 async def deletar_template(interaction: discord.Interaction, nome: str):
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM response_templates WHERE guild_id = ? AND name = ?", (str(interaction.guild.id), nome.lower()))
-    changes = conn.total_changes
-    conn.commit()
-    conn.close()
+    cursor = await db.execute("DELETE FROM response_templates WHERE guild_id = ? AND name = ?", (str(interaction.guild.id), nome.lower()))
+    changes = cursor.rowcount
 
     if changes > 0:
         await interaction.response.send_message(f"✅ Template `{nome.lower()}` foi deletado com sucesso.", ephemeral=True)
@@ -1200,11 +1315,119 @@ async def refresh_bot(interaction: discord.Interaction):
         return
     await interaction.response.defer(ephemeral=True)
     try:
-        synced = await bot.tree.sync()
-        await interaction.followup.send(f"🔄 Bot atualizado! {len(synced)} comandos sincronizados.", ephemeral=True)
+        # Sincronização forçada, mesmo sem mudanças na árvore de comandos
+        synced = await command_sync.sync(bot, force=True)
+        await interaction.followup.send(f"🔄 Bot atualizado! {len(synced)} comandos sincronizados ({command_sync.scope}).", ephemeral=True)
     except Exception as e:
         await interaction.followup.send(f"❌ Erro ao atualizar bot: {e}", ephemeral=True)
 
+@bot.tree.command(name="status-bot", description="Mostra métricas internas do bot (apenas administradores)")
+@app_commands.checks.has_permissions(administrator=True)
+async def status_bot(interaction: discord.Interaction):
+    cache_stats = config_cache.stats()
+    embed = discord.Embed(
+        title="🩺 Status do Bot",
+        color=discord.Color.blue(),
+        timestamp=datetime.now()
+    )
+    embed.add_field(
+        name="⚙️ Cache de Configuração",
+        value=(
+            f"Servidores: {cache_stats['guilds']}\n"
+            f"Acertos: {cache_stats['hits']}\n"
+            f"Falhas: {cache_stats['misses']}\n"
+            f"Taxa de acerto: {cache_stats['hit_rate'] * 100:.1f}%"
+        ),
+        inline=True
+    )
+    queue_counts = queue_engine.category_counts(interaction.guild.id)
+    queue_text = "\n".join(f"{category}: {count}" for category, count in sorted(queue_counts.items())) or "Vazia"
+    dashboard_stats = queue_dashboard.stats()
+    queue_text += f"\n\nPainel: {dashboard_stats['requests']} pedidos → {dashboard_stats['edits']} edições"
+    embed.add_field(
+        name=f"🕒 Fila deste servidor ({queue_engine.size(interaction.guild.id)})",
+        value=queue_text,
+        inline=True
+    )
+    log_stats = log_writer.stats()
+    embed.add_field(
+        name="📝 Gravação de Logs",
+        value=(
+            f"Pendentes: {log_stats['pending']}\n"
+            f"Commits: {log_stats['commits']}\n"
+            f"Registros gravados: {log_stats['rows']}\n"
+            f"Descartados: {log_stats['dropped']}"
+        ),
+        inline=True
+    )
+    suggestion_stats = suggestion_store.stats()
+    embed.add_field(
+        name="💡 Sugestões",
+        value=(
+            f"Registradas: {suggestion_stats['suggestions']}\n"
+            f"Votos a gravar: {suggestion_stats['pending_votes']}\n"
+            f"Gravações em lote: {suggestion_stats['flushes']}"
+        ),
+        inline=True
+    )
+    stream_stats = stream_monitor.stats()
+    embed.add_field(
+        name="🔴 Lives",
+        value=(
+            f"Streamers monitorados: {stream_stats['streamers']}\n"
+            f"Destinos: {stream_stats['targets']}\n"
+            f"Anúncios enviados: {stream_stats['sent']} (falhas: {stream_stats['failed']})\n"
+            f"Anúncios repetidos evitados: {stream_stats['suppressed']}"
+        ),
+        inline=True
+    )
+    dispatch_stats = log_dispatcher.stats()
+    embed.add_field(
+        name="📨 Envio de Logs",
+        value=(
+            f"Pendentes: {dispatch_stats['pending']}\n"
+            f"Mensagens: {dispatch_stats['messages']}\n"
+            f"Embeds: {dispatch_stats['embeds']}\n"
+            f"Descartados: {dispatch_stats['dropped']}\n"
+            f"Limites atingidos: {dispatch_stats['rate_limited']}"
+        ),
+        inline=True
+    )
+    scheduler_stats = scheduler.stats()
+    embed.add_field(
+        name="⏰ Ações Agendadas",
+        value=(
+            f"Pendentes: {scheduler_stats['pending']}\n"
+            f"Em execução: {scheduler_stats['running']}\n"
+            f"Executadas: {scheduler_stats['executed']}\n"
+            f"Novas tentativas: {scheduler_stats['retried']} (abandonadas: {scheduler_stats['failed']})"
+        ),
+        inline=True
+    )
+    shard_lines = []
+    for item in shard_monitor.stats(bot):
+        latency = f"{item['latency'] * 1000:.0f} ms" if item["latency"] is not None else "—"
+        shard_lines.append(
+            f"{'🟢' if item['online'] else '🔴'} #{item['shard']}: {latency} • {item['rate']:.1f} ev/s • "
+            f"{item['events']} eventos • {item['disconnects']} queda(s)"
+        )
+    embed.add_field(
+        name=f"🧩 Shards ({shard_config.describe()})",
+        value="\n".join(shard_lines[:15]) + (f"\n… e mais {len(shard_lines) - 15}" if len(shard_lines) > 15 else ""),
+        inline=False
+    )
+    sync_stats = command_sync.stats()
+    embed.add_field(
+        name="📋 Comandos",
+        value=(
+            f"Escopo: {sync_stats['scope']}\n"
+            f"Sincronizações: {sync_stats['syncs']}\n"
+            f"Ignoradas (sem mudanças): {sync_stats['skipped']}"
+        ),
+        inline=True
+    )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
 # --- Comandos de Utilidade ---
 
 @bot.tree.command(name="limpar", description="Limpa um número de mensagens neste canal (apenas staff).")
@@ -1248,15 +1471,12 @@ class InfoPanelModal(discord.ui.Modal, title="Configurar Painel de Informações
         self.add_item(self.title_input)
         self.add_item(self.content_input)
 
+    @timed("modal")
     async def on_submit(self, interaction: discord.Interaction):
-        conn = sqlite3.connect('tickets.db')
-        cursor = conn.cursor()
-        cursor.execute('''
+        await db.execute('''
             INSERT OR REPLACE INTO info_panels (guild_id, name, title, content)
             VALUES (?, ?, ?, ?)
         ''', (str(interaction.guild.id), self.name_input.value.lower(), self.title_input.value, self.content_input.value))
-        conn.commit()
-        conn.close()
         await interaction.response.send_message(
             f"✅ Painel '{self.name_input.value.lower()}' foi configurado com sucesso!\n"
             f"Use `/postar-painel nome:{self.name_input.value.lower()}` para publicá-lo.",
@@ -1278,11 +1498,7 @@ async def criar_painel_cmd_error(interaction: discord.Interaction, error: app_co
 @app_commands.describe(nome="O nome único do painel que você criou.")
 @app_commands.checks.has_permissions(administrator=True)
 async def postar_painel(interaction: discord.Interaction, nome: str):
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT title, content FROM info_panels WHERE guild_id = ? AND name = ?", (str(interaction.guild.id), nome.lower()))
-    panel = cursor.fetchone()
-    conn.close()
+    panel = await db.fetchone("SELECT title, content FROM info_panels WHERE guild_id = ? AND name = ?", (str(interaction.guild.id), nome.lower()))
 
     if not panel:
         await interaction.response.send_message(f"❌ Painel com o nome '{nome}' não encontrado. Use `/criar-painel` primeiro.", ephemeral=True)
@@ -1303,48 +1519,53 @@ async def postar_painel_error(interaction: discord.Interaction, error: app_comma
 @app_commands.describe(canal_sugestoes="O canal onde os membros enviarão sugestões.", canal_aprovadas="O canal para onde as sugestões aprovadas serão enviadas.")
 @app_commands.checks.has_permissions(administrator=True)
 async def config_sugestoes(interaction: discord.Interaction, canal_sugestoes: discord.TextChannel, canal_aprovadas: discord.TextChannel):
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO bot_config (guild_id, suggestion_channel_id, approved_suggestion_channel_id) 
-        VALUES (?, ?, ?)
-        ON CONFLICT(guild_id) DO UPDATE SET
-        suggestion_channel_id = excluded.suggestion_channel_id,
-        approved_suggestion_channel_id = excluded.approved_suggestion_channel_id
-    ''', (str(interaction.guild.id), str(canal_sugestoes.id), str(canal_aprovadas.id)))
-    conn.commit()
-    conn.close()
+    await config_cache.update(
+        interaction.guild.id,
+        suggestion_channel_id=str(canal_sugestoes.id),
+        approved_suggestion_channel_id=str(canal_aprovadas.id)
+    )
     await interaction.response.send_message(f"✅ Canais de sugestão configurados com sucesso!\nSugestões em: {canal_sugestoes.mention}\nAprovadas em: {canal_aprovadas.mention}", ephemeral=True)
 
+# Busca a mensagem repostada de uma sugestão pendente; responde o erro e retorna None se não der
+async def fetch_pending_suggestion(interaction: discord.Interaction, id_sugestao: str):
+    suggestion = await suggestion_store.get(interaction.guild.id, id_sugestao)
+    if not suggestion:
+        await interaction.followup.send("❌ Sugestão não encontrada com este ID. Verifique o ID no rodapé da sugestão.", ephemeral=True)
+        return None
+    suggestion_id, _, channel_id, message_id, _, _, _, status = suggestion
+    if status != "pendente":
+        await interaction.followup.send(f"⚠️ Esta sugestão já foi {status}.", ephemeral=True)
+        return None
+    suggestion_channel = interaction.guild.get_channel(int(channel_id))
+    if suggestion_channel is None:
+        await interaction.followup.send("❌ O canal desta sugestão não existe mais.", ephemeral=True)
+        return None
+    try:
+        return await suggestion_channel.fetch_message(int(message_id))
+    except discord.NotFound:
+        await interaction.followup.send("❌ A mensagem desta sugestão foi apagada.", ephemeral=True)
+        return None
+
 @bot.tree.command(name="aprovar-sugestao", description="Aprova uma sugestão e a envia para o canal de aprovadas (admin).")
 @app_commands.describe(id_sugestao="O ID da mensagem original da sugestão.")
 @app_commands.checks.has_permissions(administrator=True)
 async def aprovar_sugestao(interaction: discord.Interaction, id_sugestao: str):
     await interaction.response.defer(ephemeral=True)
 
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT suggestion_channel_id, approved_suggestion_channel_id FROM bot_config WHERE guild_id = ?", (str(interaction.guild.id),))
-    config = cursor.fetchone()
-    conn.close()
+    config = config_cache.get(interaction.guild.id)
 
-    if not config or not config[0] or not config[1]:
+    if not config.suggestion_channel_id or not config.approved_suggestion_channel_id:
         await interaction.followup.send("❌ Os canais de sugestão não foram configurados. Use `/config-sugestoes`.", ephemeral=True)
         return
 
-    suggestion_channel_id, approved_channel_id = int(config[0]), int(config[1])
+    approved_channel_id = int(config.approved_suggestion_channel_id)
     
     try:
-        suggestion_channel = interaction.guild.get_channel(suggestion_channel_id)
-        # Tenta encontrar a mensagem pelo ID no rodapé do embed
-        async for message in suggestion_channel.history(limit=200):
-            if message.embeds:
-                embed = message.embeds[0]
-                if embed.footer and embed.footer.text == f"ID da Sugestão: {id_sugestao}":
-                    original_suggestion_message = message
-                    break
-        else: # Se o loop terminar sem 'break'
-            await interaction.followup.send("❌ Sugestão não encontrada com este ID. Verifique o ID no rodapé da sugestão.", ephemeral=True)
+        original_suggestion_message = await fetch_pending_suggestion(interaction, id_sugestao)
+        if original_suggestion_message is None:
+            return
+        if not await suggestion_store.review(id_sugestao.strip(), "aprovada", interaction.user.id):
+            await interaction.followup.send("⚠️ Esta sugestão acabou de ser revisada por outra pessoa.", ephemeral=True)
             return
 
         approved_channel = interaction.guild.get_channel(approved_channel_id)
@@ -1367,37 +1588,104 @@ async def aprovar_sugestao(interaction: discord.Interaction, id_sugestao: str):
     except Exception as e:
         await interaction.followup.send(f"❌ Ocorreu um erro: {e}", ephemeral=True)
 
+@bot.tree.command(name="rejeitar-sugestao", description="Rejeita uma sugestão (admin).")
+@app_commands.describe(id_sugestao="O ID da mensagem original da sugestão.", motivo="Motivo da rejeição (opcional).")
+@app_commands.checks.has_permissions(administrator=True)
+async def rejeitar_sugestao(interaction: discord.Interaction, id_sugestao: str, motivo: str = None):
+    await interaction.response.defer(ephemeral=True)
+
+    try:
+        original_suggestion_message = await fetch_pending_suggestion(interaction, id_sugestao)
+        if original_suggestion_message is None:
+            return
+        if not await suggestion_store.review(id_sugestao.strip(), "rejeitada", interaction.user.id, motivo):
+            await interaction.followup.send("⚠️ Esta sugestão acabou de ser revisada por outra pessoa.", ephemeral=True)
+            return
+
+        # Edita o embed original
+        original_embed = original_suggestion_message.embeds[0].copy()
+        original_embed.color = discord.Color.red()
+        original_embed.title = "❌ SUGESTÃO REJEITADA"
+        if motivo:
+            original_embed.add_field(name="📄 Motivo", value=motivo, inline=False)
+        await original_suggestion_message.edit(embed=original_embed, view=None)
+
+        await interaction.followup.send("✅ Sugestão rejeitada.", ephemeral=True)
+
+    except Exception as e:
+        await interaction.followup.send(f"❌ Ocorreu um erro: {e}", ephemeral=True)
+
+@bot.tree.command(name="top-sugestoes", description="Mostra as sugestões mais votadas do servidor.")
+@app_commands.describe(quantidade="Quantas sugestões mostrar (padrão: 10).")
+async def top_sugestoes(interaction: discord.Interaction, quantidade: app_commands.Range[int, 1, 25] = 10):
+    ranking = suggestion_store.top(interaction.guild.id, quantidade)
+    if not ranking:
+        await interaction.response.send_message("💡 Ainda não há sugestões neste servidor.", ephemeral=True)
+        return
+    # Textos das sugestões do ranking (consulta pela chave primária, sem histórico do canal)
+    ids = [suggestion_id for suggestion_id, _, _, _ in ranking]
+    rows = await db.fetchall(
+        f'SELECT id, author_name, content FROM suggestions WHERE id IN ({", ".join("?" for _ in ids)})',
+        ids
+    )
+    details = {suggestion_id: (author_name, content) for suggestion_id, author_name, content in rows}
+    status_emojis = {"pendente": "🟡", "aprovada": "✅"}
+    embed = discord.Embed(
+        title="🏆 Sugestões Mais Votadas",
+        color=discord.Color.gold(),
+        timestamp=datetime.now()
+    )
+    for position, (suggestion_id, upvotes, downvotes, status) in enumerate(ranking, start=1):
+        author_name, content = details.get(suggestion_id, ("?", ""))
+        content = content or ""
+        embed.add_field(
+            name=f"{position}. {status_emojis.get(status, '🟡')} Saldo {upvotes - downvotes:+d} (👍 {upvotes} • 👎 {downvotes})",
+            value=f"{content[:150]}{'...' if len(content) > 150 else ''}\nPor: {author_name} • ID: `{suggestion_id}`",
+            inline=False
+        )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
 # --- Comandos de Notificação de Live ---
 @bot.tree.command(name="config-live", description="Configura o anúncio de live para um membro (admin).")
 @app_commands.describe(streamer="O membro que será monitorado.", canal_anuncio="O canal onde o anúncio será enviado.", mensagem="Mensagem customizada. Use {streamer} e {url}.")
 @app_commands.checks.has_permissions(administrator=True)
 async def config_live(interaction: discord.Interaction, streamer: discord.Member, canal_anuncio: discord.TextChannel, mensagem: str = None):
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute('''
+    # Cada canal é um destino separado: o mesmo membro pode ser anunciado em vários canais e servidores
+    await db.execute('''
         INSERT INTO stream_notifications (guild_id, streamer_id, channel_id, custom_message) VALUES (?, ?, ?, ?)
-        ON CONFLICT(streamer_id) DO UPDATE SET
-        channel_id = excluded.channel_id,
+        ON CONFLICT(guild_id, streamer_id, channel_id) DO UPDATE SET
         custom_message = excluded.custom_message
     ''', (str(interaction.guild.id), str(streamer.id), str(canal_anuncio.id), mensagem))
-    conn.commit()
-    conn.close()
+    stream_monitor.add(streamer.id, interaction.guild.id, canal_anuncio.id, mensagem)
     await interaction.response.send_message(f"✅ Anúncios de live configurados para {streamer.mention} no canal {canal_anuncio.mention}.", ephemeral=True)
 
 @bot.tree.command(name="remover-live", description="Para de anunciar as lives de um membro (admin).")
-@app_commands.describe(streamer="O membro para remover da monitorização.")
+@app_commands.describe(streamer="O membro para remover da monitorização.", canal_anuncio="Remover só deste canal (padrão: todos os canais do servidor).")
 @app_commands.checks.has_permissions(administrator=True)
-async def remover_live(interaction: discord.Interaction, streamer: discord.Member):
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM stream_notifications WHERE streamer_id = ?", (str(streamer.id),))
-    conn.commit()
-    conn.close()
-    await interaction.response.send_message(f"✅ {streamer.mention} não será mais anunciado.", ephemeral=True)
+async def remover_live(interaction: discord.Interaction, streamer: discord.Member, canal_anuncio: discord.TextChannel = None):
+    if canal_anuncio:
+        cursor = await db.execute(
+            "DELETE FROM stream_notifications WHERE guild_id = ? AND streamer_id = ? AND channel_id = ?",
+            (str(interaction.guild.id), str(streamer.id), str(canal_anuncio.id))
+        )
+    else:
+        cursor = await db.execute(
+            "DELETE FROM stream_notifications WHERE guild_id = ? AND streamer_id = ?",
+            (str(interaction.guild.id), str(streamer.id))
+        )
+    if cursor.rowcount == 0:
+        await interaction.response.send_message(f"⚠️ {streamer.mention} não estava sendo anunciado aqui.", ephemeral=True)
+        return
+    stream_monitor.remove(streamer.id, interaction.guild.id, canal_anuncio.id if canal_anuncio else None)
+    await interaction.response.send_message(f"✅ {streamer.mention} não será mais anunciado{f' em {canal_anuncio.mention}' if canal_anuncio else ''}.", ephemeral=True)
 
 @bot.event
 async def on_presence_update(before, after):
-    if before.bot:
+    shard_monitor.event(after.guild.id, "presence")
+    if traffic_recorder.enabled:
+        traffic_recorder.presence(before, after, after.id in stream_monitor.targets)
+    # Caminho rápido: só membros configurados no /config-live (sem I/O e sem olhar atividades)
+    if after.id not in stream_monitor.targets or before.bot:
         return
 
     # Detectar se o usuário começou a streamar
@@ -1405,57 +1693,59 @@ async def on_presence_update(before, after):
     is_streaming_after = any(isinstance(a, discord.Streaming) for a in after.activities)
 
     if not is_streaming_before and is_streaming_after:
-        conn = sqlite3.connect('tickets.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT channel_id, custom_message FROM stream_notifications WHERE streamer_id = ?", (str(after.id),))
-        config = cursor.fetchone()
-        conn.close()
-
-        if config:
-            channel_id, custom_message = config
-            streaming_activity = next((a for a in after.activities if isinstance(a, discord.Streaming)), None)
-
-            if streaming_activity and streaming_activity.url:
-                channel = after.guild.get_channel(int(channel_id))
-                if channel:
-                    # Mensagem padrão
-                    content = f"🔴 **{after.mention} está ao vivo!**\nVenha assistir: {streaming_activity.url}"
-                    # Mensagem customizada
-                    if custom_message:
-                        content = custom_message.format(streamer=after.mention, url=streaming_activity.url)
-                    
-                    embed = discord.Embed(
-                        title=f"{streaming_activity.name}",
-                        description=f"{streaming_activity.details if streaming_activity.details else ''}",
-                        url=streaming_activity.url,
-                        color=discord.Color.purple()
-                    )
-                    embed.set_author(name=f"{after.display_name} começou a transmitir", icon_url=after.display_avatar.url)
-                    embed.set_thumbnail(url=after.display_avatar.url)
-                    
-                    try:
-                        await channel.send(content, embed=embed)
-                    except Exception as e:
-                        print(f"Erro ao anunciar live: {e}")
+        streaming_activity = next((a for a in after.activities if isinstance(a, discord.Streaming)), None)
+        if not streaming_activity or not streaming_activity.url:
+            return
+
+        # Todos os destinos do streamer (em qualquer servidor) fora do intervalo entre anúncios.
+        # O evento chega uma vez por servidor em comum; os seguintes encontram os destinos já anunciados.
+        targets = stream_monitor.claim_targets(after.id)
+        if not targets:
+            return
+
+        embed = discord.Embed(
+            title=f"{streaming_activity.name}",
+            description=f"{streaming_activity.details if streaming_activity.details else ''}",
+            url=streaming_activity.url,
+            color=discord.Color.purple()
+        )
+        embed.set_author(name=f"{after.display_name} começou a transmitir", icon_url=after.display_avatar.url)
+        embed.set_thumbnail(url=after.display_avatar.url)
+
+        sends = []
+        sent_targets = []
+        for guild_id, channel_id, custom_message in targets:
+            channel = bot.get_channel(channel_id)
+            if not channel:
+                stream_monitor.release(after.id, guild_id, channel_id)
+                continue
+            # Mensagem padrão
+            content = f"🔴 **{after.mention} está ao vivo!**\nVenha assistir: {streaming_activity.url}"
+            # Mensagem customizada
+            if custom_message:
+                content = custom_message.format(streamer=after.mention, url=streaming_activity.url)
+            sends.append((channel, content, embed))
+            sent_targets.append((guild_id, channel_id))
+
+        results = await stream_monitor.fan_out(sends)
+        # Destinos que falharam podem ser anunciados na próxima vez
+        for (guild_id, channel_id), error in zip(sent_targets, results):
+            if error is not None:
+                stream_monitor.release(after.id, guild_id, channel_id)
 
 @bot.tree.command(name="live-tiktok", description="Anuncia manualmente uma live do TikTok.")
 @app_commands.describe(link="O link da sua live no TikTok.", titulo="O título da sua live (opcional).")
 async def live_tiktok(interaction: discord.Interaction, link: str, titulo: str = None):
-    # Encontrar o canal de anúncio configurado para qualquer streamer (lógica pode ser melhorada)
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute("SELECT channel_id FROM stream_notifications WHERE guild_id = ? LIMIT 1", (str(interaction.guild.id),))
-    config = cursor.fetchone()
-    conn.close()
-
-    if not config:
+    # Todos os canais de anúncio configurados no servidor
+    rows = await db.fetchall("SELECT DISTINCT channel_id FROM stream_notifications WHERE guild_id = ?", (str(interaction.guild.id),))
+
+    if not rows:
         await interaction.response.send_message("❌ O canal de anúncio de lives ainda não foi configurado. Use `/config-live` primeiro.", ephemeral=True)
         return
 
-    channel_id = config[0]
-    channel = interaction.guild.get_channel(int(channel_id))
+    channels = [channel for channel in (interaction.guild.get_channel(int(channel_id)) for channel_id, in rows) if channel]
 
-    if not channel:
+    if not channels:
         await interaction.response.send_message("❌ O canal de anúncio configurado não foi encontrado.", ephemeral=True)
         return
 
@@ -1471,34 +1761,66 @@ async def live_tiktok(interaction: discord.Interaction, link: str, titulo: str =
     embed.set_author(name=f"{interaction.user.display_name} iniciou uma transmissão!", icon_url=interaction.user.display_avatar.url)
     embed.set_thumbnail(url="https://sf-static.tiktokcdn.com/obj/eden-sg/uYVsz-uspq-c/tiktok-icon2.png")
 
-    try:
-        await channel.send(embed=embed)
-        await interaction.response.send_message("✅ Sua live no TikTok foi anunciada com sucesso!", ephemeral=True)
-    except Exception as e:
-        await interaction.response.send_message(f"❌ Erro ao anunciar a live: {e}", ephemeral=True)
-        print(f"Erro ao anunciar live no TikTok: {e}")
+    await interaction.response.defer(ephemeral=True)
+    results = await stream_monitor.fan_out([(channel, None, embed) for channel in channels])
+    errors = [error for error in results if error is not None]
+    if len(errors) == len(results):
+        await interaction.followup.send(f"❌ Erro ao anunciar a live: {errors[0]}", ephemeral=True)
+    elif errors:
+        await interaction.followup.send(f"⚠️ Live anunciada em {len(results) - len(errors)} de {len(results)} canais.", ephemeral=True)
+    else:
+        await interaction.followup.send(f"✅ Sua live no TikTok foi anunciada com sucesso em {len(results)} canal(is)!", ephemeral=True)
+
+# Embed do painel da fila de um servidor
+def render_queue_dashboard(guild: discord.Guild):
+    total = queue_engine.size(guild.id)
+    config = config_cache.get(guild.id)
+    embed = discord.Embed(
+        title="🕒 Fila de Espera de Tickets",
+        description=f"**{total}** ticket(s) aguardando atendimento." if total else "Nenhum ticket aguardando atendimento.",
+        color=discord.Color.orange() if total else discord.Color.green(),
+        timestamp=datetime.now()
+    )
+    counts = queue_engine.category_counts(guild.id)
+    if counts:
+        embed.add_field(
+            name="📂 Por categoria",
+            value="\n".join(
+                f"{CATEGORY_EMOJIS.get(category, '📋')} {category}: {count}"
+                for category, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)
+            ),
+            inline=True
+        )
+        embed.add_field(
+            name="⏳ Esperando há mais tempo",
+            value="\n".join(
+                f"{CATEGORY_EMOJIS.get(entry.category, '📋')} **{entry.title[:60]}** — {entry.username} (<t:{int(created_timestamp(entry.created_at))}:R>)"
+                for entry in queue_engine.oldest(guild.id, limit=5)
+            ),
+            inline=False
+        )
+    if config.staff_role_id:
+        embed.add_field(name="Atendentes", value=f"<@&{config.staff_role_id}>", inline=False)
+    embed.set_footer(text="Atualizado automaticamente • Use o botão para pegar o próximo ticket")
+    return embed
 
 class TicketQueueView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)
 
-    @discord.ui.button(label="Pegar próximo ticket", style=discord.ButtonStyle.success, emoji="🎫")
+    @discord.ui.button(label="Pegar próximo ticket", style=discord.ButtonStyle.success, emoji="🎫", custom_id="fila:pegar_ticket")
+    @timed("view")
     async def pegar_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not (interaction.user.guild_permissions.administrator or interaction.user.guild_permissions.manage_guild):
             await interaction.response.send_message("❌ Apenas administradores podem pegar tickets da fila.", ephemeral=True)
             return
-        conn = sqlite3.connect('tickets.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM ticket_queue ORDER BY created_at ASC LIMIT 1')
-        ticket_data = cursor.fetchone()
+        # Retirar da fila por prioridade (atômico: cada entrada só pode ser pega uma vez)
+        ticket_data = await queue_engine.claim(interaction.guild.id)
         if not ticket_data:
             await interaction.response.send_message("📋 Não há tickets na fila de espera.", ephemeral=True)
-            conn.close()
             return
-        queue_id, user_id, username, category, title, description, created_at = ticket_data
-        # Remover da fila
-        cursor.execute('DELETE FROM ticket_queue WHERE id = ?', (queue_id,))
-        conn.commit()
+        queue_dashboard.mark_dirty(interaction.guild.id)
+        queue_id, guild_id, user_id, username, category, title, description, created_at = ticket_data
         # Criar canal de ticket
         category_obj = await get_or_create_ticket_category(interaction.guild)
         channel_names = {
@@ -1536,21 +1858,15 @@ class TicketQueueView(discord.ui.View):
             overwrites=overwrites
         )
         # Registrar no banco de tickets
-        cursor.execute('''
-            INSERT INTO tickets (user_id, username, category, title, description, channel_id, assigned_to)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            str(user_id),
+        ticket_id = await ticket_stats.create_ticket(
+            user_id,
             username,
             category,
             title,
             description,
-            str(ticket_channel.id),
-            str(interaction.user.id)
-        ))
-        ticket_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+            ticket_channel.id,
+            interaction.user.id
+        )
         await create_log(ticket_id, "CRIADO", interaction.user, f"Categoria: {category}")
         color_map = {
             "ticket_geral": discord.Color.blue(),
@@ -1574,30 +1890,14 @@ class TicketQueueView(discord.ui.View):
         await ticket_channel.send(f"👋 Olá {ticket_owner.mention if ticket_owner else username}! Seu ticket está sendo atendido por {interaction.user.mention}.", embed=embed)
         await interaction.response.send_message(f"✅ Ticket #{ticket_id} atribuído a você e canal criado: {ticket_channel.mention}", ephemeral=True)
 
-@bot.tree.command(name="postar-fila-tickets", description="Define o canal onde as notificações de tickets em espera serão enviadas.")
-@app_commands.describe(canal="Canal onde as notificações serão postadas.")
+@bot.tree.command(name="postar-fila-tickets", description="Posta o painel da fila de tickets em espera em um canal.")
+@app_commands.describe(canal="Canal onde o painel será postado.")
 @app_commands.checks.has_permissions(administrator=True)
 async def postar_fila_tickets(interaction: discord.Interaction, canal: discord.TextChannel):
-    conn = sqlite3.connect('tickets.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT ticket_category_id, log_channel_id, staff_role_id FROM bot_config WHERE guild_id = ?', (str(interaction.guild.id),))
-    row = cursor.fetchone()
-    ticket_category_id = row[0] if row else None
-    log_channel_id = row[1] if row else None
-    staff_role_id = row[2] if row else None
-    cursor.execute('''
-        INSERT OR REPLACE INTO bot_config (guild_id, ticket_category_id, log_channel_id, staff_role_id, fila_channel_id)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (
-        str(interaction.guild.id),
-        ticket_category_id,
-        log_channel_id,
-        staff_role_id,
-        str(canal.id)
-    ))
-    conn.commit()
-    conn.close()
-    await interaction.response.send_message(f"✅ Canal de fila de tickets configurado para {canal.mention}", ephemeral=True)
+    await interaction.response.defer(ephemeral=True)
+    # Remove o painel antigo, se existir, e posta o novo no canal escolhido
+    await queue_dashboard.move(interaction.guild.id, canal.id)
+    await interaction.followup.send(f"✅ Painel da fila de tickets postado em {canal.mention}", ephemeral=True)
 
 # Inicializar banco de dados
 init_database()
@@ -1610,4 +1910,6 @@ if __name__ == "__main__":
         print("❌ ERRO: Token inválido!")
     except Exception as e:
         print(f"❌ ERRO: {e}")
+    finally:
+        db.close()
 
@@ -0,0 +1,187 @@
+# Inicia o bot em vários processos, cada um com uma parte dos shards.
+#
+# Cada processo roda o bot.py com SHARD_COUNT/SHARD_IDS/CLUSTER_ID/CLUSTER_SIZE definidos e usa o
+# mesmo tickets.db (modo WAL; ver database.py). As saídas aparecem aqui com o número do processo
+# na frente; um processo que cai é reiniciado com espera crescente. Ctrl+C encerra todos.
+#
+# Uso: python cluster.py [--processos N] [--shards TOTAL] [--ids 0-7] [--intervalo SEGUNDOS]
+import os
+import sys
+import json
+import math
+import time
+import signal
+import asyncio
+import argparse
+import urllib.request
+from dotenv import load_dotenv
+from sharding import parse_shard_ids
+
+load_dotenv()
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BOT_SCRIPT = os.path.join(ROOT, "bot.py")
+# O Discord aceita um IDENTIFY a cada 5 segundos por grupo de shards (max_concurrency)
+IDENTIFY_INTERVAL = 5
+# Espera antes de reiniciar um processo que caiu: dobra a cada queda rápida, até o máximo
+RESTART_DELAY = 5
+RESTART_DELAY_MAX = 300
+# Um processo que ficou de pé por mais que isso volta a esperar só RESTART_DELAY
+STABLE_AFTER = 120
+
+def get_bot_token():
+    for var_name in ('DISCORD_BOT_TOKEN', 'DISCORD_TOKEN', 'BOT_TOKEN', 'TOKEN'):
+        token = (os.getenv(var_name) or '').strip().strip('"').strip("'")
+        if len(token) > 50:
+            return token
+    return None
+
+# Quantidade de shards recomendada e IDENTIFYs simultâneos permitidos (GET /gateway/bot)
+def fetch_gateway_info(token: str):
+    request = urllib.request.Request(
+        "https://discord.com/api/v10/gateway/bot",
+        headers={"Authorization": f"Bot {token}", "User-Agent": "DiscordBot (cluster.py, 1.0)"}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        data = json.load(response)
+    return data["shards"], data.get("session_start_limit", {}).get("max_concurrency", 1)
+
+# Divide os shards em blocos contíguos, um por processo: 10 shards em 3 -> [0-3], [4-6], [7-9]
+def split_shards(shard_ids, processes: int):
+    size, extra = divmod(len(shard_ids), processes)
+    groups = []
+    start = 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        groups.append(shard_ids[start:end])
+        start = end
+    return [group for group in groups if group]
+
+# Variáveis de ambiente do processo `index`; portas e arquivos que não podem ser compartilhados
+# ganham o número do processo
+def process_env(index: int, shard_ids, shard_count: int, processes: int):
+    env = dict(os.environ)
+    env.update({
+        "SHARD_COUNT": str(shard_count),
+        "SHARD_IDS": ",".join(map(str, shard_ids)),
+        "CLUSTER_ID": str(index),
+        "CLUSTER_SIZE": str(processes),
+        "PYTHONUNBUFFERED": "1",
+    })
+    metrics_port = int(os.getenv('METRICS_PORT', '0') or 0)
+    if metrics_port:
+        env["METRICS_PORT"] = str(metrics_port + index)
+    record_path = os.getenv('RECORD_TRAFFIC', '')
+    if record_path:
+        stem, ext = os.path.splitext(record_path)
+        env["RECORD_TRAFFIC"] = f"{stem}-{index}{ext}"
+    return env
+
+class Cluster:
+    def __init__(self, groups, shard_count: int, start_interval: float):
+        self.groups = groups
+        self.shard_count = shard_count
+        self.start_interval = start_interval
+        self.stopping = False
+        self._processes = {}
+
+    def stop(self):
+        if self.stopping:
+            return
+        self.stopping = True
+        print("🛑 Encerrando os processos do cluster...")
+        # SIGINT: o bot.py trata como Ctrl+C e fecha os serviços antes de sair
+        for process in self._processes.values():
+            if process.returncode is None:
+                try:
+                    process.send_signal(signal.SIGINT)
+                except ProcessLookupError:
+                    pass
+
+    async def _relay(self, index: int, stream):
+        prefix = f"[{index}]"
+        async for line in stream:
+            print(f"{prefix} {line.decode('utf-8', errors='replace').rstrip()}")
+
+    # Mantém o processo `index` rodando até o cluster ser encerrado
+    async def _supervise(self, index: int, shard_ids):
+        await asyncio.sleep(index * self.start_interval)
+        delay = RESTART_DELAY
+        while not self.stopping:
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, BOT_SCRIPT,
+                cwd=ROOT,
+                env=process_env(index, shard_ids, self.shard_count, len(self.groups)),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                # Fora do grupo do terminal: o Ctrl+C chega só aqui, que repassa a cada processo uma vez
+                start_new_session=os.name != "nt",
+            )
+            self._processes[index] = process
+            print(f"🚀 Processo {index} (pid {process.pid}) iniciado com os shards {shard_ids[0]}-{shard_ids[-1]}")
+            await self._relay(index, process.stdout)
+            code = await process.wait()
+            if self.stopping:
+                print(f"✅ Processo {index} encerrado (código {code})")
+                break
+            if time.monotonic() - started > STABLE_AFTER:
+                delay = RESTART_DELAY
+            print(f"❌ Processo {index} saiu com código {code}; reiniciando em {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RESTART_DELAY_MAX)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, AttributeError):
+                # Windows: o Ctrl+C chega direto a todos os processos do console
+                pass
+        await asyncio.gather(*(self._supervise(index, shard_ids) for index, shard_ids in enumerate(self.groups)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Inicia o bot em vários processos, dividindo os shards entre eles")
+    parser.add_argument("--processos", type=int, default=int(os.getenv('CLUSTER_PROCESSES', '2')), help="quantidade de processos")
+    parser.add_argument("--shards", help="total de shards (padrão: SHARD_COUNT do .env ou o recomendado pelo Discord)")
+    parser.add_argument("--ids", help="shards iniciados por esta máquina, ex.: 0-7 (padrão: todos)")
+    parser.add_argument("--intervalo", type=float, help="segundos entre o início de cada processo (padrão: calculado pelo limite de IDENTIFY)")
+    args = parser.parse_args()
+
+    shard_count = (args.shards or os.getenv('SHARD_COUNT', '')).strip().lower()
+    max_concurrency = 1
+    if not shard_count.isdigit():
+        token = get_bot_token()
+        if not token:
+            print("❌ ERRO: Token do bot não encontrado! Configure o .env ou informe --shards")
+            sys.exit(1)
+        recommended, max_concurrency = fetch_gateway_info(token)
+        shard_count = recommended
+        print(f"🧩 O Discord recomenda {recommended} shard(s) (max_concurrency={max_concurrency})")
+    shard_count = int(shard_count)
+
+    shard_ids = parse_shard_ids(args.ids) if args.ids else list(range(shard_count))
+    if any(shard_id >= shard_count for shard_id in shard_ids):
+        print(f"❌ ERRO: --ids fora do intervalo 0-{shard_count - 1}")
+        sys.exit(1)
+    groups = split_shards(shard_ids, max(1, args.processos))
+
+    # Um processo conecta seus shards em sequência; o próximo só começa quando o anterior terminou
+    largest = max(len(group) for group in groups)
+    interval = args.intervalo if args.intervalo is not None else math.ceil(largest / max_concurrency) * IDENTIFY_INTERVAL
+
+    journal_mode = os.getenv('DB_JOURNAL_MODE', '').upper() or ('DELETE' if os.getenv('DB_PROFILE', '').strip().lower() == 'padrao' else 'WAL')
+    if journal_mode != 'WAL' and len(groups) > 1:
+        print("⚠️ O banco não está em modo WAL: com vários processos, leituras e escritas vão se bloquear (use DB_PROFILE=desempenho ou seguro)")
+
+    print(f"🧩 Cluster: {shard_count} shard(s) em {len(groups)} processo(s), {interval:.0f}s entre cada início")
+    for index, group in enumerate(groups):
+        print(f"   • processo {index}: shards {','.join(map(str, group))}")
+    try:
+        asyncio.run(Cluster(groups, shard_count, interval).run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import os
+import json
+import hashlib
+import discord
+from database import db
+
+# Servidor para sincronizar os comandos só nele (aparecem na hora, útil em testes).
+# Vazio ou inválido (ex.: o valor de exemplo do setup.py) = sincronização global.
+def _guild_id_from_env():
+    value = os.getenv('GUILD_ID', '').strip()
+    return int(value) if value.isdigit() else None
+
+GUILD_ID = _guild_id_from_env()
+
+# Sincronização da árvore de comandos de barra com o Discord.
+# tree.sync() é uma requisição lenta e com limite de uso baixo, e o on_ready roda de novo a
+# cada reconexão ao gateway. Por isso a árvore local vira um hash (sha256 do JSON dos
+# comandos) gravado em bot_meta; só sincroniza quando o hash muda ou quando forçado.
+class CommandSync:
+    def __init__(self, guild_id: int = GUILD_ID):
+        self.guild = discord.Object(id=guild_id) if guild_id else None
+        # Hash já conferido neste processo: reconexões não consultam nem o banco
+        self._checked_hash = None
+        self.syncs = 0
+        self.skipped = 0
+
+    @property
+    def scope(self) -> str:
+        return f"servidor {self.guild.id}" if self.guild else "global"
+
+    def _meta_key(self, bot) -> str:
+        # Inclui o id da aplicação: trocar o token para outro bot exige uma nova sincronização
+        return f"command_tree_hash:{bot.application_id}:{self.guild.id if self.guild else 'global'}"
+
+    def tree_hash(self, tree: discord.app_commands.CommandTree) -> str:
+        # Command.to_dict(tree) é da API do discord.py 2.4+ (requirements.txt exige essa versão)
+        commands = [command.to_dict(tree) for command in tree.get_commands(guild=self.guild)]
+        commands.sort(key=lambda command: (command.get("type", 1), command["name"]))
+        payload = json.dumps(commands, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    # Sincroniza se a árvore mudou desde a última sincronização (ou sempre, com force=True).
+    # Retorna a lista de comandos sincronizados, ou None se nada precisou ser enviado.
+    async def sync(self, bot, force: bool = False):
+        tree = bot.tree
+        if self.guild:
+            # Comandos globais também são registrados no servidor configurado
+            tree.copy_global_to(guild=self.guild)
+        try:
+            current_hash = self.tree_hash(tree)
+        except Exception as e:
+            # Sem hash não dá para comparar: sincroniza sempre em vez de deixar de registrar os comandos
+            print(f"⚠️ Não foi possível calcular o hash da árvore de comandos ({e}); sincronizando mesmo assim")
+            synced = await tree.sync(guild=self.guild)
+            self.syncs += 1
+            return synced
+        if not force:
+            if current_hash == self._checked_hash:
+                self.skipped += 1
+                return None
+            row = await db.fetchone('SELECT value FROM bot_meta WHERE key = ?', (self._meta_key(bot),))
+            if row and row[0] == current_hash:
+                self._checked_hash = current_hash
+                self.skipped += 1
+                return None
+
+        synced = await tree.sync(guild=self.guild)
+        await db.execute('''
+            INSERT INTO bot_meta (key, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+        ''', (self._meta_key(bot), current_hash))
+        self._checked_hash = current_hash
+        self.syncs += 1
+        return synced
+
+    def stats(self):
+        return {
+            "scope": self.scope,
+            "syncs": self.syncs,
+            "skipped": self.skipped,
+        }
+
+# Instância global usada por todo o bot
+command_sync = CommandSync()
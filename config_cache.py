@@ -0,0 +1,90 @@
+import asyncio
+from collections import namedtuple
+from database import db
+
+# Colunas de bot_config (exceto guild_id)
+CONFIG_FIELDS = (
+    'ticket_category_id',
+    'log_channel_id',
+    'staff_role_id',
+    'suggestion_channel_id',
+    'approved_suggestion_channel_id',
+    'fila_channel_id',
+    'fila_dashboard_message_id',
+)
+
+# Configuração de um servidor. É imutável: cada alteração gera um novo objeto,
+# então quem está lendo nunca vê uma configuração pela metade.
+GuildConfig = namedtuple('GuildConfig', CONFIG_FIELDS, defaults=(None,) * len(CONFIG_FIELDS))
+
+EMPTY_CONFIG = GuildConfig()
+
+# Cache em memória de bot_config, carregado na inicialização.
+# Leituras não fazem I/O; escritas passam pelo banco e depois trocam o objeto em memória.
+class ConfigCache:
+    def __init__(self):
+        self._configs = {}
+        self._locks = {}
+        # IDs (int) dos canais de sugestão de todos os servidores, para o caminho rápido do on_message
+        self.suggestion_channels = set()
+        self.hits = 0
+        self.misses = 0
+
+    # Carrega todas as configurações do banco
+    async def load(self):
+        rows = await db.fetchall(f'SELECT guild_id, {", ".join(CONFIG_FIELDS)} FROM bot_config')
+        self._configs = {row[0]: GuildConfig(*row[1:]) for row in rows}
+        self.suggestion_channels = {
+            int(config.suggestion_channel_id)
+            for config in self._configs.values()
+            if config.suggestion_channel_id
+        }
+        print(f"⚙️ Configurações carregadas para {len(self._configs)} servidor(es)")
+
+    # Retorna a configuração do servidor sem acessar o banco
+    def get(self, guild_id) -> GuildConfig:
+        config = self._configs.get(str(guild_id))
+        if config is None:
+            self.misses += 1
+            return EMPTY_CONFIG
+        self.hits += 1
+        return config
+
+    # Atualiza os campos informados no banco e no cache (write-through)
+    async def update(self, guild_id, **fields) -> GuildConfig:
+        for field in fields:
+            if field not in CONFIG_FIELDS:
+                raise ValueError(f"Campo de configuração inválido: {field}")
+        guild_id = str(guild_id)
+        if not fields:
+            return self._configs.get(guild_id, EMPTY_CONFIG)
+        lock = self._locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            columns = ", ".join(fields)
+            placeholders = ", ".join("?" for _ in fields)
+            updates = ", ".join(f"{field} = excluded.{field}" for field in fields)
+            await db.execute(f'''
+                INSERT INTO bot_config (guild_id, {columns}) VALUES (?, {placeholders})
+                ON CONFLICT(guild_id) DO UPDATE SET {updates}
+            ''', (guild_id, *fields.values()))
+            old_config = self._configs.get(guild_id, EMPTY_CONFIG)
+            config = old_config._replace(**fields)
+            self._configs[guild_id] = config
+            if old_config.suggestion_channel_id != config.suggestion_channel_id:
+                if old_config.suggestion_channel_id:
+                    self.suggestion_channels.discard(int(old_config.suggestion_channel_id))
+                if config.suggestion_channel_id:
+                    self.suggestion_channels.add(int(config.suggestion_channel_id))
+            return config
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "guilds": len(self._configs),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+# Instância global usada por todo o bot
+config_cache = ConfigCache()
@@ -0,0 +1,262 @@
+import sqlite3
+import os
+import re
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from metrics import metrics
+from tracing import record_span
+
+# Carregar variáveis do arquivo .env (este módulo é importado antes do resto do bot)
+load_dotenv()
+
+# Caminho do banco (pode ser trocado pelo .env, ex: para testes)
+DB_PATH = os.getenv('DB_PATH', 'tickets.db')
+
+# Perfis de armazenamento do SQLite, escolhidos por DB_PROFILE no .env.
+# Cada ajuste pode ser sobrescrito individualmente (DB_JOURNAL_MODE, DB_SYNCHRONOUS, ...).
+STORAGE_PROFILES = {
+    # Padrões do SQLite: journal de rollback e sync completo
+    'padrao': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'mmap_size': 0,
+        'cache_size': -2000,
+        'busy_timeout': 5000,
+        'checkpoint_interval': 0,
+        'read_workers': 0,
+    },
+    # WAL com sync NORMAL: leitores e escritores não se bloqueiam
+    'desempenho': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'busy_timeout': 5000,
+        'checkpoint_interval': 300,
+        'read_workers': 2,
+    },
+    # WAL com sync completo: nenhuma transação confirmada se perde em queda de energia
+    'seguro': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'mmap_size': 0,
+        'cache_size': -16 * 1024,
+        'busy_timeout': 10000,
+        'checkpoint_interval': 60,
+        'read_workers': 2,
+    },
+}
+DEFAULT_PROFILE = 'desempenho'
+
+# Monta o perfil ativo a partir do .env
+def load_storage_profile():
+    name = os.getenv('DB_PROFILE', DEFAULT_PROFILE).strip().lower()
+    if name not in STORAGE_PROFILES:
+        print(f"⚠️ Perfil de banco desconhecido '{name}', usando '{DEFAULT_PROFILE}'")
+        name = DEFAULT_PROFILE
+    profile = dict(STORAGE_PROFILES[name], name=name)
+    for key in ('journal_mode', 'synchronous'):
+        value = os.getenv(f'DB_{key.upper()}')
+        if value:
+            profile[key] = value.strip().upper()
+    for key in ('mmap_size', 'cache_size', 'busy_timeout', 'checkpoint_interval', 'read_workers'):
+        value = os.getenv(f'DB_{key.upper()}')
+        if value:
+            profile[key] = int(value)
+    return profile
+
+# Rótulos das métricas de uma consulta: (operação, tabela), ex.: ("select", "tickets")
+_QUERY_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+(\w+)', re.IGNORECASE)
+_query_labels = {}
+
+def query_labels(query: str):
+    labels = _query_labels.get(query)
+    if labels is None:
+        words = query.split(None, 1)
+        operation = words[0].lower() if words else "?"
+        match = _QUERY_TABLE.search(query)
+        labels = (operation, match.group(1).lower() if match else "-")
+        # Consultas montadas dinamicamente não fazem o cache crescer sem limite
+        if len(_query_labels) < 1024:
+            _query_labels[query] = labels
+    return labels
+
+# Camada de acesso ao banco compartilhada pelo bot.
+# Mantém uma conexão de escrita de longa duração e executa todas as queries fora do
+# loop de eventos do Discord, para que ele nunca fique bloqueado esperando o disco.
+# Em modo WAL, as leituras usam um pequeno pool de conexões somente leitura.
+class Database:
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self.profile = None
+        self._conn = None
+        # Uma única thread serializa as escritas
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._read_executor = None
+        self._local = threading.local()
+        self._read_conns = []
+        self._read_conns_lock = threading.Lock()
+        self._checkpoint_task = None
+
+    def _apply_pragmas(self, conn):
+        profile = self.profile
+        conn.execute(f"PRAGMA busy_timeout = {int(profile['busy_timeout'])}")
+        conn.execute(f"PRAGMA synchronous = {profile['synchronous']}")
+        conn.execute(f"PRAGMA cache_size = {int(profile['cache_size'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(profile['mmap_size'])}")
+
+    def _connect(self):
+        if self._conn is None:
+            self.profile = load_storage_profile()
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.profile['busy_timeout'] / 1000)
+            journal_mode = self._conn.execute(f"PRAGMA journal_mode = {self.profile['journal_mode']}").fetchone()[0]
+            self.profile['journal_mode'] = journal_mode.upper()
+            self._apply_pragmas(self._conn)
+            if self.profile['journal_mode'] == 'WAL' and self.profile['read_workers'] > 0:
+                self._read_executor = ThreadPoolExecutor(
+                    max_workers=self.profile['read_workers'],
+                    thread_name_prefix="sqlite-read"
+                )
+            print(
+                f"🗄️ SQLite: perfil={self.profile['name']} journal={self.profile['journal_mode']} "
+                f"synchronous={self.profile['synchronous']} mmap_size={self.profile['mmap_size']} "
+                f"cache_size={self.profile['cache_size']} busy_timeout={self.profile['busy_timeout']}ms "
+                f"checkpoint={self.profile['checkpoint_interval']}s leitores={self.profile['read_workers'] if self._read_executor else 0}"
+            )
+        return self._conn
+
+    # Conexão somente leitura da thread atual do pool de leitura
+    def _read_connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.profile['busy_timeout'] / 1000)
+            self._apply_pragmas(conn)
+            conn.execute("PRAGMA query_only = 1")
+            self._local.conn = conn
+            with self._read_conns_lock:
+                self._read_conns.append(conn)
+        return conn
+
+    def _call(self, fn, *args):
+        return fn(self._connect(), *args)
+
+    def _read_call(self, fn, *args):
+        return fn(self._read_connect(), *args)
+
+    # Executa fn(conn, *args) na thread do banco e espera o resultado (uso fora do loop, ex: inicialização)
+    def run_sync(self, fn, *args):
+        return self._executor.submit(self._call, fn, *args).result()
+
+    # Executa fn(conn, *args) na thread do banco sem bloquear o loop de eventos
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn, *args)
+
+    # Executa uma leitura; em WAL vai para o pool de leitura, senão para a thread de escrita
+    async def run_read(self, fn, *args):
+        if self._conn is None:
+            await self.run(lambda conn: None)
+        if self._read_executor is None:
+            return await self.run(fn, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, self._read_call, fn, *args)
+
+    # Mede o tempo da consulta (incluindo a espera pela thread do banco) para as métricas e o rastreamento
+    async def _timed(self, query: str, awaitable):
+        operation, table = query_labels(query)
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        except Exception:
+            metrics.db_errors.inc(operation=operation, table=table)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.db_seconds.observe(elapsed, operation=operation, table=table)
+            record_span("db", f"{operation} {table}", elapsed)
+
+    # Executa um comando de escrita em sua própria transação e retorna o cursor (lastrowid/rowcount)
+    async def execute(self, query: str, params=()):
+        def _execute(conn):
+            with conn:
+                return conn.execute(query, params)
+        return await self._timed(query, self.run(_execute))
+
+    # Executa um comando de escrita com RETURNING e retorna a primeira linha (ou None)
+    async def execute_fetchone(self, query: str, params=()):
+        def _execute_fetchone(conn):
+            with conn:
+                rows = conn.execute(query, params).fetchall()
+            return rows[0] if rows else None
+        return await self._timed(query, self.run(_execute_fetchone))
+
+    async def executemany(self, query: str, seq_params):
+        def _executemany(conn):
+            with conn:
+                return conn.executemany(query, seq_params)
+        return await self._timed(query, self.run(_executemany))
+
+    async def fetchone(self, query: str, params=()):
+        def _fetchone(conn):
+            return conn.execute(query, params).fetchone()
+        return await self._timed(query, self.run_read(_fetchone))
+
+    async def fetchall(self, query: str, params=()):
+        def _fetchall(conn):
+            return conn.execute(query, params).fetchall()
+        return await self._timed(query, self.run_read(_fetchall))
+
+    # Garante que a conexão (e o perfil) já foram abertos
+    def _connect_if_needed(self):
+        if self._conn is None:
+            self.run_sync(lambda conn: None)
+
+    # Checkpoint periódico do WAL, para o arquivo -wal não crescer indefinidamente
+    def start_checkpoints(self):
+        self._connect_if_needed()
+        interval = self.profile['checkpoint_interval']
+        if self._checkpoint_task is None and interval > 0 and self.profile['journal_mode'] == 'WAL':
+            self._checkpoint_task = asyncio.create_task(self._checkpoint_loop(interval))
+
+    async def _checkpoint_loop(self, interval):
+        def _checkpoint(conn):
+            return conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                busy, log_frames, checkpointed = await self.run(_checkpoint)
+                if busy:
+                    print(f"⚠️ Checkpoint do WAL incompleto: {checkpointed}/{log_frames} páginas")
+            except Exception as e:
+                print(f"❌ Erro no checkpoint do WAL: {e}")
+
+    async def stop_checkpoints(self):
+        if self._checkpoint_task is not None:
+            self._checkpoint_task.cancel()
+            try:
+                await self._checkpoint_task
+            except asyncio.CancelledError:
+                pass
+            self._checkpoint_task = None
+
+    def close(self):
+        if self._read_executor is not None:
+            self._read_executor.shutdown(wait=True)
+            self._read_executor = None
+        with self._read_conns_lock:
+            for conn in self._read_conns:
+                conn.close()
+            self._read_conns = []
+
+        def _close(conn):
+            conn.close()
+        if self._conn is not None:
+            self.run_sync(_close)
+            self._conn = None
+        self._executor.shutdown(wait=True)
+
+# Instância global usada por todo o bot
+db = Database()
@@ -0,0 +1,176 @@
+import os
+import time
+import asyncio
+from collections import deque
+import discord
+
+# Limites do Discord por mensagem
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+# Ritmo de envio por canal (configurável pelo .env): no máximo LOG_RATE_MESSAGES
+# mensagens a cada LOG_RATE_PERIOD segundos (o limite do Discord é 5 a cada 5s).
+LOG_RATE_MESSAGES = int(os.getenv('LOG_RATE_MESSAGES', '5'))
+LOG_RATE_PERIOD = float(os.getenv('LOG_RATE_PERIOD', '5'))
+# Espera curta após o primeiro embed, para juntar os que chegam em rajada na mesma mensagem
+LOG_COALESCE_DELAY = float(os.getenv('LOG_COALESCE_DELAY', '0.25'))
+# Máximo de embeds aguardando por canal; acima disso os mais antigos são descartados
+LOG_QUEUE_MAX = int(os.getenv('LOG_QUEUE_MAX', '500'))
+
+# Balde de envio por canal: no máximo `rate` mensagens em qualquer janela de `period` segundos
+class RateBucket:
+    def __init__(self, rate: int, period: float):
+        self.rate = max(1, rate)
+        self.period = period
+        self._sent = deque()
+        # Pausa imposta pelo Discord (resposta 429)
+        self.blocked_until = 0.0
+
+    # Espera até o canal poder receber mais uma mensagem e reserva o envio
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            while self._sent and now - self._sent[0] >= self.period:
+                self._sent.popleft()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+            elif len(self._sent) >= self.rate:
+                await asyncio.sleep(self._sent[0] + self.period - now)
+            else:
+                self._sent.append(now)
+                return
+
+    def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+# Envia os embeds de log em segundo plano.
+# Cada canal tem sua fila e sua tarefa de envio; embeds pendentes são agrupados em
+# mensagens de até 10 embeds, respeitando o ritmo do canal. Quem chama só enfileira.
+class LogDispatcher:
+    def __init__(self, rate: int = LOG_RATE_MESSAGES, period: float = LOG_RATE_PERIOD,
+                 coalesce_delay: float = LOG_COALESCE_DELAY, max_queue: int = LOG_QUEUE_MAX):
+        self.rate = rate
+        self.period = period
+        self.coalesce_delay = coalesce_delay
+        self.max_queue = max_queue
+        self._queues = {}
+        self._channels = {}
+        self._buckets = {}
+        self._wakeups = {}
+        self._tasks = {}
+        # Ligado no stop(): send() só enfileira e o próprio stop() esvazia as filas
+        self._closing = False
+        self.messages_sent = 0
+        self.embeds_sent = 0
+        self.dropped = 0
+        self.rate_limited = 0
+
+    # Enfileira um embed para o canal (não espera o envio)
+    def send(self, channel, embed: discord.Embed):
+        channel_id = channel.id
+        queue = self._queues.setdefault(channel_id, deque())
+        if len(queue) >= self.max_queue:
+            queue.popleft()
+            self.dropped += 1
+        queue.append(embed)
+        # Guarda a referência mais recente do canal
+        self._channels[channel_id] = channel
+        if channel_id not in self._buckets:
+            self._buckets[channel_id] = RateBucket(self.rate, self.period)
+            self._wakeups[channel_id] = asyncio.Event()
+        self._wakeups[channel_id].set()
+        if self._closing:
+            return
+        task = self._tasks.get(channel_id)
+        if task is None or task.done():
+            self._tasks[channel_id] = asyncio.create_task(self._run(channel_id))
+
+    @property
+    def pending_count(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    # Retira da fila o maior grupo de embeds que cabe em uma mensagem
+    def _take_batch(self, queue: deque):
+        batch = []
+        chars = 0
+        while queue and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            size = len(queue[0])
+            if batch and chars + size > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            batch.append(queue.popleft())
+            chars += size
+        return batch
+
+    async def _run(self, channel_id: int):
+        queue = self._queues[channel_id]
+        bucket = self._buckets[channel_id]
+        wakeup = self._wakeups[channel_id]
+        while True:
+            if not queue:
+                wakeup.clear()
+                await wakeup.wait()
+                if self.coalesce_delay:
+                    await asyncio.sleep(self.coalesce_delay)
+            await bucket.acquire()
+            await self._send_batch(channel_id, queue, bucket)
+
+    async def _send_batch(self, channel_id: int, queue: deque, bucket: RateBucket):
+        batch = self._take_batch(queue)
+        if not batch:
+            return
+        channel = self._channels[channel_id]
+        try:
+            await channel.send(embeds=batch)
+            self.messages_sent += 1
+            self.embeds_sent += len(batch)
+        except asyncio.CancelledError:
+            # Desligamento no meio do envio: o lote volta para a fila e é enviado no stop()
+            queue.extendleft(reversed(batch))
+            raise
+        except discord.HTTPException as e:
+            if e.status == 429:
+                # Limite atingido mesmo assim: devolve o lote e pausa o canal
+                self.rate_limited += 1
+                retry_after = getattr(e, 'retry_after', None) or self.period
+                bucket.block(retry_after)
+                queue.extendleft(reversed(batch))
+            else:
+                # Canal apagado ou sem permissão: descarta o lote
+                self.dropped += len(batch)
+                print(f"❌ Erro ao enviar log para canal {channel_id}: {e}")
+        except Exception as e:
+            self.dropped += len(batch)
+            print(f"❌ Erro ao enviar log para canal {channel_id}: {e}")
+
+    # Envia o que restou (dentro do prazo) e encerra as tarefas (usado no desligamento do bot)
+    async def stop(self, timeout: float = 5.0):
+        async def _drain():
+            # send() ainda pode criar filas durante os awaits: percorre uma cópia até tudo esvaziar
+            while self.pending_count:
+                for channel_id, queue in list(self._queues.items()):
+                    bucket = self._buckets[channel_id]
+                    while queue:
+                        await bucket.acquire()
+                        await self._send_batch(channel_id, queue, bucket)
+
+        self._closing = True
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks = {}
+        try:
+            await asyncio.wait_for(_drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ {self.pending_count} log(s) de canal não enviados no desligamento")
+
+    def stats(self):
+        return {
+            "pending": self.pending_count,
+            "messages": self.messages_sent,
+            "embeds": self.embeds_sent,
+            "dropped": self.dropped,
+            "rate_limited": self.rate_limited,
+        }
+
+# Instância global usada por todo o bot
+log_dispatcher = LogDispatcher()
@@ -0,0 +1,177 @@
+import os
+import asyncio
+import threading
+from datetime import datetime, timezone
+from database import db
+
+# Tamanho máximo do lote e janela de espera antes de gravar (configuráveis pelo .env)
+LOG_BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', '50'))
+LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', '0.5'))
+# Se a gravação falhar (banco travado, disco cheio), espera cada vez mais antes de tentar
+# de novo, até este teto; acima de LOG_MAX_PENDING logs retidos, os mais antigos são descartados
+LOG_MAX_BACKOFF = float(os.getenv('LOG_MAX_BACKOFF', '30'))
+LOG_MAX_PENDING = int(os.getenv('LOG_MAX_PENDING', '10000'))
+
+INSERT_LOG = '''
+    INSERT INTO ticket_logs (ticket_id, action, user_id, username, details, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# Grava os logs de tickets em lotes (group commit).
+# create_log só enfileira; uma tarefa em segundo plano grava tudo em uma única
+# transação quando o lote enche ou quando a janela de tempo termina.
+class LogWriter:
+    def __init__(self, batch_size: int = LOG_BATCH_SIZE, flush_interval: float = LOG_FLUSH_INTERVAL,
+                 max_backoff: float = LOG_MAX_BACKOFF, max_pending: int = LOG_MAX_PENDING):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.max_pending = max_pending
+        # Falhas seguidas de gravação (zera no primeiro lote gravado)
+        self._failures = 0
+        self._pending = []
+        self._inflight = []
+        # Protege a troca pending -> inflight, lida também pela thread do banco
+        self._swap_lock = threading.Lock()
+        self._has_items = None
+        self._full = None
+        self._task = None
+        self.commits = 0
+        self.rows_written = 0
+        self.dropped = 0
+
+    def start(self):
+        if self._task is None:
+            self._has_items = asyncio.Event()
+            self._full = asyncio.Event()
+            if self._pending:
+                self._has_items.set()
+            self._task = asyncio.create_task(self._run())
+
+    # Enfileira um log; o timestamp é o do momento da ação, não o da gravação
+    def add(self, ticket_id: int, action: str, user_id: str, username: str, details: str = None):
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        with self._swap_lock:
+            self._pending.append((ticket_id, action, user_id, username, details, timestamp))
+            size = len(self._pending)
+        if self._task is None:
+            self.start()
+        self._has_items.set()
+        if size >= self.batch_size:
+            self._full.set()
+
+    @property
+    def pending_count(self):
+        return len(self._pending) + len(self._inflight)
+
+    async def _run(self):
+        while True:
+            await self._has_items.wait()
+            if self._failures:
+                # Backoff exponencial: um lote cheio que falhou não é regravado na hora
+                await asyncio.sleep(min(self.flush_interval * 2 ** (self._failures - 1), self.max_backoff))
+            elif len(self._pending) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+
+    # Grava tudo que está pendente em uma única transação
+    async def flush(self):
+        with self._swap_lock:
+            batch = self._pending
+            self._pending = []
+            self._inflight = batch
+            self._has_items.clear()
+            self._full.clear()
+        if not batch:
+            return
+
+        def _write(conn):
+            with conn:
+                conn.executemany(INSERT_LOG, batch)
+            with self._swap_lock:
+                self._inflight = []
+
+        try:
+            await db.run(_write)
+            self.commits += 1
+            self.rows_written += len(batch)
+            self._failures = 0
+        except Exception as e:
+            self._failures += 1
+            # Só avisa na primeira falha e depois a cada 10, para não inundar o console
+            if self._failures == 1 or self._failures % 10 == 0:
+                print(f"❌ Erro ao gravar lote de logs ({len(batch)} registros, falha {self._failures}): {e}")
+            # Devolve o lote para a fila para tentar de novo no próximo ciclo, limitado a max_pending
+            with self._swap_lock:
+                self._inflight = []
+                self._pending = batch + self._pending
+                overflow = len(self._pending) - self.max_pending
+                if overflow > 0:
+                    del self._pending[:overflow]
+                    self.dropped += overflow
+                self._has_items.set()
+            if overflow > 0:
+                print(f"⚠️ {overflow} logs de tickets descartados: fila acima de {self.max_pending} registros")
+
+    # Logs de um ticket, incluindo os que ainda não foram gravados (read-your-writes)
+    async def fetch_logs(self, ticket_id: int):
+        def _fetch(conn):
+            rows = conn.execute('''
+                SELECT action, username, details, timestamp
+                FROM ticket_logs
+                WHERE ticket_id = ?
+                ORDER BY timestamp ASC
+            ''', (ticket_id,)).fetchall()
+            # Na thread do banco o lote em gravação ou já foi commitado ou ainda está em _inflight
+            with self._swap_lock:
+                pending = self._inflight + self._pending
+            rows.extend(
+                (action, username, details, timestamp)
+                for log_ticket_id, action, _, username, details, timestamp in pending
+                if log_ticket_id == ticket_id
+            )
+            return rows
+
+        rows = await db.run(_fetch)
+        rows.sort(key=lambda row: row[3])
+        return rows
+
+    # Grava o que restou e encerra a tarefa (usado no desligamento do bot)
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Roda na thread do banco: um lote que estava sendo gravado já terminou
+        # (e saiu de _inflight) ou foi cancelado antes de começar (e é gravado aqui)
+        def _write_remaining(conn):
+            with self._swap_lock:
+                batch = self._inflight + self._pending
+                self._inflight = []
+                self._pending = []
+            if batch:
+                with conn:
+                    conn.executemany(INSERT_LOG, batch)
+            return len(batch)
+
+        written = await db.run(_write_remaining)
+        if written:
+            self.commits += 1
+            self.rows_written += written
+
+    def stats(self):
+        return {
+            "pending": self.pending_count,
+            "commits": self.commits,
+            "rows": self.rows_written,
+            "dropped": self.dropped,
+        }
+
+# Instância global usada por todo o bot
+log_writer = LogWriter()
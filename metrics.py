@@ -0,0 +1,203 @@
+import os
+import math
+import functools
+from bisect import bisect_left
+import discord
+from discord import app_commands
+from tracing import start_trace, finish_trace
+
+# Porta do endpoint de métricas no formato do Prometheus; vazio = desligado (configurável pelo .env)
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0') or 0)
+# Endereço do endpoint; por padrão só acessível na própria máquina
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+
+# Limites (em segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels_text(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+def _number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield self.name, labels, value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        # labels -> [contagem por faixa (não acumulada) ..., soma, total]
+        self._values = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        data = self._values.get(key)
+        if data is None:
+            data = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        data[bisect_left(self.buckets, value)] += 1
+        data[-2] += value
+        data[-1] += 1
+
+    def samples(self):
+        for labels, data in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), data):
+                cumulative += count
+                yield f"{self.name}_bucket", labels + (("le", _number(bound)),), cumulative
+            yield f"{self.name}_sum", labels, data[-2]
+            yield f"{self.name}_count", labels, data[-1]
+
+# Valor lido só na hora da coleta: fn() retorna um número ou {(("label", valor), ...): número}
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, fn):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+
+    def samples(self):
+        try:
+            value = self.fn()
+        except Exception as e:
+            print(f"❌ Erro ao coletar métrica {self.name}: {e}")
+            return
+        if value is None:
+            return
+        if isinstance(value, dict):
+            for labels, item in value.items():
+                yield self.name, labels, item
+        else:
+            yield self.name, (), value
+
+# Métricas do bot em memória, expostas no formato de texto do Prometheus.
+# Registrar uma amostra é só somar em um dicionário; a formatação acontece na coleta.
+class Metrics:
+    def __init__(self):
+        self._metrics = {}
+        self._runner = None
+        self.interaction_seconds = self.histogram(
+            "bot_interaction_seconds", "Tempo de resposta de comandos, botões e formulários"
+        )
+        self.interactions = self.counter("bot_interactions_total", "Interações tratadas, por resultado")
+        self.db_seconds = self.histogram("bot_db_query_seconds", "Tempo das consultas ao banco, incluindo a espera na fila")
+        self.db_errors = self.counter("bot_db_errors_total", "Consultas ao banco que falharam")
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def gauge(self, name: str, help_text: str, fn) -> Gauge:
+        self._metrics[name] = Gauge(name, help_text, fn)
+        return self._metrics[name]
+
+    # Registra uma interação: kind = comando | view | modal
+    def observe_interaction(self, kind: str, name: str, seconds: float, status: str = "ok"):
+        self.interaction_seconds.observe(seconds, kind=kind, name=name)
+        self.interactions.inc(kind=kind, name=name, status=status)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            samples = list(metric.samples())
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in samples:
+                lines.append(f"{name}{_labels_text(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    # Sobe o endpoint /metrics (aiohttp já vem com o discord.py)
+    async def start_server(self, port: int = METRICS_PORT, host: str = METRICS_HOST):
+        if not port or self._runner is not None:
+            return
+        from aiohttp import web
+
+        async def handle(request):
+            return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        print(f"📈 Métricas disponíveis em http://{host}:{port}/metrics")
+
+    async def stop_server(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+# Instância global usada por todo o bot
+metrics = Metrics()
+
+# Mede e rastreia um callback de botão ou formulário (on_submit); ver tracing.py.
+# Usar abaixo de @discord.ui.button; o nome padrão é Classe.método.
+def timed(kind: str, name: str = None):
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            trace, token = start_trace(f"{kind} {label}")
+            status = "ok"
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                status = "erro"
+                raise
+            finally:
+                metrics.observe_interaction(kind, label, finish_trace(trace, status, token), status)
+        return wrapper
+    return decorator
+
+# Árvore de comandos que mede e rastreia cada comando de barra: o rastreamento começa na
+# verificação que o discord.py faz antes de todo comando (na tarefa do próprio comando) e
+# termina no evento de conclusão ou no on_error.
+class InstrumentedCommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        name = interaction.command.qualified_name if interaction.command else "?"
+        interaction.extras["trace"], _ = start_trace(f"/{name}")
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        record_command(interaction, interaction.command, "erro")
+        await super().on_error(interaction, error)
+
+# Registra a duração de um comando de barra (chamado no on_app_command_completion e no on_error)
+def record_command(interaction: discord.Interaction, command, status: str = "ok"):
+    trace = interaction.extras.pop("trace", None)
+    if trace is None:
+        return
+    # Encerra o rastreamento mesmo sem comando resolvido (ex.: CommandNotFound): um trace
+    # sorteado para o cProfile deixaria o profiler ligado pelo resto do processo
+    elapsed = finish_trace(trace, status)
+    if command is not None:
+        metrics.observe_interaction("comando", command.qualified_name, elapsed, status)
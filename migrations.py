@@ -0,0 +1,367 @@
+# Migrações do banco de dados.
+# A versão aplicada fica em PRAGMA user_version; cada migração roda uma única vez,
+# em ordem, dentro de uma transação, na inicialização do bot.
+
+# Versão 1: schema original (antes em init_database) + coluna fila_channel_id (antes em atualiza_db.py)
+def _m001_schema_inicial(conn):
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            username TEXT NOT NULL,
+            category TEXT NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            status TEXT DEFAULT 'aberto',
+            channel_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            closed_by TEXT,
+            closed_at TIMESTAMP,
+            assigned_to TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticket_id INTEGER,
+            action TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            username TEXT NOT NULL,
+            details TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (ticket_id) REFERENCES tickets (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            username TEXT NOT NULL,
+            category TEXT NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bot_config (
+            guild_id TEXT PRIMARY KEY,
+            ticket_category_id TEXT,
+            log_channel_id TEXT,
+            staff_role_id TEXT,
+            suggestion_channel_id TEXT,
+            approved_suggestion_channel_id TEXT,
+            fila_channel_id TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS shop_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            descricao TEXT,
+            preco INTEGER NOT NULL,
+            estoque INTEGER DEFAULT 0,
+            pix_code TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_inventory (
+            user_id TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            quantidade INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, item_id),
+            FOREIGN KEY (item_id) REFERENCES shop_items(id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_balance (
+            user_id TEXT PRIMARY KEY,
+            saldo INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS response_templates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            content TEXT NOT NULL,
+            UNIQUE(guild_id, name)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stream_notifications (
+            streamer_id TEXT PRIMARY KEY,
+            guild_id TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            custom_message TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS info_panels (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            title TEXT,
+            content TEXT,
+            UNIQUE(guild_id, name)
+        )
+    ''')
+
+    # Bancos criados antes da coluna fila_channel_id existir
+    columns = [col[1] for col in cursor.execute("PRAGMA table_info(bot_config)").fetchall()]
+    if 'fila_channel_id' not in columns:
+        cursor.execute('ALTER TABLE bot_config ADD COLUMN fila_channel_id TEXT')
+
+# Versão 2: índices para as consultas mais usadas
+def _m002_indices(conn):
+    cursor = conn.cursor()
+    # Ticket aberto do usuário (SupportView, TicketModal)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tickets_user_status ON tickets (user_id, status)')
+    # Ticket pelo canal (fechar-ticket, usar-template)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tickets_channel ON tickets (channel_id)')
+    # Próximo da fila e duplicidade na fila
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ticket_queue_created ON ticket_queue (created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ticket_queue_user_category ON ticket_queue (user_id, category)')
+    # Logs de um ticket em ordem (logs-ticket)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ticket_logs_ticket_timestamp ON ticket_logs (ticket_id, timestamp)')
+
+# Versão 3: fila de espera separada por servidor
+def _m003_fila_por_servidor(conn):
+    cursor = conn.cursor()
+    columns = [col[1] for col in cursor.execute("PRAGMA table_info(ticket_queue)").fetchall()]
+    if 'guild_id' not in columns:
+        cursor.execute('ALTER TABLE ticket_queue ADD COLUMN guild_id TEXT')
+        # Entradas antigas não tinham servidor; se só existe um servidor configurado, elas são dele
+        guilds = cursor.execute('SELECT guild_id FROM bot_config').fetchall()
+        if len(guilds) == 1:
+            cursor.execute('UPDATE ticket_queue SET guild_id = ? WHERE guild_id IS NULL', (guilds[0][0],))
+        else:
+            # Com vários servidores não dá para saber de qual é cada entrada: ficam sem servidor
+            # (fora de todas as filas) até um operador preencher ticket_queue.guild_id
+            orphans = cursor.execute('SELECT COUNT(*) FROM ticket_queue WHERE guild_id IS NULL').fetchone()[0]
+            if orphans:
+                print(f"⚠️ {orphans} entrada(s) antiga(s) da fila sem servidor: preencha ticket_queue.guild_id manualmente")
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ticket_queue_guild_created ON ticket_queue (guild_id, created_at)')
+
+# Versão 4: contadores de estatísticas (preenchidos pelo ticket_stats na primeira carga)
+def _m004_estatisticas(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_stats (
+            chave TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+# Versão 5: índices para a paginação por chave (created_at, id) das listas de tickets
+def _m005_indices_paginacao(conn):
+    cursor = conn.cursor()
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets (created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tickets_user_created ON tickets (user_id, created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tickets_status_created ON tickets (status, created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tickets_category_created ON tickets (category, created_at, id)')
+
+# Versão 6: mensagem do painel único da fila de espera
+def _m006_painel_fila(conn):
+    cursor = conn.cursor()
+    columns = [col[1] for col in cursor.execute("PRAGMA table_info(bot_config)").fetchall()]
+    if 'fila_dashboard_message_id' not in columns:
+        cursor.execute('ALTER TABLE bot_config ADD COLUMN fila_dashboard_message_id TEXT')
+
+# Versão 7: registro das sugestões (id = mensagem original do membro)
+def _m007_sugestoes(conn):
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS suggestions (
+            id TEXT PRIMARY KEY,
+            guild_id TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            message_id TEXT NOT NULL,
+            author_id TEXT NOT NULL,
+            author_name TEXT,
+            content TEXT,
+            status TEXT NOT NULL DEFAULT 'pendente',
+            reviewed_by TEXT,
+            reviewed_at TIMESTAMP,
+            reason TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_suggestions_guild_status ON suggestions (guild_id, status, created_at)')
+
+# Versão 8: contadores de votos das sugestões (gravados em lote pelo suggestion_store)
+def _m008_votos_sugestoes(conn):
+    cursor = conn.cursor()
+    columns = [col[1] for col in cursor.execute("PRAGMA table_info(suggestions)").fetchall()]
+    if 'upvotes' not in columns:
+        cursor.execute('ALTER TABLE suggestions ADD COLUMN upvotes INTEGER NOT NULL DEFAULT 0')
+    if 'downvotes' not in columns:
+        cursor.execute('ALTER TABLE suggestions ADD COLUMN downvotes INTEGER NOT NULL DEFAULT 0')
+
+# Versão 9: anúncios de live com vários destinos por membro (servidor, canal)
+def _m009_destinos_live(conn):
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE stream_notifications_nova (
+            guild_id TEXT NOT NULL,
+            streamer_id TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            custom_message TEXT,
+            PRIMARY KEY (guild_id, streamer_id, channel_id)
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO stream_notifications_nova (guild_id, streamer_id, channel_id, custom_message)
+        SELECT guild_id, streamer_id, channel_id, custom_message FROM stream_notifications
+    ''')
+    cursor.execute('DROP TABLE stream_notifications')
+    cursor.execute('ALTER TABLE stream_notifications_nova RENAME TO stream_notifications')
+    # Todos os destinos de um streamer em uma consulta
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_stream_notifications_streamer ON stream_notifications (streamer_id)')
+
+# Versão 10: busca de texto (FTS5) em tickets e logs, sincronizada por triggers
+def _m010_busca_texto(conn):
+    cursor = conn.cursor()
+    # Tabelas de conteúdo externo: o índice aponta para as linhas de tickets/ticket_logs pelo rowid
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+            title, description,
+            content='tickets', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS ticket_logs_fts USING fts5(
+            details,
+            content='ticket_logs', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    # executescript faria COMMIT no meio da migração, então cada trigger é criado separadamente
+    triggers = [
+        '''
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_insert AFTER INSERT ON tickets BEGIN
+            INSERT INTO tickets_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_delete AFTER DELETE ON tickets BEGIN
+            INSERT INTO tickets_fts (tickets_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS tickets_fts_update AFTER UPDATE OF title, description ON tickets BEGIN
+            INSERT INTO tickets_fts (tickets_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tickets_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS ticket_logs_fts_insert AFTER INSERT ON ticket_logs BEGIN
+            INSERT INTO ticket_logs_fts (rowid, details) VALUES (new.id, new.details);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS ticket_logs_fts_delete AFTER DELETE ON ticket_logs BEGIN
+            INSERT INTO ticket_logs_fts (ticket_logs_fts, rowid, details) VALUES ('delete', old.id, old.details);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS ticket_logs_fts_update AFTER UPDATE OF details ON ticket_logs BEGIN
+            INSERT INTO ticket_logs_fts (ticket_logs_fts, rowid, details) VALUES ('delete', old.id, old.details);
+            INSERT INTO ticket_logs_fts (rowid, details) VALUES (new.id, new.details);
+        END
+        ''',
+    ]
+    for trigger in triggers:
+        cursor.execute(trigger)
+    # Indexa as linhas que já existiam
+    cursor.execute("INSERT INTO tickets_fts (tickets_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO ticket_logs_fts (ticket_logs_fts) VALUES ('rebuild')")
+
+# Versão 11: ações adiadas (apagar canais de tickets fechados), executadas pelo scheduler
+def _m011_acoes_pendentes(conn):
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pending_actions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            action TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            due_at REAL NOT NULL,
+            key TEXT UNIQUE,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pending_actions_due ON pending_actions (due_at)')
+
+# Versão 12: valores internos do bot (ex.: hash da árvore de comandos sincronizada)
+def _m012_meta(conn):
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bot_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+# Versão 13: servidor de cada ação agendada (com sharding, cada processo carrega só as suas).
+# Ações já pendentes ficam sem servidor e são executadas pelo processo principal.
+def _m013_acoes_por_servidor(conn):
+    conn.execute('ALTER TABLE pending_actions ADD COLUMN guild_id TEXT')
+
+# Lista ordenada de migrações: (versão, descrição, função)
+MIGRATIONS = [
+    (1, "schema inicial", _m001_schema_inicial),
+    (2, "índices de tickets, fila e logs", _m002_indices),
+    (3, "fila de espera por servidor", _m003_fila_por_servidor),
+    (4, "estatísticas incrementais de tickets", _m004_estatisticas),
+    (5, "índices de paginação de tickets", _m005_indices_paginacao),
+    (6, "painel da fila de espera", _m006_painel_fila),
+    (7, "registro de sugestões", _m007_sugestoes),
+    (8, "votos das sugestões", _m008_votos_sugestoes),
+    (9, "destinos de anúncios de live", _m009_destinos_live),
+    (10, "busca de texto em tickets e logs", _m010_busca_texto),
+    (11, "ações pendentes do agendador", _m011_acoes_pendentes),
+    (12, "metadados do bot", _m012_meta),
+    (13, "servidor das ações agendadas", _m013_acoes_por_servidor),
+]
+
+def get_schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+# Aplica as migrações pendentes e retorna a versão final do schema
+def run_migrations(conn):
+    current = get_schema_version(conn)
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        # IMMEDIATE: com vários processos (cluster.py), só um aplica a migração; os outros
+        # esperam o lock e encontram a versão já atualizada
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                current = version
+                continue
+            migrate(conn)
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"🧱 Migração {version} aplicada: {description}")
+        current = version
+    return current
@@ -0,0 +1,113 @@
+import os
+import time
+import asyncio
+import discord
+from config_cache import config_cache
+
+# Intervalo mínimo entre duas edições do painel de um servidor (segundos, configurável pelo .env)
+QUEUE_DASHBOARD_INTERVAL = float(os.getenv('QUEUE_DASHBOARD_INTERVAL', '5'))
+# Espera curta antes da primeira edição, para juntar entradas e retiradas feitas em rajada
+QUEUE_DASHBOARD_DELAY = float(os.getenv('QUEUE_DASHBOARD_DELAY', '1'))
+
+# Painel único da fila de espera por servidor.
+# Quem altera a fila só marca o servidor como "sujo"; uma tarefa por servidor espera o
+# intervalo e faz uma única edição com o estado atual. O id da mensagem fica em
+# bot_config.fila_dashboard_message_id, então o mesmo painel é reaproveitado após reiniciar.
+# Edições de um mesmo servidor passam por um lock, para duas não postarem painéis duplicados.
+class QueueDashboard:
+    def __init__(self, interval: float = QUEUE_DASHBOARD_INTERVAL, delay: float = QUEUE_DASHBOARD_DELAY):
+        self.interval = interval
+        self.delay = delay
+        self.bot = None
+        self.render = None
+        self.view = None
+        self._tasks = {}
+        self._last_edit = {}
+        self._locks = {}
+        self.edits = 0
+        self.requests = 0
+
+    # Liga o painel ao bot: render(guild) -> discord.Embed e a view persistente com o botão
+    def attach(self, bot, render, view: discord.ui.View):
+        self.bot = bot
+        self.render = render
+        self.view = view
+
+    # Pede uma atualização do painel do servidor (não espera a edição)
+    def mark_dirty(self, guild_id: int):
+        self.requests += 1
+        task = self._tasks.get(guild_id)
+        if task is None or task.done():
+            self._tasks[guild_id] = asyncio.create_task(self._update_later(guild_id))
+
+    async def _update_later(self, guild_id: int):
+        next_edit = self._last_edit.get(guild_id, 0) + self.interval
+        await asyncio.sleep(max(self.delay, next_edit - time.monotonic()))
+        # Pedidos feitos durante a edição abrem uma nova tarefa
+        del self._tasks[guild_id]
+        self._last_edit[guild_id] = time.monotonic()
+        try:
+            await self.refresh(guild_id)
+        except Exception as e:
+            print(f"❌ Erro ao atualizar painel da fila do servidor {guild_id}: {e}")
+
+    def _lock(self, guild_id: int) -> asyncio.Lock:
+        return self._locks.setdefault(int(guild_id), asyncio.Lock())
+
+    # Edita (ou cria) o painel agora
+    async def refresh(self, guild_id: int):
+        async with self._lock(guild_id):
+            await self._refresh(guild_id)
+
+    # Apaga o painel atual e posta um novo em outro canal (/postar-fila-tickets)
+    async def move(self, guild_id: int, channel_id: int):
+        async with self._lock(guild_id):
+            config = config_cache.get(guild_id)
+            guild = self.bot.get_guild(int(guild_id)) if self.bot else None
+            old_channel = guild.get_channel(int(config.fila_channel_id)) if guild and config.fila_channel_id else None
+            if old_channel and config.fila_dashboard_message_id:
+                try:
+                    await old_channel.get_partial_message(int(config.fila_dashboard_message_id)).delete()
+                except discord.HTTPException:
+                    pass
+            await config_cache.update(guild_id, fila_channel_id=str(channel_id), fila_dashboard_message_id=None)
+            await self._refresh(guild_id)
+
+    # Só com o lock do servidor: o id do painel é lido depois de adquiri-lo
+    async def _refresh(self, guild_id: int):
+        if self.bot is None:
+            return
+        guild = self.bot.get_guild(int(guild_id))
+        config = config_cache.get(guild_id)
+        if guild is None or not config.fila_channel_id:
+            return
+        channel = guild.get_channel(int(config.fila_channel_id))
+        if channel is None:
+            return
+        embed = self.render(guild)
+        if config.fila_dashboard_message_id:
+            try:
+                await channel.get_partial_message(int(config.fila_dashboard_message_id)).edit(embed=embed, view=self.view)
+                self.edits += 1
+                return
+            except discord.NotFound:
+                # Painel apagado manualmente: posta um novo
+                pass
+        message = await channel.send(embed=embed, view=self.view)
+        self.edits += 1
+        await config_cache.update(guild_id, fila_dashboard_message_id=str(message.id))
+
+    async def stop(self):
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks = {}
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "edits": self.edits,
+        }
+
+# Instância global usada por todo o bot
+queue_dashboard = QueueDashboard()
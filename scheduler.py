@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import heapq
+import asyncio
+from database import db
+
+# Tentativas antes de desistir de uma ação que falha (configurável pelo .env)
+SCHEDULER_MAX_ATTEMPTS = int(os.getenv('SCHEDULER_MAX_ATTEMPTS', '5'))
+# Espera antes da primeira nova tentativa (segundos); dobra a cada falha
+SCHEDULER_RETRY_DELAY = float(os.getenv('SCHEDULER_RETRY_DELAY', '30'))
+
+# Ações adiadas (ex.: apagar o canal de um ticket fechado) gravadas na tabela pending_actions.
+# Um heap em memória ordenado pelo horário de execução diz quanto tempo dormir até a próxima;
+# quem agenda só grava a linha e volta na hora. Ao iniciar, load() recupera o que ficou
+# pendente (inclusive o que venceu com o bot desligado, executado logo em seguida).
+# A linha só sai da tabela depois que a ação termina, então um reinício no meio não a perde.
+# Um handler pode marcar no payload as etapas já feitas; o payload é regravado a cada nova tentativa.
+class ActionScheduler:
+    def __init__(self, max_attempts: int = SCHEDULER_MAX_ATTEMPTS, retry_delay: float = SCHEDULER_RETRY_DELAY):
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        # nome da ação -> (handler(payload), on_give_up(payload, erro) ou None)
+        self._handlers = {}
+        # heap de (due_at, id); due_at é um timestamp Unix, válido entre reinícios
+        self._heap = []
+        # id -> [ação, payload, tentativas]
+        self._actions = {}
+        self._running = set()
+        self._wakeup = None
+        self._task = None
+        self.executed = 0
+        self.retried = 0
+        self.failed = 0
+
+    # Registra o código de uma ação; on_give_up é chamado quando as tentativas acabam
+    def register(self, action: str, handler, on_give_up=None):
+        self._handlers[action] = (handler, on_give_up)
+
+    def _push(self, action_id: int, action: str, payload: dict, due_at: float, attempts: int):
+        self._actions[action_id] = [action, payload, attempts]
+        heapq.heappush(self._heap, (due_at, action_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # Recupera as ações pendentes do banco (inicialização). Com `owns(guild_id)`, só as ações
+    # dos servidores deste processo (sharding: cada processo executa as suas)
+    async def load(self, owns=None):
+        rows = await db.fetchall('SELECT id, action, payload, due_at, attempts, guild_id FROM pending_actions')
+        self._heap = []
+        self._actions = {}
+        for action_id, action, payload, due_at, attempts, guild_id in rows:
+            if owns is not None and not owns(int(guild_id) if guild_id else None):
+                continue
+            self._push(action_id, action, json.loads(payload), due_at, attempts)
+        overdue = sum(1 for due_at, _ in self._heap if due_at <= time.time())
+        print(f"⏰ Ações pendentes recuperadas: {len(self._actions)} ({overdue} vencida(s))")
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    # Agenda uma ação para daqui a `delay` segundos. Com `key`, uma ação igual já pendente
+    # não é duplicada (ex.: dois cliques em "fechar"). guild_id diz qual processo a recupera
+    # após um reinício (ver load). Retorna o id ou None se já existia.
+    async def schedule(self, action: str, payload: dict, delay: float = 0, key: str = None, guild_id=None):
+        if action not in self._handlers:
+            raise ValueError(f"Ação não registrada: {action}")
+        due_at = time.time() + delay
+        cursor = await db.execute(
+            'INSERT OR IGNORE INTO pending_actions (action, payload, due_at, key, guild_id) VALUES (?, ?, ?, ?, ?)',
+            (action, json.dumps(payload), due_at, key, str(guild_id) if guild_id else None)
+        )
+        if cursor.rowcount == 0:
+            return None
+        self._push(cursor.lastrowid, action, payload, due_at, 0)
+        return cursor.lastrowid
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                _, action_id = heapq.heappop(self._heap)
+                if action_id in self._actions:
+                    task = asyncio.create_task(self._execute(action_id))
+                    self._running.add(task)
+                    task.add_done_callback(self._running.discard)
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, action_id: int):
+        action, payload, attempts = self._actions[action_id]
+        handler, on_give_up = self._handlers.get(action, (None, None))
+        try:
+            if handler is None:
+                raise ValueError(f"Ação não registrada: {action}")
+            await handler(payload)
+        except asyncio.CancelledError:
+            # Desligamento: a linha fica no banco e a ação roda no próximo início
+            raise
+        except Exception as e:
+            attempts += 1
+            if handler is not None and attempts < self.max_attempts:
+                delay = self.retry_delay * 2 ** (attempts - 1)
+                print(f"⚠️ Ação {action} #{action_id} falhou ({e}); nova tentativa em {delay:.0f}s")
+                self.retried += 1
+                due_at = time.time() + delay
+                # Grava também o payload: o handler pode marcar nele etapas já concluídas.
+                # Se o UPDATE falhar, a nova tentativa continua agendada em memória
+                try:
+                    await db.execute(
+                        'UPDATE pending_actions SET payload = ?, due_at = ?, attempts = ?, last_error = ? WHERE id = ?',
+                        (json.dumps(payload), due_at, attempts, str(e), action_id)
+                    )
+                except Exception as db_error:
+                    print(f"⚠️ Não foi possível gravar a nova tentativa da ação {action} #{action_id}: {db_error}")
+                self._push(action_id, action, payload, due_at, attempts)
+                return
+            print(f"❌ Ação {action} #{action_id} abandonada após {attempts} tentativa(s): {e}")
+            self.failed += 1
+            if on_give_up is not None:
+                try:
+                    await on_give_up(payload, e)
+                except Exception as give_up_error:
+                    print(f"❌ Erro ao tratar falha da ação {action} #{action_id}: {give_up_error}")
+        else:
+            self.executed += 1
+        del self._actions[action_id]
+        await db.execute('DELETE FROM pending_actions WHERE id = ?', (action_id,))
+
+    # Interrompe o agendador; ações em andamento continuam no banco para o próximo início
+    async def stop(self):
+        tasks = list(self._running)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._running = set()
+
+    def stats(self):
+        return {
+            "pending": len(self._actions),
+            "running": len(self._running),
+            "executed": self.executed,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+# Instância global usada por todo o bot
+scheduler = ActionScheduler()
@@ -0,0 +1,177 @@
+import os
+import math
+import time
+from collections import Counter
+import discord
+from metrics import metrics
+
+# Total de shards. Vazio = sem sharding (um único commands.Bot, como sempre);
+# "auto" = quantidade recomendada pelo Discord (configurável pelo .env)
+SHARD_COUNT = os.getenv('SHARD_COUNT', '').strip().lower()
+# Shards deste processo, ex.: "0,1" ou "4-7" (vazio = todos). Exige SHARD_COUNT numérico.
+SHARD_IDS = os.getenv('SHARD_IDS', '').strip()
+# Posição deste processo no cluster e total de processos (definidos pelo cluster.py; só para exibição)
+CLUSTER_ID = int(os.getenv('CLUSTER_ID', '0') or 0)
+CLUSTER_SIZE = int(os.getenv('CLUSTER_SIZE', '1') or 1)
+
+# Janela da taxa de eventos: SHARD_RATE_BUCKETS faixas de SHARD_RATE_BUCKET_SECONDS segundos
+SHARD_RATE_BUCKET_SECONDS = 10
+SHARD_RATE_BUCKETS = 6
+
+# "0,2,4-7" -> [0, 2, 4, 5, 6, 7]
+def parse_shard_ids(text: str):
+    shard_ids = set()
+    for part in text.replace(' ', '').split(','):
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            shard_ids.update(range(int(first), int(last) + 1))
+        else:
+            shard_ids.add(int(part))
+    return sorted(shard_ids)
+
+# Shard que recebe os eventos de um servidor (fórmula do Discord)
+def shard_for_guild(guild_id, shard_count: int) -> int:
+    if guild_id is None or shard_count <= 1:
+        return 0
+    return (int(guild_id) >> 22) % shard_count
+
+# Configuração de sharding deste processo, lida do .env.
+# Com sharding, cada processo recebe só os eventos dos servidores dos seus shards; o banco é
+# compartilhado, então o que é carregado por servidor (ações agendadas, anúncios de live) fica
+# com o processo dono do servidor, e o trabalho único do bot (sincronizar comandos, ações sem
+# servidor) fica com o processo principal: o que tem o shard 0 (único mesmo com várias máquinas).
+class ShardConfig:
+    def __init__(self, shard_count: str = SHARD_COUNT, shard_ids: str = SHARD_IDS,
+                 cluster_id: int = CLUSTER_ID, cluster_size: int = CLUSTER_SIZE):
+        self.enabled = bool(shard_count)
+        self.shard_count = int(shard_count) if shard_count.isdigit() else None
+        self.shard_ids = parse_shard_ids(shard_ids) if shard_ids else None
+        self.cluster_id = cluster_id
+        self.cluster_size = cluster_size
+        if self.shard_ids is not None:
+            if self.shard_count is None:
+                raise ValueError("SHARD_IDS exige SHARD_COUNT numérico")
+            invalid = [shard_id for shard_id in self.shard_ids if shard_id >= self.shard_count]
+            if invalid:
+                raise ValueError(f"SHARD_IDS fora do intervalo 0-{self.shard_count - 1}: {invalid}")
+
+    # Outros processos cuidam do resto dos shards (e usam o mesmo banco)
+    @property
+    def clustered(self) -> bool:
+        return self.shard_ids is not None and len(self.shard_ids) < self.shard_count
+
+    @property
+    def primary(self) -> bool:
+        return self.shard_ids is None or 0 in self.shard_ids
+
+    # Argumentos extras para criar o bot (AutoShardedBot quando enabled)
+    def bot_options(self) -> dict:
+        if not self.enabled:
+            return {}
+        options = {"shard_count": self.shard_count}
+        if self.shard_ids is not None:
+            options["shard_ids"] = self.shard_ids
+        return options
+
+    # Se os eventos deste servidor chegam a este processo; guild_id None = trabalho do processo principal
+    def owns_guild(self, guild_id) -> bool:
+        if guild_id is None:
+            return self.primary
+        if self.shard_ids is None:
+            return True
+        return shard_for_guild(guild_id, self.shard_count) in self.shard_ids
+
+    def describe(self) -> str:
+        if not self.enabled:
+            return "sem sharding"
+        shards = ",".join(map(str, self.shard_ids)) if self.shard_ids is not None else "todos"
+        return f"shards {shards} de {self.shard_count or 'auto'} (processo {self.cluster_id + 1}/{self.cluster_size})"
+
+# Saúde e volume de eventos de cada shard deste processo.
+# event() é chamado nos handlers de eventos (caminho rápido): só soma em memória.
+# As quedas e retomadas vêm dos eventos on_shard_* do AutoShardedBot.
+class ShardMonitor:
+    def __init__(self, bucket_seconds: int = SHARD_RATE_BUCKET_SECONDS, buckets: int = SHARD_RATE_BUCKETS):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.shard_count = 1
+        # shard -> Counter(tipo de evento -> total)
+        self._events = {}
+        # shard -> [índice da faixa atual, contagens por faixa]
+        self._windows = {}
+        # shard -> Counter(connect | disconnect | ready | resumed -> total)
+        self._changes = {}
+        # shard -> momento (time.time) da última mudança de estado
+        self._last_change = {}
+        self.state_changes = metrics.counter("bot_shard_state_changes_total", "Conexões, quedas e retomadas de cada shard")
+
+    def attach(self, bot):
+        self.shard_count = bot.shard_count or 1
+
+    def event(self, guild_id, kind: str):
+        shard_id = shard_for_guild(guild_id, self.shard_count)
+        events = self._events.get(shard_id)
+        if events is None:
+            events = self._events[shard_id] = Counter()
+            self._windows[shard_id] = [0, [0] * self.buckets]
+        events[kind] += 1
+        window = self._windows[shard_id]
+        index = int(time.monotonic() // self.bucket_seconds)
+        if index != window[0]:
+            self._roll(window, index)
+        window[1][index % self.buckets] += 1
+
+    # Zera as faixas que ficaram para trás desde o último evento
+    def _roll(self, window, index: int):
+        for stale in range(max(window[0] + 1, index - self.buckets + 1), index + 1):
+            window[1][stale % self.buckets] = 0
+        window[0] = index
+
+    # Eventos por segundo no último minuto
+    def rate(self, shard_id: int) -> float:
+        window = self._windows.get(shard_id)
+        if window is None:
+            return 0.0
+        self._roll(window, int(time.monotonic() // self.bucket_seconds))
+        return sum(window[1]) / (self.bucket_seconds * self.buckets)
+
+    def change(self, shard_id: int, kind: str):
+        self._changes.setdefault(shard_id, Counter())[kind] += 1
+        self.state_changes.inc(shard=shard_id, change=kind)
+        self._last_change[shard_id] = time.time()
+
+    # Um item por shard deste processo: estado, latência do heartbeat, eventos e quedas
+    def stats(self, bot):
+        if isinstance(bot, discord.AutoShardedClient):
+            # Antes de conectar, bot.shards ainda está vazio: os shards configurados aparecem desligados
+            shards = []
+            for shard_id in sorted(set(bot.shard_ids or ()) | set(bot.shards)):
+                shard = bot.get_shard(shard_id)
+                if shard is None:
+                    shards.append((shard_id, math.inf, True))
+                else:
+                    shards.append((shard_id, shard.latency, shard.is_closed()))
+        else:
+            shards = [(bot.shard_id or 0, bot.latency, bot.is_closed())]
+        result = []
+        for shard_id, latency, closed in shards:
+            changes = self._changes.get(shard_id, Counter())
+            online = not closed and math.isfinite(latency)
+            result.append({
+                "shard": shard_id,
+                "online": online,
+                "latency": latency if math.isfinite(latency) else None,
+                "events": sum(self._events.get(shard_id, Counter()).values()),
+                "event_types": dict(self._events.get(shard_id, Counter())),
+                "rate": self.rate(shard_id),
+                "disconnects": changes["disconnect"],
+                "resumes": changes["resumed"],
+                "last_change": self._last_change.get(shard_id),
+            })
+        return result
+
+# Instâncias globais usadas por todo o bot
+shard_config = ShardConfig()
+shard_monitor = ShardMonitor()
@@ -0,0 +1,103 @@
+import os
+import time
+import asyncio
+from database import db
+
+# Tempo mínimo entre dois anúncios de live do mesmo streamer no mesmo canal (segundos,
+# configurável pelo .env). Evita anúncios repetidos quando a transmissão cai e volta em seguida.
+LIVE_COOLDOWN = float(os.getenv('LIVE_COOLDOWN', '1800'))
+# Máximo de anúncios enviados ao mesmo tempo
+LIVE_FANOUT_CONCURRENCY = int(os.getenv('LIVE_FANOUT_CONCURRENCY', '5'))
+
+# Índice em memória dos anúncios configurados pelo /config-live.
+# O on_presence_update recebe mudanças de presença de todos os membros visíveis;
+# só os que estão neste índice chegam a olhar atividades. Cada streamer pode ter vários
+# destinos (servidor, canal), cada um com seu próprio intervalo entre anúncios.
+class StreamMonitor:
+    def __init__(self, cooldown: float = LIVE_COOLDOWN, concurrency: int = LIVE_FANOUT_CONCURRENCY):
+        self.cooldown = cooldown
+        self.concurrency = concurrency
+        # streamer_id (int) -> {(guild_id, channel_id): mensagem customizada}
+        self.targets = {}
+        # (streamer_id, guild_id, channel_id) -> momento (monotonic) do último anúncio
+        self._last_announce = {}
+        self._semaphore = None
+        self.suppressed = 0
+        self.sent = 0
+        self.failed = 0
+
+    # Com `owns(guild_id)`, carrega só os destinos dos servidores deste processo (sharding)
+    async def load(self, owns=None):
+        rows = await db.fetchall('SELECT streamer_id, guild_id, channel_id, custom_message FROM stream_notifications')
+        self.targets = {}
+        loaded = 0
+        for streamer_id, guild_id, channel_id, custom_message in rows:
+            if owns is not None and not owns(int(guild_id)):
+                continue
+            self.targets.setdefault(int(streamer_id), {})[(int(guild_id), int(channel_id))] = custom_message
+            loaded += 1
+        print(f"🔴 Streamers monitorados: {len(self.targets)} ({loaded} destino(s))")
+
+    def add(self, streamer_id, guild_id, channel_id, custom_message: str = None):
+        self.targets.setdefault(int(streamer_id), {})[(int(guild_id), int(channel_id))] = custom_message
+
+    # Remove um destino (ou todos do servidor, se channel_id for None)
+    def remove(self, streamer_id, guild_id, channel_id=None):
+        streamer_id, guild_id = int(streamer_id), int(guild_id)
+        targets = self.targets.get(streamer_id, {})
+        for target in [t for t in targets if t[0] == guild_id and (channel_id is None or t[1] == int(channel_id))]:
+            del targets[target]
+            self._last_announce.pop((streamer_id, *target), None)
+        if not targets:
+            self.targets.pop(streamer_id, None)
+
+    # Destinos do streamer fora do intervalo entre anúncios; já ficam marcados como anunciados.
+    # Retorna lista de (guild_id, channel_id, mensagem customizada).
+    def claim_targets(self, streamer_id):
+        streamer_id = int(streamer_id)
+        now = time.monotonic()
+        claimed = []
+        for (guild_id, channel_id), custom_message in self.targets.get(streamer_id, {}).items():
+            key = (streamer_id, guild_id, channel_id)
+            last = self._last_announce.get(key)
+            if last is not None and now - last < self.cooldown:
+                self.suppressed += 1
+                continue
+            self._last_announce[key] = now
+            claimed.append((guild_id, channel_id, custom_message))
+        return claimed
+
+    # Libera o intervalo de um destino cujo anúncio falhou
+    def release(self, streamer_id, guild_id, channel_id):
+        self._last_announce.pop((int(streamer_id), int(guild_id), int(channel_id)), None)
+
+    # Envia os anúncios em paralelo, no máximo `concurrency` ao mesmo tempo.
+    # sends: lista de (canal, conteúdo, embed). Retorna a lista de exceções (None = enviado).
+    async def fan_out(self, sends):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _send(channel, content, embed):
+            async with self._semaphore:
+                try:
+                    await channel.send(content, embed=embed)
+                    self.sent += 1
+                    return None
+                except Exception as e:
+                    self.failed += 1
+                    print(f"Erro ao anunciar live no canal {channel.id}: {e}")
+                    return e
+
+        return await asyncio.gather(*(_send(channel, content, embed) for channel, content, embed in sends))
+
+    def stats(self):
+        return {
+            "streamers": len(self.targets),
+            "targets": sum(len(targets) for targets in self.targets.values()),
+            "suppressed": self.suppressed,
+            "sent": self.sent,
+            "failed": self.failed,
+        }
+
+# Instância global usada por todo o bot
+stream_monitor = StreamMonitor()
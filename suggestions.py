@@ -0,0 +1,175 @@
+import os
+import asyncio
+from bisect import bisect_left, insort
+from database import db
+
+# Registro das sugestões enviadas nos canais de sugestão.
+# O id da sugestão é o id da mensagem original do membro (mostrado no rodapé do embed);
+# a tabela guarda onde está a mensagem repostada pelo bot, então aprovar ou rejeitar
+# é uma consulta pela chave primária e um fetch_message, sem ler o histórico do canal.
+#
+# Os votos (reações 👍/👎 na mensagem repostada) são contados em memória e gravados em
+# lote a cada SUGGESTION_FLUSH_INTERVAL segundos. Um ranking ordenado por servidor
+# responde o /top-sugestoes sem consultar o histórico dos canais.
+
+SUGGESTION_COLUMNS = 'id, guild_id, channel_id, message_id, author_id, author_name, content, status'
+
+UPVOTE = "👍"
+DOWNVOTE = "👎"
+
+SUGGESTION_FLUSH_INTERVAL = float(os.getenv('SUGGESTION_FLUSH_INTERVAL', '10'))
+
+class SuggestionStore:
+    def __init__(self, flush_interval: float = SUGGESTION_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        # id da sugestão -> [guild_id, status, votos a favor, votos contra]
+        self._suggestions = {}
+        # id (int) da mensagem repostada -> id da sugestão, para filtrar reações sem I/O
+        self._by_message = {}
+        # guild_id -> lista ordenada de chaves de ranking (sugestões não rejeitadas)
+        self._rankings = {}
+        self._dirty = set()
+        self._task = None
+        self.flushes = 0
+
+    # Chave de ordenação: maior saldo primeiro, depois mais votos a favor, depois a mais antiga
+    @staticmethod
+    def _rank_key(suggestion_id: str, upvotes: int, downvotes: int):
+        return (downvotes - upvotes, -upvotes, int(suggestion_id))
+
+    def _add(self, suggestion_id: str, guild_id: str, message_id, status: str, upvotes: int, downvotes: int):
+        self._suggestions[suggestion_id] = [guild_id, status, upvotes, downvotes]
+        self._by_message[int(message_id)] = suggestion_id
+        self._rank(suggestion_id)
+
+    # Sugestões rejeitadas ficam fora do ranking
+    def _rank(self, suggestion_id: str):
+        guild_id, status, upvotes, downvotes = self._suggestions[suggestion_id]
+        if status != 'rejeitada':
+            insort(self._rankings.setdefault(guild_id, []), self._rank_key(suggestion_id, upvotes, downvotes))
+
+    def _unrank(self, suggestion_id: str):
+        guild_id, status, upvotes, downvotes = self._suggestions[suggestion_id]
+        ranking = self._rankings.get(guild_id)
+        if status == 'rejeitada' or not ranking:
+            return
+        key = self._rank_key(suggestion_id, upvotes, downvotes)
+        index = bisect_left(ranking, key)
+        if index < len(ranking) and ranking[index] == key:
+            del ranking[index]
+
+    # Carrega sugestões e votos do banco (inicialização)
+    async def load(self):
+        rows = await db.fetchall('SELECT id, guild_id, message_id, status, upvotes, downvotes FROM suggestions')
+        self._suggestions = {}
+        self._by_message = {}
+        self._rankings = {}
+        for suggestion_id, guild_id, message_id, status, upvotes, downvotes in rows:
+            self._add(suggestion_id, guild_id, message_id, status, upvotes, downvotes)
+        print(f"💡 Sugestões carregadas: {len(rows)}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    # Registra a sugestão repostada pelo bot
+    async def create(self, suggestion_id, guild_id, channel_id, message_id, author_id, author_name: str, content: str):
+        await db.execute('''
+            INSERT OR IGNORE INTO suggestions (id, guild_id, channel_id, message_id, author_id, author_name, content)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (str(suggestion_id), str(guild_id), str(channel_id), str(message_id), str(author_id), author_name, content))
+        if str(suggestion_id) not in self._suggestions:
+            self._add(str(suggestion_id), str(guild_id), message_id, 'pendente', 0, 0)
+
+    # Busca uma sugestão do servidor pelo id; retorna a linha (SUGGESTION_COLUMNS) ou None
+    async def get(self, guild_id, suggestion_id):
+        return await db.fetchone(
+            f'SELECT {SUGGESTION_COLUMNS} FROM suggestions WHERE id = ? AND guild_id = ?',
+            (str(suggestion_id).strip(), str(guild_id))
+        )
+
+    # Muda o status de uma sugestão pendente; retorna False se outra pessoa já a revisou
+    async def review(self, suggestion_id, status: str, reviewed_by, reason: str = None) -> bool:
+        suggestion_id = str(suggestion_id)
+        cursor = await db.execute('''
+            UPDATE suggestions
+            SET status = ?, reviewed_by = ?, reviewed_at = CURRENT_TIMESTAMP, reason = ?
+            WHERE id = ? AND status = 'pendente'
+        ''', (status, str(reviewed_by), reason, suggestion_id))
+        if cursor.rowcount == 0:
+            return False
+        if suggestion_id in self._suggestions:
+            self._unrank(suggestion_id)
+            self._suggestions[suggestion_id][1] = status
+            self._rank(suggestion_id)
+        return True
+
+    # Verifica se a mensagem é uma sugestão repostada pelo bot (sem I/O)
+    def is_suggestion_message(self, message_id: int) -> bool:
+        return message_id in self._by_message
+
+    # Conta (delta=1) ou desconta (delta=-1) uma reação na mensagem repostada
+    def vote(self, message_id: int, emoji: str, delta: int):
+        suggestion_id = self._by_message.get(message_id)
+        if suggestion_id is None or emoji not in (UPVOTE, DOWNVOTE):
+            return
+        self._unrank(suggestion_id)
+        suggestion = self._suggestions[suggestion_id]
+        index = 2 if emoji == UPVOTE else 3
+        suggestion[index] = max(0, suggestion[index] + delta)
+        self._rank(suggestion_id)
+        self._dirty.add(suggestion_id)
+
+    # As N sugestões com maior saldo do servidor: lista de (id, votos a favor, votos contra, status)
+    def top(self, guild_id, limit: int = 10):
+        result = []
+        for _, _, suggestion_id in self._rankings.get(str(guild_id), [])[:limit]:
+            suggestion_id = str(suggestion_id)
+            _, status, upvotes, downvotes = self._suggestions[suggestion_id]
+            result.append((suggestion_id, upvotes, downvotes, status))
+        return result
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    # Grava os contadores alterados desde o último flush em uma única transação
+    async def flush(self):
+        if not self._dirty:
+            return
+        dirty = self._dirty
+        self._dirty = set()
+        # Valores absolutos: regravar a mesma sugestão duas vezes não conta votos em dobro
+        rows = [
+            (self._suggestions[suggestion_id][2], self._suggestions[suggestion_id][3], suggestion_id)
+            for suggestion_id in dirty
+            if suggestion_id in self._suggestions
+        ]
+        try:
+            await db.executemany('UPDATE suggestions SET upvotes = ?, downvotes = ? WHERE id = ?', rows)
+            self.flushes += 1
+        except Exception as e:
+            print(f"❌ Erro ao gravar votos de sugestões ({len(rows)}): {e}")
+            self._dirty |= dirty
+
+    # Grava o que restou e encerra a tarefa (usado no desligamento do bot)
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self):
+        return {
+            "suggestions": len(self._suggestions),
+            "pending_votes": len(self._dirty),
+            "flushes": self.flushes,
+        }
+
+# Instância global usada por todo o bot
+suggestion_store = SuggestionStore()
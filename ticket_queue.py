@@ -0,0 +1,171 @@
+import os
+import heapq
+import calendar
+from collections import namedtuple, Counter
+from datetime import datetime, timezone
+from database import db
+
+# Fila de espera de tickets, separada por servidor.
+# A ordem fica em memória (um heap por servidor); a tabela ticket_queue é o registro
+# durável, usado para reconstruir a fila ao iniciar.
+
+QUEUE_COLUMNS = 'id, guild_id, user_id, username, category, title, description, created_at'
+
+QueueEntry = namedtuple('QueueEntry', QUEUE_COLUMNS.replace(',', ''))
+
+# Prioridade por categoria (menor = atendido antes), configurável por QUEUE_PRIORITIES no .env
+# Ex: QUEUE_PRIORITIES=denuncia=0,suporte_tecnico=1,ticket_geral=2,recrutamento=2
+DEFAULT_PRIORITIES = {
+    "denuncia": 0,
+    "suporte_tecnico": 1,
+    "ticket_geral": 2,
+    "recrutamento": 2,
+}
+DEFAULT_PRIORITY = 2
+
+# Envelhecimento: cada nível de prioridade equivale a este tempo de espera (segundos).
+# Um ticket de prioridade menor passa na frente de um mais prioritário que chegou
+# mais de (diferença de níveis x QUEUE_AGING_SECONDS) depois dele, então ninguém fica parado.
+QUEUE_AGING_SECONDS = int(os.getenv('QUEUE_AGING_SECONDS', '600'))
+
+def load_priorities():
+    priorities = dict(DEFAULT_PRIORITIES)
+    raw = os.getenv('QUEUE_PRIORITIES', '')
+    for item in raw.split(','):
+        if '=' not in item:
+            continue
+        category, value = item.split('=', 1)
+        try:
+            priorities[category.strip()] = int(value)
+        except ValueError:
+            print(f"⚠️ Prioridade inválida para '{category.strip()}' em QUEUE_PRIORITIES: {value}")
+    return priorities
+
+def _utc_now_text():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+# Converte o created_at do banco (UTC, 'AAAA-MM-DD HH:MM:SS') em segundos
+def created_timestamp(created_at: str) -> float:
+    return calendar.timegm(datetime.strptime(created_at.split('.')[0], '%Y-%m-%d %H:%M:%S').timetuple())
+
+class QueueEngine:
+    def __init__(self, priorities=None, aging_seconds: int = QUEUE_AGING_SECONDS):
+        self.priorities = priorities if priorities is not None else load_priorities()
+        self.aging_seconds = aging_seconds
+        self._heaps = {}
+        self._entries = {}
+        # (guild_id, user_id, category) -> id da entrada, para checar duplicidade sem I/O
+        self._queued = {}
+        self._category_counts = {}
+
+    # Chave de ordenação fixa: chegada + penalidade da categoria. Por ser fixa, o heap
+    # continua válido com o passar do tempo (envelhecimento linear sem reordenar).
+    def _key(self, entry: QueueEntry):
+        priority = self.priorities.get(entry.category, DEFAULT_PRIORITY)
+        return (created_timestamp(entry.created_at) + priority * self.aging_seconds, entry.id)
+
+    def _push(self, entry: QueueEntry):
+        self._entries[entry.id] = entry
+        self._queued[(entry.guild_id, entry.user_id, entry.category)] = entry.id
+        self._category_counts.setdefault(entry.guild_id, Counter())[entry.category] += 1
+        heapq.heappush(self._heaps.setdefault(entry.guild_id, []), (self._key(entry), entry.id))
+
+    def _forget(self, entry: QueueEntry):
+        self._queued.pop((entry.guild_id, entry.user_id, entry.category), None)
+        counts = self._category_counts.get(entry.guild_id)
+        if counts is not None:
+            counts[entry.category] -= 1
+            if counts[entry.category] <= 0:
+                del counts[entry.category]
+
+    # Reconstrói a fila a partir do banco (inicialização)
+    async def load(self):
+        rows = await db.fetchall(f'SELECT {QUEUE_COLUMNS} FROM ticket_queue WHERE guild_id IS NOT NULL')
+        self._heaps = {}
+        self._entries = {}
+        self._queued = {}
+        self._category_counts = {}
+        for row in rows:
+            entry = QueueEntry(*row)
+            self._entries[entry.id] = entry
+            self._queued[(entry.guild_id, entry.user_id, entry.category)] = entry.id
+            self._category_counts.setdefault(entry.guild_id, Counter())[entry.category] += 1
+            self._heaps.setdefault(entry.guild_id, []).append((self._key(entry), entry.id))
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+        print(f"🕒 Fila de espera carregada: {len(rows)} ticket(s)")
+        # Entradas anteriores à fila por servidor que a migração 3 não conseguiu atribuir
+        orphans = await db.fetchone('SELECT COUNT(*) FROM ticket_queue WHERE guild_id IS NULL')
+        if orphans and orphans[0]:
+            print(f"⚠️ {orphans[0]} ticket(s) na fila sem servidor (guild_id vazio) ignorados: preencha ticket_queue.guild_id manualmente")
+
+    # Verifica se o usuário já está na fila do servidor para a categoria (sem I/O)
+    def is_queued(self, guild_id, user_id, category: str) -> bool:
+        return (str(guild_id), str(user_id), category) in self._queued
+
+    # Adiciona um ticket à fila; retorna a entrada ou None se o usuário já estava na fila
+    async def enqueue(self, guild_id, user_id, username: str, category: str, title: str, description: str):
+        guild_id, user_id = str(guild_id), str(user_id)
+        key = (guild_id, user_id, category)
+        if key in self._queued:
+            return None
+        # Reserva antes de gravar, para dois envios simultâneos não entrarem os dois
+        self._queued[key] = None
+        created_at = _utc_now_text()
+        try:
+            cursor = await db.execute('''
+                INSERT INTO ticket_queue (guild_id, user_id, username, category, title, description, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (guild_id, user_id, username, category, title, description, created_at))
+        except Exception:
+            del self._queued[key]
+            raise
+        entry = QueueEntry(cursor.lastrowid, guild_id, user_id, username, category, title, description, created_at)
+        self._push(entry)
+        return entry
+
+    # Retira o próximo ticket do servidor (maior prioridade, considerando o envelhecimento).
+    # A remoção no banco usa DELETE ... RETURNING: se outra instância já levou a entrada,
+    # ela é descartada e o próximo da fila é tentado.
+    async def claim(self, guild_id):
+        heap = self._heaps.get(str(guild_id))
+        while heap:
+            _, queue_id = heapq.heappop(heap)
+            entry = self._entries.pop(queue_id, None)
+            if entry is None:
+                continue
+            self._forget(entry)
+            try:
+                row = await db.execute_fetchone(
+                    f'DELETE FROM ticket_queue WHERE id = ? RETURNING {QUEUE_COLUMNS}',
+                    (queue_id,)
+                )
+            except Exception:
+                # Falhou ao gravar: o ticket continua na fila
+                self._push(entry)
+                raise
+            if row:
+                return QueueEntry(*row)
+        return None
+
+    # Entradas do servidor que estão esperando há mais tempo (da mais antiga para a mais nova)
+    def oldest(self, guild_id, limit: int = 5):
+        heap = self._heaps.get(str(guild_id), [])
+        entries = (self._entries[queue_id] for _, queue_id in heap if queue_id in self._entries)
+        return heapq.nsmallest(limit, entries, key=lambda entry: (entry.created_at, entry.id))
+
+    def size(self, guild_id) -> int:
+        return sum(self._category_counts.get(str(guild_id), {}).values())
+
+    def category_counts(self, guild_id) -> dict:
+        return dict(self._category_counts.get(str(guild_id), {}))
+
+    # Tamanho da fila de cada servidor com entradas: {guild_id: quantidade}
+    def sizes(self) -> dict:
+        return {guild_id: sum(counts.values()) for guild_id, counts in self._category_counts.items() if counts}
+
+    def total_size(self) -> int:
+        return len(self._entries)
+
+# Instância global usada por todo o bot
+queue_engine = QueueEngine()
@@ -0,0 +1,83 @@
+import re
+from database import db
+
+# Busca de texto em tickets (título e descrição) e nos detalhes dos logs, usando os índices
+# FTS5 criados pela migração 10. Resultados ordenados por relevância (bm25).
+
+# Peso de cada coluna no bm25 de tickets_fts: título vale mais que descrição
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+# Acertos só nos logs contam menos que acertos no próprio ticket (bm25 é negativo: menor = melhor)
+LOG_WEIGHT = 0.5
+
+# Cada índice entrega só os melhores candidatos (ORDER BY score LIMIT), sem juntar todas as
+# linhas encontradas com tickets/ticket_logs; depois os candidatos são unidos por ticket.
+# Um ticket pode ter vários logs encontrados, por isso os logs recebem mais candidatos.
+LOG_CANDIDATES_FACTOR = 4
+
+SEARCH_QUERY = f'''
+    WITH ticket_hits AS (
+        SELECT tickets_fts.rowid AS ticket_id, bm25(tickets_fts, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) AS score
+        FROM tickets_fts
+        {{ticket_join}}
+        WHERE tickets_fts MATCH :query {{ticket_filter}}
+        ORDER BY score
+        LIMIT :candidates
+    ),
+    log_hits AS (
+        SELECT ticket_logs.ticket_id, best.score
+        FROM (
+            SELECT ticket_logs_fts.rowid AS log_id, bm25(ticket_logs_fts) * {LOG_WEIGHT} AS score
+            FROM ticket_logs_fts
+            {{log_join}}
+            WHERE ticket_logs_fts MATCH :query {{log_filter}}
+            ORDER BY score
+            LIMIT :candidates * {LOG_CANDIDATES_FACTOR}
+        ) AS best
+        JOIN ticket_logs ON ticket_logs.id = best.log_id
+    )
+    SELECT tickets.id, tickets.username, tickets.category, tickets.title, tickets.status, tickets.created_at
+    FROM (
+        SELECT ticket_id, MIN(score) AS score
+        FROM (SELECT * FROM ticket_hits UNION ALL SELECT * FROM log_hits)
+        GROUP BY ticket_id
+    ) AS best
+    JOIN tickets ON tickets.id = best.ticket_id
+    ORDER BY best.score, tickets.id DESC
+    LIMIT :limit OFFSET :offset
+'''
+
+# Filtro de status aplicado antes de escolher os candidatos, para não faltar resultado
+STATUS_FILTER = {
+    "ticket_join": "JOIN tickets ON tickets.id = tickets_fts.rowid",
+    "ticket_filter": "AND tickets.status = :status",
+    "log_join": "JOIN ticket_logs ON ticket_logs.id = ticket_logs_fts.rowid JOIN tickets ON tickets.id = ticket_logs.ticket_id",
+    "log_filter": "AND tickets.status = :status",
+}
+NO_FILTER = dict.fromkeys(STATUS_FILTER, "")
+
+# Converte o texto digitado em uma consulta FTS5 segura: cada palavra vira um termo entre
+# aspas com busca por prefixo, e todas precisam aparecer. Retorna None se não houver palavras.
+def build_match_query(text: str):
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words[:16])
+
+# Uma página de resultados; retorna (linhas, existe_próxima).
+# Cada linha: (id, username, category, title, status, created_at), como em fetch_ticket_page.
+async def search_tickets(text: str, page_size: int, offset: int = 0, status: str = None):
+    query = build_match_query(text)
+    if query is None:
+        return [], False
+    rows = await db.fetchall(
+        SEARCH_QUERY.format(**(STATUS_FILTER if status else NO_FILTER)),
+        {
+            "query": query,
+            "limit": page_size + 1,
+            "offset": offset,
+            "candidates": offset + page_size + 1,
+            "status": status,
+        }
+    )
+    return rows[:page_size], len(rows) > page_size
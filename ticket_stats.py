@@ -0,0 +1,133 @@
+from collections import Counter
+from datetime import datetime, timezone
+from database import db
+
+# Estatísticas de tickets mantidas de forma incremental.
+# A tabela ticket_stats guarda contadores (chave -> valor) atualizados na mesma transação
+# que cria ou fecha o ticket; uma cópia em memória responde o /stats-tickets sem consultas.
+#
+# Chaves: total, usuarios, status:<status>, categoria:<categoria>, dia:<AAAA-MM-DD> (UTC)
+
+def _today():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+def _apply(conn, deltas: Counter):
+    conn.executemany('''
+        INSERT INTO ticket_stats (chave, valor) VALUES (?, ?)
+        ON CONFLICT(chave) DO UPDATE SET valor = valor + excluded.valor
+    ''', [(key, value) for key, value in deltas.items() if value])
+
+# Recalcula todos os contadores a partir da tabela tickets
+def _compute_counters(conn) -> Counter:
+    counters = Counter()
+    cursor = conn.cursor()
+    counters['total'] = cursor.execute('SELECT COUNT(*) FROM tickets').fetchone()[0]
+    counters['usuarios'] = cursor.execute('SELECT COUNT(DISTINCT user_id) FROM tickets').fetchone()[0]
+    for status, count in cursor.execute('SELECT status, COUNT(*) FROM tickets GROUP BY status'):
+        counters[f'status:{status}'] = count
+    for category, count in cursor.execute('SELECT category, COUNT(*) FROM tickets GROUP BY category'):
+        counters[f'categoria:{category}'] = count
+    for day, count in cursor.execute('SELECT DATE(created_at), COUNT(*) FROM tickets GROUP BY DATE(created_at)'):
+        counters[f'dia:{day}'] = count
+    return counters
+
+class TicketStats:
+    def __init__(self):
+        self._counters = Counter()
+
+    async def load(self):
+        await self.refresh()
+        # Tabela nova (primeira execução após a migração): calcula tudo uma vez
+        if 'total' not in self._counters:
+            await self.rebuild()
+        print(f"📊 Estatísticas carregadas: {self._counters['total']} ticket(s)")
+
+    # Relê os contadores do banco. Com vários processos (cluster.py) os outros também somam
+    # na tabela, então a cópia em memória de cada um só vê as próprias mudanças.
+    async def refresh(self):
+        rows = await db.fetchall('SELECT chave, valor FROM ticket_stats')
+        self._counters = Counter(dict(rows))
+
+    # Recalcula do zero e retorna as diferenças encontradas (chave -> (antes, depois))
+    async def rebuild(self):
+        def _rebuild(conn):
+            with conn:
+                counters = _compute_counters(conn)
+                conn.execute('DELETE FROM ticket_stats')
+                conn.executemany('INSERT INTO ticket_stats (chave, valor) VALUES (?, ?)', list(counters.items()))
+            return counters
+
+        counters = await db.run(_rebuild)
+        drift = {
+            key: (self._counters.get(key, 0), counters.get(key, 0))
+            for key in set(self._counters) | set(counters)
+            if self._counters.get(key, 0) != counters.get(key, 0)
+        }
+        self._counters = counters
+        return drift
+
+    # Cria o ticket e atualiza os contadores na mesma transação; retorna o id do ticket
+    async def create_ticket(self, user_id, username: str, category: str, title: str, description: str, channel_id, assigned_to):
+        def _create(conn):
+            with conn:
+                cursor = conn.execute('''
+                    INSERT INTO tickets (user_id, username, category, title, description, channel_id, assigned_to)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (str(user_id), username, category, title, description, str(channel_id), str(assigned_to)))
+                ticket_id = cursor.lastrowid
+                created_day = conn.execute('SELECT DATE(created_at) FROM tickets WHERE id = ?', (ticket_id,)).fetchone()[0]
+                deltas = Counter({
+                    'total': 1,
+                    'status:aberto': 1,
+                    f'categoria:{category}': 1,
+                    f'dia:{created_day}': 1,
+                })
+                # Primeiro ticket deste usuário
+                if not conn.execute('SELECT 1 FROM tickets WHERE user_id = ? AND id <> ? LIMIT 1', (str(user_id), ticket_id)).fetchone():
+                    deltas['usuarios'] = 1
+                _apply(conn, deltas)
+            return ticket_id, deltas
+
+        ticket_id, deltas = await db.run(_create)
+        self._counters.update(deltas)
+        return ticket_id
+
+    # Fecha o ticket e atualiza os contadores na mesma transação; retorna False se já estava fechado
+    async def close_ticket(self, ticket_id: int, closed_by):
+        def _close(conn):
+            with conn:
+                cursor = conn.execute('''
+                    UPDATE tickets
+                    SET status = "fechado", updated_at = CURRENT_TIMESTAMP, closed_by = ?, closed_at = CURRENT_TIMESTAMP
+                    WHERE id = ? AND status = "aberto"
+                ''', (str(closed_by), ticket_id))
+                if cursor.rowcount == 0:
+                    return None
+                deltas = Counter({'status:aberto': -1, 'status:fechado': 1})
+                _apply(conn, deltas)
+            return deltas
+
+        deltas = await db.run(_close)
+        if deltas is None:
+            return False
+        self._counters.update(deltas)
+        return True
+
+    # Retrato dos contadores para o /stats-tickets (sem I/O)
+    def snapshot(self):
+        categories = sorted(
+            ((key.split(':', 1)[1], count) for key, count in self._counters.items() if key.startswith('categoria:') and count > 0),
+            key=lambda item: item[1],
+            reverse=True
+        )
+        return {
+            "total": self._counters['total'],
+            "abertos": self._counters['status:aberto'],
+            "fechados": self._counters['status:fechado'],
+            "usuarios": self._counters['usuarios'],
+            "hoje": self._counters[f'dia:{_today()}'],
+            "categorias": categories,
+        }
+
+# Instância global usada por todo o bot
+ticket_stats = TicketStats()
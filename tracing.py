@@ -0,0 +1,126 @@
+import os
+import re
+import time
+import random
+import asyncio
+import cProfile
+import contextvars
+from datetime import datetime
+
+# Handlers que demoram mais que isso (segundos) são registrados com o detalhamento do tempo
+TRACE_SLOW_THRESHOLD = float(os.getenv('TRACE_SLOW_THRESHOLD', '1.0'))
+# Fração das execuções perfiladas com cProfile (0 = desligado, 0.01 = 1%)
+TRACE_PROFILE_RATE = float(os.getenv('TRACE_PROFILE_RATE', '0'))
+# Pasta dos arquivos .prof gerados pela amostragem (abrir com python -m pstats ou snakeviz)
+TRACE_PROFILE_DIR = os.getenv('TRACE_PROFILE_DIR', 'profiles')
+
+# Quantas chamadas individuais (as mais lentas) aparecem no registro de um handler lento
+TRACE_TOP_SPANS = 5
+
+# Rotas da API com ids trocados por {id}, para agrupar chamadas iguais
+_SNOWFLAKE = re.compile(r'\d{15,}')
+
+# Rastreamento de uma execução de comando, botão ou formulário.
+# Cada chamada ao banco e à API REST do Discord feita durante a execução vira um "span";
+# o que sobra do tempo total é trabalho em Python (ou espera por limite de uso da API).
+class Trace:
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        # categoria (db | rest) -> [segundos, chamadas]
+        self.totals = {}
+        # (segundos, categoria, rótulo) das chamadas mais lentas
+        self.slowest = []
+        self.profile = None
+
+    def add(self, category: str, label: str, seconds: float):
+        total = self.totals.setdefault(category, [0.0, 0])
+        total[0] += seconds
+        total[1] += 1
+        self.slowest.append((seconds, category, label))
+        if len(self.slowest) > TRACE_TOP_SPANS * 2:
+            self.slowest.sort(reverse=True)
+            del self.slowest[TRACE_TOP_SPANS:]
+
+    def breakdown(self, elapsed: float) -> str:
+        parts = [f"{category} {seconds:.3f}s ({count})" for category, (seconds, count) in sorted(self.totals.items())]
+        other = elapsed - sum(seconds for seconds, _ in self.totals.values())
+        parts.append(f"python/espera {max(other, 0):.3f}s")
+        text = " | ".join(parts)
+        top = sorted(self.slowest, reverse=True)[:TRACE_TOP_SPANS]
+        if top:
+            text += "\n   mais lentas: " + "; ".join(f"{category} {label} {seconds:.3f}s" for seconds, category, label in top)
+        return text
+
+_current_trace = contextvars.ContextVar('trace', default=None)
+# cProfile mede a thread inteira; só uma execução é perfilada por vez
+_profiling = False
+
+# Começa o rastreamento na tarefa atual; retorna (trace, token para restaurar o anterior)
+def start_trace(name: str):
+    global _profiling
+    trace = Trace(name)
+    if TRACE_PROFILE_RATE > 0 and not _profiling and random.random() < TRACE_PROFILE_RATE:
+        _profiling = True
+        trace.profile = cProfile.Profile()
+        trace.profile.enable()
+    return trace, _current_trace.set(trace)
+
+# Encerra o rastreamento; registra o detalhamento se passou do limite. Retorna a duração.
+def finish_trace(trace: Trace, status: str = "ok", token=None) -> float:
+    global _profiling
+    elapsed = time.perf_counter() - trace.start
+    if token is not None:
+        _current_trace.reset(token)
+    if trace.profile is not None:
+        trace.profile.disable()
+        _profiling = False
+        _dump_profile(trace)
+    if elapsed >= TRACE_SLOW_THRESHOLD:
+        print(f"🐢 Handler lento: {trace.name} levou {elapsed:.3f}s ({status}) | {trace.breakdown(elapsed)}")
+    return elapsed
+
+def _dump_profile(trace: Trace):
+    safe_name = re.sub(r'[^\w.-]+', '_', trace.name).strip('_')
+    path = os.path.join(TRACE_PROFILE_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{safe_name}.prof")
+
+    def _write():
+        os.makedirs(TRACE_PROFILE_DIR, exist_ok=True)
+        trace.profile.dump_stats(path)
+        print(f"🔬 Perfil de {trace.name} salvo em {path}")
+
+    try:
+        asyncio.get_running_loop().run_in_executor(None, _write)
+    except RuntimeError:
+        _write()
+
+# Registra uma chamada no rastreamento ativo (se houver)
+def record_span(category: str, label: str, seconds: float):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(category, label, seconds)
+
+# Mede as requisições HTTP do discord.py (passado como http_trace ao criar o bot).
+# Os callbacks do aiohttp rodam na tarefa que fez a requisição, então o span vai para o
+# rastreamento do handler que a chamou, inclusive respostas de interação.
+def http_trace_config():
+    import aiohttp
+
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        label = f"{params.method} {_SNOWFLAKE.sub('{id}', params.url.path)}"
+        if params.response.status >= 400:
+            label += f" [{params.response.status}]"
+        record_span("rest", label, time.perf_counter() - context.start)
+
+    async def on_request_exception(session, context, params):
+        label = f"{params.method} {_SNOWFLAKE.sub('{id}', params.url.path)} [erro]"
+        record_span("rest", label, time.perf_counter() - context.start)
+
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(on_request_start)
+    config.on_request_end.append(on_request_end)
+    config.on_request_exception.append(on_request_exception)
+    return config
@@ -0,0 +1,164 @@
+import os
+import hmac
+import json
+import time
+import asyncio
+import hashlib
+import secrets
+import discord
+
+# Arquivo JSONL onde o tráfego recebido é gravado; vazio = gravação desligada (configurável pelo .env)
+RECORD_TRAFFIC = os.getenv('RECORD_TRAFFIC', '')
+# Chave dos pseudônimos. Sem ela, cada execução usa uma chave aleatória (ids não batem entre gravações)
+RECORD_TRAFFIC_SALT = os.getenv('RECORD_TRAFFIC_SALT', '')
+# Intervalo entre as escritas em disco (segundos)
+RECORD_FLUSH_INTERVAL = float(os.getenv('RECORD_FLUSH_INTERVAL', '1'))
+
+RECORDING_VERSION = 1
+
+# Tipos de opção de comando de barra cujo valor é um id (usuário, canal, cargo, menção, anexo)
+_ID_OPTION_TYPES = {6, 7, 8, 9, 11}
+_STRING_OPTION = 3
+
+# Gravação anônima dos eventos recebidos (mensagens, presenças e interações) para reproduzir
+# depois com benchmarks/replay_traffic.py. Nenhum texto é gravado, só o tamanho; ids viram
+# pseudônimos estáveis dentro da gravação (HMAC com a chave), então o mesmo membro continua
+# sendo o mesmo membro no replay. Os eventos ficam em memória e vão para o disco em lote.
+class TrafficRecorder:
+    def __init__(self, path: str = RECORD_TRAFFIC, salt: str = RECORD_TRAFFIC_SALT, flush_interval: float = RECORD_FLUSH_INTERVAL):
+        self.path = path
+        self.enabled = bool(path)
+        self._key = (salt or secrets.token_hex(16)).encode('utf-8')
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._task = None
+        self.recorded = 0
+
+    # Pseudônimo de um id do Discord: mesmo id -> mesmo número, com formato de snowflake
+    def pseudo(self, snowflake):
+        if snowflake is None:
+            return None
+        digest = hmac.new(self._key, str(snowflake).encode('utf-8'), hashlib.sha256).hexdigest()
+        return int(digest[:15], 16) | (1 << 59)
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._pending.append({"type": "header", "version": RECORDING_VERSION, "t": time.time()})
+            self._task = asyncio.create_task(self._run())
+            print(f"🎙️ Gravando tráfego (anônimo) em {self.path}")
+
+    def _add(self, event: dict):
+        event["t"] = time.time()
+        self._pending.append(event)
+        self.recorded += 1
+
+    def message(self, message, suggestion_channel: bool):
+        self._add({
+            "type": "message",
+            "guild": self.pseudo(message.guild.id if message.guild else None),
+            "channel": self.pseudo(message.channel.id),
+            "author": self.pseudo(message.author.id),
+            "bot": message.author.bot,
+            "content_len": len(message.content or ""),
+            "attachments": len(message.attachments),
+            "suggestion_channel": suggestion_channel,
+        })
+
+    def presence(self, before, after, monitored: bool):
+        self._add({
+            "type": "presence",
+            "guild": self.pseudo(after.guild.id),
+            "user": self.pseudo(after.id),
+            "bot": after.bot,
+            "activities": len(after.activities),
+            "streaming_before": any(isinstance(activity, discord.Streaming) for activity in before.activities),
+            "streaming_after": any(isinstance(activity, discord.Streaming) for activity in after.activities),
+            "monitored": monitored,
+        })
+
+    def _options(self, options):
+        result = []
+        for option in options or []:
+            item = {"name": option["name"], "type": option["type"]}
+            if "options" in option:
+                item["options"] = self._options(option["options"])
+            elif option["type"] == _STRING_OPTION:
+                item["len"] = len(str(option.get("value", "")))
+            elif option["type"] in _ID_OPTION_TYPES:
+                item["value"] = self.pseudo(option.get("value"))
+            else:
+                item["value"] = option.get("value")
+            result.append(item)
+        return result
+
+    # Rótulo do botão clicado, procurado nos componentes da mensagem (o custom_id pode ser aleatório)
+    @staticmethod
+    def _component_label(interaction, custom_id: str):
+        for row in getattr(interaction.message, "components", None) or []:
+            for component in getattr(row, "children", []):
+                if getattr(component, "custom_id", None) == custom_id:
+                    return getattr(component, "label", None)
+        return None
+
+    def interaction(self, interaction):
+        data = interaction.data or {}
+        permissions = interaction.permissions
+        event = {
+            "type": "interaction",
+            "kind": interaction.type.value,
+            "guild": self.pseudo(interaction.guild_id),
+            "channel": self.pseudo(interaction.channel_id),
+            "user": self.pseudo(interaction.user.id),
+            "admin": permissions.administrator,
+            "manage_guild": permissions.manage_guild,
+        }
+        if interaction.type.value in (2, 4):
+            event["command"] = data.get("name")
+            event["options"] = self._options(data.get("options"))
+        elif interaction.type.value == 3:
+            custom_id = data.get("custom_id")
+            event["custom_id"] = custom_id
+            event["label"] = self._component_label(interaction, custom_id)
+            event["values"] = len(data.get("values", []))
+        elif interaction.type.value == 5:
+            event["fields"] = [
+                len(component.get("value") or "")
+                for row in data.get("components", [])
+                for component in row.get("components", [])
+            ]
+        self._add(event)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch = self._pending
+        self._pending = []
+        text = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in batch)
+
+        def _write():
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(text)
+        try:
+            await asyncio.to_thread(_write)
+        except Exception as e:
+            print(f"❌ Erro ao gravar tráfego ({len(batch)} eventos): {e}")
+            self._pending = batch + self._pending
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.enabled:
+            await self.flush()
+
+# Instância global usada por todo o bot
+traffic_recorder = TrafficRecorder()
@@ -0,0 +1,107 @@
+import os
+import gzip
+import html
+import json
+import asyncio
+
+# Pasta onde as transcrições dos tickets são salvas (configurável pelo .env)
+TRANSCRIPTS_DIR = os.getenv('TRANSCRIPTS_DIR', 'transcripts')
+# Mensagens acumuladas antes de cada escrita em disco; limita a memória usada em tickets longos
+TRANSCRIPT_CHUNK_SIZE = int(os.getenv('TRANSCRIPT_CHUNK_SIZE', '200'))
+
+HTML_HEADER = '''<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; background: #313338; color: #dbdee1; margin: 2em; }}
+h1 {{ font-size: 1.3em; }}
+.msg {{ margin: 0.6em 0; }}
+.author {{ font-weight: bold; color: #f2f3f5; }}
+.time {{ color: #949ba4; font-size: 0.8em; margin-left: 0.5em; }}
+.content {{ white-space: pre-wrap; }}
+.extra {{ color: #949ba4; font-size: 0.9em; }}
+a {{ color: #00a8fc; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+'''
+HTML_FOOTER = '</body>\n</html>\n'
+
+def _record(message) -> dict:
+    return {
+        "id": str(message.id),
+        "author_id": str(message.author.id),
+        "author": message.author.display_name,
+        "bot": message.author.bot,
+        "created_at": message.created_at.isoformat(),
+        "edited_at": message.edited_at.isoformat() if message.edited_at else None,
+        "content": message.content,
+        "attachments": [attachment.url for attachment in message.attachments],
+        "embeds": [embed.to_dict() for embed in message.embeds],
+    }
+
+def _html(record: dict) -> str:
+    parts = [
+        '<div class="msg">',
+        f'<span class="author">{html.escape(record["author"])}</span>',
+        f'<span class="time">{html.escape(record["created_at"][:19].replace("T", " "))} UTC</span>',
+        f'<div class="content">{html.escape(record["content"])}</div>',
+    ]
+    for url in record["attachments"]:
+        parts.append(f'<div class="extra">📎 <a href="{html.escape(url)}">{html.escape(url.rsplit("/", 1)[-1])}</a></div>')
+    for embed in record["embeds"]:
+        title = embed.get("title") or embed.get("description") or "embed"
+        parts.append(f'<div class="extra">🖼️ {html.escape(title[:200])}</div>')
+    parts.append('</div>\n')
+    return "".join(parts)
+
+# Exporta o histórico do canal em JSONL compactado (.jsonl.gz) e HTML.
+# As mensagens são lidas página por página (o discord.py busca 100 por vez) e escritas em
+# blocos de TRANSCRIPT_CHUNK_SIZE, fora do loop de eventos. Os arquivos só aparecem com o
+# nome final quando a exportação termina. Retorna (caminho_jsonl, caminho_html, total).
+async def export_transcript(channel, ticket_id: int, title: str = None, directory: str = None):
+    directory = directory or TRANSCRIPTS_DIR
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"ticket-{ticket_id}")
+    jsonl_path, html_path = f"{base}.jsonl.gz", f"{base}.html"
+    jsonl_tmp, html_tmp = f"{jsonl_path}.tmp", f"{html_path}.tmp"
+    page_title = html.escape(f"Ticket #{ticket_id}" + (f" - {title}" if title else "") + f" (#{channel.name})")
+
+    jsonl_file = await asyncio.to_thread(gzip.open, jsonl_tmp, 'wt', encoding='utf-8')
+    html_file = await asyncio.to_thread(open, html_tmp, 'w', encoding='utf-8')
+
+    def _write(jsonl_chunk, html_chunk):
+        jsonl_file.write(jsonl_chunk)
+        html_file.write(html_chunk)
+
+    total = 0
+    try:
+        await asyncio.to_thread(html_file.write, HTML_HEADER.format(title=page_title))
+        jsonl_chunk, html_chunk = [], []
+        async for message in channel.history(limit=None, oldest_first=True):
+            record = _record(message)
+            jsonl_chunk.append(json.dumps(record, ensure_ascii=False) + "\n")
+            html_chunk.append(_html(record))
+            total += 1
+            if len(jsonl_chunk) >= TRANSCRIPT_CHUNK_SIZE:
+                await asyncio.to_thread(_write, "".join(jsonl_chunk), "".join(html_chunk))
+                jsonl_chunk, html_chunk = [], []
+        html_chunk.append(HTML_FOOTER)
+        await asyncio.to_thread(_write, "".join(jsonl_chunk), "".join(html_chunk))
+    except BaseException:
+        # Exportação incompleta: não deixa arquivos pela metade
+        jsonl_file.close()
+        html_file.close()
+        for path in (jsonl_tmp, html_tmp):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    await asyncio.to_thread(jsonl_file.close)
+    await asyncio.to_thread(html_file.close)
+
+    os.replace(jsonl_tmp, jsonl_path)
+    os.replace(html_tmp, html_path)
+    return jsonl_path, html_path, total